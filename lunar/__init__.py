@@ -1,5 +1,11 @@
+# Built-in imports
+import importlib.util
+
 # Custom imports
-import lunar.maya
+import lunar.anim
+# Maya modules are only available inside of maya / mayapy, import errors inside of maya are real errors
+if importlib.util.find_spec("maya") is not None:
+	import lunar.maya
 
 __moduleName__ = "lunar"
 __version__ = "0.4.5"
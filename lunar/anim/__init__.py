@@ -0,0 +1,13 @@
+# Custom imports
+import lunar.anim.quaternion
+import lunar.anim.euler
+import lunar.anim.reduce
+import lunar.anim.posetrack
+import lunar.anim.skeleton
+import lunar.anim.retime
+import lunar.anim.solver
+import lunar.anim.detect
+import lunar.anim.rootmotion
+import lunar.anim.contact
+import lunar.anim.metrics
+import lunar.anim.cleanup
@@ -0,0 +1,230 @@
+"""Mocap signal cleanup filters.
+
+Smoothing and spike removal for baked curves, every filter runs on all channels at once - values are
+(frames, ...) arrays filtered along the first axis. Smoothing is either a zero-phase butterworth low
+pass, run forward and backward so the motion is not delayed, or a savitzky golay filter which keeps
+the peaks of fast motions better. Spikes are detected against a rolling median. Rotations are
+smoothed as quaternions so euler flips and gimbal lock do not leak into the filtered curves.
+
+"""
+
+# Built-in imports
+
+# Third-party imports
+import numpy as np
+
+# Custom imports
+import lunar.anim.quaternion as laq
+
+
+
+
+def padOdd(values:np.ndarray, count:int) -> np.ndarray:
+	"""Pads the values with their point reflection around the first and last frame.
+
+	Keeps the slope at the ends, so the filters do not pull the first and last frames towards zero.
+
+	"""
+	count = min(int(count), values.shape[0] - 1)
+	if count < 1: return values
+
+	start = 2.0 * values[:1] - values[count:0:-1]
+	end = 2.0 * values[-1:] - values[-2:-count - 2:-1]
+	return np.concatenate((start, values, end))
+
+
+def butterworthCoefficients(cutoff:float, frameRate:float) -> tuple:
+	"""Returns the (b, a) coefficients of a second order butterworth low pass.
+
+	Args:
+		cutoff (float): Cutoff frequency in Hz, limited to just below the nyquist frequency.
+		frameRate (float): Samples per second.
+
+	"""
+	ratio = min(float(cutoff) / float(frameRate), 0.49)
+	# Prewarped bilinear transform
+	omega = np.tan(np.pi * ratio)
+	norm = 1.0 / (1.0 + np.sqrt(2.0) * omega + omega * omega)
+
+	b0 = omega * omega * norm
+	b = np.array([b0, 2.0 * b0, b0])
+	a = np.array([1.0, 2.0 * (omega * omega - 1.0) * norm, (1.0 - np.sqrt(2.0) * omega + omega * omega) * norm])
+	return b, a
+
+
+def biquad(values:np.ndarray, b:np.ndarray, a:np.ndarray) -> np.ndarray:
+	"""Runs the second order filter along the first axis, all channels in a single pass per frame.
+
+	The filter state starts in the steady state of the first frame so there is no step response.
+
+	"""
+	# Steady state of the transposed direct form II for a constant input of one
+	gain = b.sum() / a.sum()
+	state1 = (gain - b[0]) * values[0]
+	state2 = (b[2] - a[2] * gain) * values[0]
+
+	result = np.empty_like(values)
+	for frame in range(values.shape[0]):
+		value = values[frame]
+		output = b[0] * value + state1
+		state1 = b[1] * value - a[1] * output + state2
+		state2 = b[2] * value - a[2] * output
+		result[frame] = output
+
+	return result
+
+
+def butterworth(values:np.ndarray, cutoff:float, frameRate:float=30.0) -> np.ndarray:
+	"""Zero-phase butterworth low pass filter.
+
+	The second order filter runs forward and backward, the result has no phase delay and an effective
+	fourth order roll-off.
+
+	Args:
+		values (np.ndarray): Values (frames, ...).
+		cutoff (float): Cutoff frequency in Hz, motions faster than the cutoff are removed.
+		frameRate (float): Samples per second of the values.
+
+	Returns:
+		np.ndarray: Filtered values, unchanged if there are less than three frames or no cutoff.
+
+	"""
+	values = np.asarray(values, dtype=float)
+	frameCount = values.shape[0]
+	if frameCount < 3 or not cutoff: return values
+
+	b, a = butterworthCoefficients(cutoff, frameRate)
+	# Pad by about one period of the cutoff frequency to settle the filter before the first frame
+	padding = min(frameCount - 1, max(6, int(np.ceil(frameRate / cutoff))))
+	padded = padOdd(values, padding)
+
+	forward = biquad(padded, b, a)
+	backward = biquad(forward[::-1], b, a)[::-1]
+	return backward[padding:padding + frameCount]
+
+
+def savitzkyGolayCoefficients(window:int, order:int=2) -> np.ndarray:
+	"""Returns the convolution weights of the savitzky golay filter for the center sample (window,).
+	"""
+	half = window // 2
+	offsets = np.arange(-half, half + 1, dtype=float)
+	vandermonde = offsets[:, None] ** np.arange(order + 1)
+	return np.linalg.pinv(vandermonde)[0]
+
+
+def savitzkyGolay(values:np.ndarray, window:int, order:int=2) -> np.ndarray:
+	"""Savitzky golay filter - fits a polynomial to the window around every frame.
+
+	Args:
+		values (np.ndarray): Values (frames, ...).
+		window (int): Width of the window in frames, even windows are enlarged by one.
+		order (int): Order of the fitted polynomial.
+
+	Returns:
+		np.ndarray: Filtered values, unchanged if the clip is too short for the order.
+
+	"""
+	values = np.asarray(values, dtype=float)
+	# The window is limited to the padding possible on short clips
+	window = min(int(window) | 1, 2 * values.shape[0] - 1)
+	if window <= order + 1: return values
+
+	half = window // 2
+	padded = padOdd(values, half)
+	windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=0)
+	return windows @ savitzkyGolayCoefficients(window, order)
+
+
+def rollingMedian(values:np.ndarray, window:int) -> np.ndarray:
+	"""Returns the centered median of the window around every frame, the edges are repeated.
+	"""
+	half = int(window) // 2
+	padded = np.concatenate((np.repeat(values[:1], half, axis=0), values, np.repeat(values[-1:], half, axis=0)))
+	return np.median(np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1, axis=0), axis=-1)
+
+
+def detectSpikes(values:np.ndarray, window:int=5, threshold:float=4.0, minDeviation:float=0.0) -> tuple:
+	"""Detects the spikes of the values against their rolling median.
+
+	A frame is a spike if it deviates from the median more than threshold times the noise of its
+	channel. The noise is estimated from the second differences, which cancel the motion itself - on
+	fast motions the rolling median is often the frame itself and its deviations underestimate it.
+
+	Args:
+		values (np.ndarray): Values (frames, ...).
+		window (int): Width of the median window in frames, spikes up to half of the window are found.
+		threshold (float): Deviation in standard deviations of the noise counted as a spike.
+		minDeviation (float): Smallest deviation counted as a spike, keeps clean channels untouched.
+
+	Returns:
+		tuple: Boolean spike mask and the rolling medians, both shaped like the values.
+
+	"""
+	values = np.asarray(values, dtype=float)
+	medians = rollingMedian(values, window)
+	deviations = np.abs(values - medians)
+	# Second differences of white noise have six times its variance, the scaled median absolute value
+	# is the robust estimate of their standard deviation
+	scale = 1.4826 * np.median(np.abs(np.diff(values, 2, axis=0)), axis=0) / np.sqrt(6.0)
+	spikes = deviations > np.maximum(threshold * scale, minDeviation)
+
+	return spikes, medians
+
+
+def removeSpikes(values:np.ndarray, window:int=5, threshold:float=4.0, minDeviation:float=0.0) -> tuple:
+	"""Replaces the spikes by linear interpolation between their neighbouring frames.
+
+	Returns:
+		tuple: Values without the spikes and the boolean spike mask, see detectSpikes.
+
+	"""
+	values = np.array(values, dtype=float)
+	if values.shape[0] < 3: return values, np.zeros(values.shape, dtype=bool)
+
+	spikes, medians = detectSpikes(values, window, threshold, minDeviation)
+	if not spikes.any(): return values, spikes
+
+	frames = np.arange(values.shape[0])
+	flat, flatSpikes, flatMedians = values.reshape(frames.size, -1), spikes.reshape(frames.size, -1), medians.reshape(frames.size, -1)
+	for channel in np.flatnonzero(flatSpikes.any(axis=0)):
+		mask = flatSpikes[:, channel]
+		if mask.all():
+			flat[:, channel] = flatMedians[:, channel]
+			continue
+		flat[mask, channel] = np.interp(frames[mask], frames[~mask], flat[~mask, channel])
+
+	return values, spikes
+
+
+def smooth(values:np.ndarray, method:str="butterworth", cutoff:float=6.0, window:int=9, frameRate:float=30.0) -> np.ndarray:
+	"""Smooths the values with the butterworth or the savitzky golay filter.
+
+	Args:
+		values (np.ndarray): Values (frames, ...).
+		method (str): 'butterworth' or 'savitzkyGolay'.
+		cutoff (float): Cutoff frequency in Hz of the butterworth filter.
+		window (int): Window in frames of the savitzky golay filter.
+		frameRate (float): Samples per second of the values.
+
+	"""
+	if method == "butterworth": return butterworth(values, cutoff, frameRate)
+	if method == "savitzkyGolay": return savitzkyGolay(values, window)
+
+	raise ValueError(f"Unknown smoothing method '{method}'.")
+
+
+def smoothQuaternions(q:np.ndarray, method:str="butterworth", cutoff:float=6.0, window:int=9, frameRate:float=30.0) -> np.ndarray:
+	"""Smooths rotations in quaternion space.
+
+	The quaternions are made continuous first so the components do not jump between the two
+	hemispheres, the smoothed components are normalized again.
+
+	Args:
+		q (np.ndarray): Unit quaternions (frames, ..., 4).
+
+	Returns:
+		np.ndarray: Smoothed unit quaternions.
+
+	"""
+	q = laq.makeContinuous(q)
+	return laq.normalize(smooth(q, method, cutoff, window, frameRate))
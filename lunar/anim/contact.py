@@ -0,0 +1,175 @@
+"""Foot contact detection and grounding for whole clips.
+
+Contact joints - feet and toes - are in contact while they are close to their planted height and
+slow. The contacts of all frames are detected at once from the world positions, short gaps are
+filled and short contacts are dropped. The contact intervals drive the hips height offsets and the
+IK pinning targets.
+
+Positions are (frames, joints, 3) arrays, heights are taken along the up axis.
+
+"""
+
+# Built-in imports
+
+# Third-party imports
+import numpy as np
+
+# Custom imports
+
+
+
+
+def speeds(positions:np.ndarray, frameRate:float=30.0, sampleBy:float=1.0) -> np.ndarray:
+	"""Returns the speed of the joints in units per second (frames, joints).
+	"""
+	if positions.shape[0] < 2: return np.zeros(positions.shape[:2])
+	velocities = np.gradient(positions, axis=0) * frameRate / sampleBy
+	return np.linalg.norm(velocities, axis=-1)
+
+
+def runs(mask:np.ndarray) -> tuple:
+	"""Returns the first and last indices of the runs of True values of a 1d mask.
+	"""
+	edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+	return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1
+
+
+def cleanUp(mask:np.ndarray, minLength:int=1, maxGap:int=0) -> np.ndarray:
+	"""Fills the gaps between runs up to maxGap frames and drops the runs shorter than minLength.
+
+	Args:
+		mask (np.ndarray): Boolean mask (frames, joints).
+
+	Returns:
+		np.ndarray: The cleaned up mask.
+
+	"""
+	mask = np.array(mask, dtype=bool)
+	for joint in range(mask.shape[1]):
+		column = mask[:, joint]
+		if maxGap > 0:
+			starts, ends = runs(~column)
+			inner = (starts > 0) & (ends < column.size - 1) & (ends - starts + 1 <= maxGap)
+			for start, end in zip(starts[inner], ends[inner]): column[start:end + 1] = True
+		if minLength > 1:
+			starts, ends = runs(column)
+			short = ends - starts + 1 < minLength
+			for start, end in zip(starts[short], ends[short]): column[start:end + 1] = False
+
+	return mask
+
+
+def referenceHeights(heights:np.ndarray, percentile:float=2.0) -> np.ndarray:
+	"""Returns the planted height per joint, a low percentile of its heights over the clip (joints,).
+	"""
+	return np.percentile(heights, percentile, axis=0)
+
+
+def detect(
+	heights:np.ndarray,
+	speeds:np.ndarray,
+	references:np.ndarray,
+	heightThreshold:float=5.0,
+	speedThreshold:float=30.0,
+	minLength:int=3,
+	maxGap:int=2,
+) -> np.ndarray:
+	"""Detects the contacts of the joints.
+
+	Args:
+		heights (np.ndarray): Heights of the joints (frames, joints).
+		speeds (np.ndarray): Speeds of the joints in units per second (frames, joints).
+		references (np.ndarray): Planted height per joint (joints,), see referenceHeights.
+		heightThreshold (float): Distance above the planted height still counted as contact.
+		speedThreshold (float): Speed up to which a joint is counted as planted.
+		minLength (int): Contacts shorter than the given number of frames are dropped.
+		maxGap (int): Gaps up to the given number of frames between contacts are filled.
+
+	Returns:
+		np.ndarray: Boolean contacts (frames, joints).
+
+	"""
+	contacts = (heights - references < heightThreshold) & (speeds < speedThreshold)
+	return cleanUp(contacts, minLength, maxGap)
+
+
+def intervals(contacts:np.ndarray) -> list:
+	"""Returns the (first, last) frame index tuples of the contacts for every joint.
+	"""
+	return [list(zip(*(indices.tolist() for indices in runs(contacts[:, joint])))) for joint in range(contacts.shape[1])]
+
+
+def intervalMeans(values:np.ndarray, starts:np.ndarray, ends:np.ndarray) -> np.ndarray:
+	"""Returns the mean of the values (frames, ...) over every interval."""
+	cumulative = np.concatenate((np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)))
+	sums = cumulative[ends + 1] - cumulative[starts]
+	return sums / (ends - starts + 1).reshape((-1,) + (1,) * (values.ndim - 1))
+
+
+def hipsOffsets(
+	heights:np.ndarray,
+	contacts:np.ndarray,
+	references:np.ndarray,
+	floorShift:float=0.0,
+	smoothing:int=0,
+) -> np.ndarray:
+	"""Returns the height offset of the hips per frame which plants the contact joints.
+
+	Every contact interval gets a constant offset moving the joint to its planted height, frames with
+	multiple contacts use the largest offset so no joint goes through the floor. The offsets are
+	interpolated between the contacts.
+
+	Args:
+		heights (np.ndarray): Heights of the joints (frames, joints).
+		contacts (np.ndarray): Boolean contacts (frames, joints).
+		references (np.ndarray): Planted height per joint (joints,).
+		floorShift (float): Constant offset added to all frames e.g. to lift a clip out of the floor.
+		smoothing (int): Moving average window in frames applied to the offsets.
+
+	Returns:
+		np.ndarray: Offsets (frames,).
+
+	"""
+	frameCount = heights.shape[0]
+	offsets = np.full(frameCount, -np.inf)
+	for joint in range(heights.shape[1]):
+		starts, ends = runs(contacts[:, joint])
+		if not starts.size: continue
+		means = intervalMeans(heights[:, joint], starts, ends)
+		values = np.repeat(references[joint] - means, ends - starts + 1)
+		frames = np.concatenate([np.arange(start, end + 1) for start, end in zip(starts, ends)])
+		offsets[frames] = np.maximum(offsets[frames], values)
+
+	planted = np.isfinite(offsets)
+	if not planted.any(): return np.full(frameCount, float(floorShift))
+
+	frames = np.arange(frameCount)
+	offsets = np.interp(frames, frames[planted], offsets[planted])
+	if smoothing > 1:
+		before = smoothing // 2
+		padded = np.concatenate((np.full(before, offsets[0]), offsets, np.full(smoothing - 1 - before, offsets[-1])))
+		offsets = np.convolve(padded, np.full(smoothing, 1.0 / smoothing), mode="valid")
+
+	return offsets + floorShift
+
+
+def pinTargets(positions:np.ndarray, contacts:np.ndarray) -> np.ndarray:
+	"""Returns the IK pinning targets, the mean position of every contact interval.
+
+	Args:
+		positions (np.ndarray): World positions of the joints (frames, joints, 3).
+		contacts (np.ndarray): Boolean contacts (frames, joints).
+
+	Returns:
+		np.ndarray: Targets (frames, joints, 3), frames without contact keep the joint position.
+
+	"""
+	targets = np.array(positions, dtype=float)
+	for joint in range(positions.shape[1]):
+		starts, ends = runs(contacts[:, joint])
+		if not starts.size: continue
+		means = intervalMeans(positions[:, joint], starts, ends)
+		frames = np.concatenate([np.arange(start, end + 1) for start, end in zip(starts, ends)])
+		targets[frames, joint] = np.repeat(means, ends - starts + 1, axis=0)
+
+	return targets
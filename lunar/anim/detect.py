@@ -0,0 +1,163 @@
+"""Skeleton template detection.
+
+Finds the retarget template matching a joint set. The joint names of all templates are stored in an
+inverted index so scoring every template only touches the joints of the skeleton once. Templates are
+ranked by the overlap of the joint names and by the hierarchy shape - whether the joints of the
+HumanIK slots are nested the same way as the slots, e.g. the foot below the knee below the thigh.
+
+"""
+
+# Built-in imports
+
+# Third-party imports
+
+# Custom imports
+
+
+
+
+# HumanIK slot ancestors checked for the hierarchy shape, intermediate joints are allowed
+slotParents = {
+	"LeftUpLeg": "Hips",
+	"LeftLeg": "LeftUpLeg",
+	"LeftFoot": "LeftLeg",
+	"LeftToeBase": "LeftFoot",
+	"RightUpLeg": "Hips",
+	"RightLeg": "RightUpLeg",
+	"RightFoot": "RightLeg",
+	"RightToeBase": "RightFoot",
+	"Spine": "Hips",
+	"LeftShoulder": "Spine",
+	"LeftArm": "Spine",
+	"LeftForeArm": "LeftArm",
+	"LeftHand": "LeftForeArm",
+	"RightShoulder": "Spine",
+	"RightArm": "Spine",
+	"RightForeArm": "RightArm",
+	"RightHand": "RightForeArm",
+	"Neck": "Spine",
+	"Head": "Spine",
+}
+
+# Score weights of the definition slots found, the joint name overlap and the hierarchy shape
+weights = (0.4, 0.3, 0.3)
+
+
+
+
+def stripNamespace(name:str) -> str:
+	"""Returns the lower case name without the dag path and namespace."""
+	return name.rpartition("|")[2].rpartition(":")[2].lower()
+
+
+def isAncestor(parents:dict, joint:str, ancestor:str) -> bool:
+	"""Whether or not the ancestor is above the joint in the hierarchy described by the parents."""
+	parent = parents.get(joint)
+	while parent is not None:
+		if parent == ancestor: return True
+		parent = parents.get(parent)
+
+	return False
+
+
+
+
+class TemplateIndex():
+	"""Inverted index of the template joint names.
+
+	Usage:
+		index = TemplateIndex({
+			"HumanIk": {"definition": definition, "minimalDefinition": minimalDefinition, "joints": joints},
+		})
+		template, confidence = index.detect(joints, parents)
+
+	"""
+
+	def __init__(self, templates:dict) -> None:
+		"""Init method.
+
+		Args:
+			templates (dict): Template names mapped to dictionaries with the 'definition' and optional
+				'minimalDefinition' slot dictionaries and 'joints' - all joint names of the skeleton,
+				the definition nodes are always included.
+
+		"""
+		self.slots = {}
+		self.minimal = {}
+		self.joints = {}
+		self.index = {}
+
+		for name, template in templates.items():
+			definition = template.get("definition", {})
+			# Slots with an id of 500 and above are not part of the HumanIK skeleton
+			self.slots[name] = {slot: entry["node"].lower() for slot, entry in definition.items() if entry["id"] < 500}
+			self.minimal[name] = frozenset(entry["node"].lower() for entry in template.get("minimalDefinition", {}).values())
+			self.joints[name] = frozenset(joint.lower() for joint in template.get("joints", ())) | frozenset(self.slots[name].values())
+			for joint in self.joints[name]: self.index.setdefault(joint, []).append(name)
+
+
+	def score(self, joints:list, parents:dict=None) -> list:
+		"""Scores all templates against the joint set.
+
+		Args:
+			joints (list): Joint names, dag paths and namespaces are ignored.
+			parents (dict): Joint names mapped to the parent names, if not specified the hierarchy shape
+				is not checked and the name scores are weighted up.
+
+		Returns:
+			list: Dictionaries with the 'template', 'score', 'definition' - fraction of the definition
+				slots found, 'overlap' - jaccard index of the joint names and 'hierarchy' - fraction of the
+				slot ancestors matching, sorted by the score.
+
+		"""
+		names = {stripNamespace(joint) for joint in joints}
+		if parents: parents = {stripNamespace(joint): stripNamespace(parent) for joint, parent in parents.items() if parent}
+
+		hits = {}
+		for joint in names:
+			for name in self.index.get(joint, ()): hits[name] = hits.get(name, 0) + 1
+
+		results = []
+		for name, count in hits.items():
+			slots = {slot: node for slot, node in self.slots[name].items() if node in names}
+			definition = slots.__len__() / max(1, self.slots[name].__len__())
+			overlap = count / (self.joints[name].__len__() + names.__len__() - count)
+			minimal = self.minimal[name]
+			minimalFound = minimal.intersection(names).__len__() / minimal.__len__() if minimal else 1.0
+
+			hierarchy = None
+			if parents:
+				checks = [isAncestor(parents, slots[slot], slots[parent]) for slot, parent in slotParents.items() if slot in slots and parent in slots]
+				if checks: hierarchy = sum(checks) / checks.__len__()
+
+			if hierarchy is None:
+				score = (weights[0] * definition + weights[1] * overlap) / (weights[0] + weights[1])
+			else:
+				score = weights[0] * definition + weights[1] * overlap + weights[2] * hierarchy
+			# HumanIK can not characterize a skeleton without the minimal definition
+			score *= minimalFound
+
+			results.append({"template": name, "score": score, "definition": definition, "overlap": overlap, "hierarchy": hierarchy})
+
+		results.sort(key=lambda result: result["score"], reverse=True)
+		return results
+
+
+	def detect(self, joints:list, parents:dict=None, minScore:float=0.5) -> tuple:
+		"""Returns the best matching template.
+
+		Args:
+			joints (list): Joint names, dag paths and namespaces are ignored.
+			parents (dict): Joint names mapped to the parent names.
+			minScore (float): Score the best template needs to reach.
+
+		Returns:
+			tuple: Template name and confidence - the score difference to the runner up, (None, 0.0) if no
+				template reaches the minimal score.
+
+		"""
+		results = self.score(joints, parents)
+		if not results or results[0]["score"] < minScore: return None, 0.0
+
+		runnerUp = results[1]["score"] if results.__len__() > 1 else 0.0
+		return results[0]["template"], results[0]["score"] - runnerUp
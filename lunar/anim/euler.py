@@ -0,0 +1,89 @@
+"""Vectorized euler filter.
+
+Removes the discontinuities of euler rotation tracks the same way maya's euler filter does - every
+frame picks the equivalent euler solution and the 360 degree offsets closest to the previous frame.
+
+"""
+
+# Built-in imports
+
+# Third-party imports
+import numpy as np
+
+# Custom imports
+import lunar.anim.quaternion as laq
+
+
+
+
+def axisIndices(orders, count:int) -> np.ndarray:
+	"""Returns the (first, middle, last) axis indices of the rotate orders, one row per channel.
+	"""
+	if isinstance(orders, str): orders = [orders] * count
+	return np.array([[laq.axisIndices[axis] for axis in order] for order in orders])
+
+
+def flipSolution(angles:np.ndarray, indices:np.ndarray) -> np.ndarray:
+	"""Returns the equivalent euler solution - first and last angle turned by 180, middle one mirrored.
+
+	Args:
+		angles (np.ndarray): Euler angles in radians (..., channels, 3).
+		indices (np.ndarray): Axis indices per channel (channels, 3).
+
+	"""
+	flipped = np.array(angles, dtype=float)
+	channels = np.arange(indices.shape[0])
+	first, middle, last = indices[:, 0], indices[:, 1], indices[:, 2]
+	flipped[..., channels, first] += np.pi
+	flipped[..., channels, middle] = np.pi - flipped[..., channels, middle]
+	flipped[..., channels, last] += np.pi
+
+	return flipped
+
+
+def wrap(angles:np.ndarray) -> np.ndarray:
+	"""Wraps the angles to the [-pi, pi] range.
+	"""
+	return angles - np.round(angles / (2.0 * np.pi)) * 2.0 * np.pi
+
+
+def closestTurn(angles:np.ndarray, reference:np.ndarray) -> np.ndarray:
+	"""Offsets the angles by full turns to be as close as possible to the reference angles.
+	"""
+	return angles + np.round((reference - angles) / (2.0 * np.pi)) * 2.0 * np.pi
+
+
+def filter(angles:np.ndarray, orders="xyz") -> np.ndarray:
+	"""Filters euler rotation tracks.
+
+	The choice between the two equivalent solutions does not depend on the solution picked on the
+	previous frame - flipping both frames keeps their distance - so the flips are a cumulative toggle
+	and the full turns a cumulative sum of the rounded frame to frame differences.
+
+	Args:
+		angles (np.ndarray): Euler angles in radians (frames, channels, 3), e.g. one channel per joint.
+		orders (str or list): Rotate order for all channels or a list with one order per channel.
+
+	Returns:
+		np.ndarray: Continuous euler angles describing the same rotations.
+
+	"""
+	angles = np.asarray(angles, dtype=float)
+	if angles.ndim == 2: return filter(angles[:, None], orders)[:, 0]
+	if angles.shape[0] < 2: return angles.copy()
+
+	indices = axisIndices(orders, angles.shape[1])
+	flipped = flipSolution(angles, indices)
+
+	# Per channel toggle the solution where the flipped one is closer to the previous frame
+	distance = np.abs(wrap(angles[1:] - angles[:-1])).sum(axis=-1)
+	distanceFlipped = np.abs(wrap(flipped[1:] - angles[:-1])).sum(axis=-1)
+	useFlipped = np.zeros(angles.shape[:2], dtype=bool)
+	useFlipped[1:] = np.cumsum(distanceFlipped < distance, axis=0) % 2 == 1
+	result = np.where(useFlipped[..., None], flipped, angles)
+
+	# Remove the full turns between the frames
+	turns = np.round(np.diff(result, axis=0) / (2.0 * np.pi))
+	result[1:] -= np.cumsum(turns, axis=0) * 2.0 * np.pi
+
+	return result
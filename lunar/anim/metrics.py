@@ -0,0 +1,108 @@
+"""Retarget quality metrics.
+
+Compares retargeted clips against golden clips of the same skeleton. All metrics are computed from
+world matrices (frames, joints, 4, 4) for all frames at once - rotation and position errors per
+joint, foot sliding while the feet are planted and the drift of the root.
+
+Matrices follow the maya row vector convention, see skeleton.py.
+
+"""
+
+# Built-in imports
+
+# Third-party imports
+import numpy as np
+
+# Custom imports
+import lunar.anim.skeleton as lans
+
+
+
+
+def rotationErrors(worldA:np.ndarray, worldB:np.ndarray) -> np.ndarray:
+	"""Returns the angles between the world rotations in degrees (frames, joints).
+	"""
+	relative = lans.orthonormalize(worldA[..., :3, :3]) @ np.swapaxes(lans.orthonormalize(worldB[..., :3, :3]), -1, -2)
+	cosines = (np.trace(relative, axis1=-2, axis2=-1) - 1.0) / 2.0
+	return np.degrees(np.arccos(np.clip(cosines, -1.0, 1.0)))
+
+
+def positionErrors(worldA:np.ndarray, worldB:np.ndarray) -> np.ndarray:
+	"""Returns the distances between the world positions (frames, joints).
+	"""
+	return np.linalg.norm(worldA[..., 3, :3] - worldB[..., 3, :3], axis=-1)
+
+
+def footSliding(positions:np.ndarray, contacts:np.ndarray, upAxis:int=1) -> np.ndarray:
+	"""Returns the ground plane distance the joints travel while in contact (joints,).
+
+	Args:
+		positions (np.ndarray): World positions (frames, joints, 3).
+		contacts (np.ndarray): Boolean contacts (frames, joints), see lunar.anim.contact.detect.
+		upAxis (int): Index of the up axis, ignored for the distance.
+
+	"""
+	steps = np.diff(positions, axis=0)
+	steps[..., upAxis] = 0.0
+	planted = contacts[1:] & contacts[:-1]
+	return (np.linalg.norm(steps, axis=-1) * planted).sum(axis=0)
+
+
+def rootDrift(rootA:np.ndarray, rootB:np.ndarray) -> np.ndarray:
+	"""Returns the distance between the root positions (frames,).
+	"""
+	return np.linalg.norm(rootA[..., 3, :3] - rootB[..., 3, :3], axis=-1)
+
+
+def compare(
+	world:np.ndarray,
+	goldenWorld:np.ndarray,
+	effectors:list,
+	feet:list,
+	root:int,
+	contacts:np.ndarray,
+	upAxis:int=1,
+) -> dict:
+	"""Computes the quality metrics of a clip against its golden clip.
+
+	Args:
+		world (np.ndarray): World matrices of the retargeted clip (frames, joints, 4, 4).
+		goldenWorld (np.ndarray): World matrices of the golden clip, same frames and joints.
+		effectors (list): Joint indices of the end effectors.
+		feet (list): Joint indices of the contact joints.
+		root (int): Joint index of the root, None to skip the root drift.
+		contacts (np.ndarray): Contacts of the feet detected on the golden clip (frames, feet).
+		upAxis (int): Index of the up axis.
+
+	Returns:
+		dict: Mean and max rotation errors in degrees, mean and max end effector position errors, foot
+			sliding of the clip and the difference to the golden clip, final and max root drift.
+
+	"""
+	frameCount = min(world.shape[0], goldenWorld.shape[0])
+	world, goldenWorld = world[:frameCount], goldenWorld[:frameCount]
+	contacts = contacts[:frameCount]
+
+	rotations = rotationErrors(world, goldenWorld)
+	positions = positionErrors(world[:, effectors], goldenWorld[:, effectors]) if effectors else np.zeros((frameCount, 1))
+	sliding = footSliding(world[:, feet, 3, :3], contacts, upAxis).sum() if feet else 0.0
+	goldenSliding = footSliding(goldenWorld[:, feet, 3, :3], contacts, upAxis).sum() if feet else 0.0
+	drift = rootDrift(world[:, root], goldenWorld[:, root]) if root is not None else np.zeros(frameCount)
+
+	return {
+		"frames": int(frameCount),
+		"rotationErrorMean": float(rotations.mean()),
+		"rotationErrorMax": float(rotations.max()),
+		"positionErrorMean": float(positions.mean()),
+		"positionErrorMax": float(positions.max()),
+		"footSliding": float(sliding),
+		"footSlidingDelta": float(sliding - goldenSliding),
+		"rootDrift": float(drift[-1]),
+		"rootDriftMax": float(drift.max()),
+	}
+
+
+def regressions(metrics:dict, thresholds:dict) -> list:
+	"""Returns the names of the metrics above their thresholds.
+	"""
+	return [name for name, threshold in thresholds.items() if name in metrics and metrics[name] > threshold]
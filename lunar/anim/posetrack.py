@@ -0,0 +1,221 @@
+"""In-memory pose track for baked animation.
+
+A pose track stores the sampled channels of a set of nodes as one contiguous float32 array with the
+shape (frames, nodes, channels). Processing stages - euler filter, retiming, key reduction - run on the
+arrays and the result is written to curves or a file in one go.
+
+Values are stored in internal units, rotations in radians and translations in centimeters.
+
+"""
+
+# Built-in imports
+
+# Third-party imports
+import numpy as np
+
+# Custom imports
+import lunar.anim.euler as lae
+import lunar.anim.reduce as lard
+import lunar.anim.retime as lar
+
+
+
+
+# Long attribute names to the channel names used by the pose track
+channelAliases = {
+	"translateX": "tx", "translateY": "ty", "translateZ": "tz",
+	"rotateX": "rx", "rotateY": "ry", "rotateZ": "rz",
+	"scaleX": "sx", "scaleY": "sy", "scaleZ": "sz",
+}
+
+
+
+
+class PoseTrack():
+	"""Sampled animation of multiple nodes.
+
+	Args:
+		data (np.ndarray): Samples (frames, nodes, channels), converted to contiguous float32.
+		nodes (list): Node names, one per entry of the second axis.
+		channels (tuple): Channel names, one per entry of the third axis.
+		startFrame (float): Time of the first sample in frames.
+		frameRate (float): Frames per second of the samples.
+		rotateOrders (list): Rotate order per node, defaults to xyz.
+
+	"""
+
+	def __init__(self,
+		data:np.ndarray,
+		nodes:list,
+		channels:tuple=("tx", "ty", "tz", "rx", "ry", "rz"),
+		startFrame:float=0.0,
+		frameRate:float=30.0,
+		sampleBy:float=1.0,
+		rotateOrders:list=None,
+	) -> None:
+		self.data = np.ascontiguousarray(data, dtype=np.float32)
+		self.nodes = list(nodes)
+		self.channels = tuple(channelAliases.get(channel, channel) for channel in channels)
+		self.startFrame = float(startFrame)
+		self.frameRate = float(frameRate)
+		self.sampleBy = float(sampleBy)
+		self.rotateOrders = list(rotateOrders) if rotateOrders else ["xyz"] * self.nodes.__len__()
+		self.nodeIndex = {node: index for index, node in enumerate(self.nodes)}
+
+		if self.data.shape[1:] != (self.nodes.__len__(), self.channels.__len__()):
+			raise ValueError(f"Data shape {self.data.shape} does not match {self.nodes.__len__()} nodes and {self.channels.__len__()} channels.")
+
+
+	def __repr__(self) -> str:
+		return f"PoseTrack({self.frameCount} frames, {self.nodes.__len__()} nodes, {self.channels}, {self.frameRate} fps)"
+
+
+	def __len__(self) -> int:
+		return self.frameCount
+
+
+	@property
+	def frameCount(self) -> int:
+		return self.data.shape[0]
+
+
+	@property
+	def endFrame(self) -> float:
+		return self.startFrame + (self.frameCount - 1) * self.sampleBy
+
+
+	def times(self) -> np.ndarray:
+		"""Returns the sample times in frames.
+		"""
+		return self.startFrame + np.arange(self.frameCount) * self.sampleBy
+
+
+	def channelIndices(self, channels:list) -> list:
+		return [self.channels.index(channelAliases.get(channel, channel)) for channel in channels]
+
+
+	def rotationIndices(self) -> list or None:
+		"""Returns the indices of the rx, ry, rz channels, None if the track has no rotations.
+		"""
+		if not all(channel in self.channels for channel in ("rx", "ry", "rz")): return None
+		return self.channelIndices(["rx", "ry", "rz"])
+
+
+	def get(self, node:str) -> np.ndarray:
+		"""Returns the samples of the node (frames, channels).
+		"""
+		return self.data[:, self.nodeIndex[node]]
+
+
+	def copy(self, data:np.ndarray=None, startFrame:float=None, sampleBy:float=None):
+		"""Returns a copy of the track, optionally with new samples.
+		"""
+		return PoseTrack(
+			self.data.copy() if data is None else data,
+			self.nodes,
+			self.channels,
+			self.startFrame if startFrame is None else startFrame,
+			self.frameRate,
+			self.sampleBy if sampleBy is None else sampleBy,
+			self.rotateOrders,
+		)
+
+
+	def subset(self, nodes:list):
+		"""Returns a new track with the specified nodes only.
+		"""
+		indices = [self.nodeIndex[node] for node in nodes]
+		return PoseTrack(
+			self.data[:, indices],
+			nodes,
+			self.channels,
+			self.startFrame,
+			self.frameRate,
+			self.sampleBy,
+			[self.rotateOrders[index] for index in indices],
+		)
+
+
+	def eulerFilter(self) -> None:
+		"""Euler filters the rotation channels in place.
+		"""
+		rotations = self.rotationIndices()
+		if rotations is None: return
+
+		angles = self.data[:, :, rotations].astype(np.float64)
+		self.data[:, :, rotations] = lae.filter(angles, self.rotateOrders)
+
+
+	def retime(self, scale:float=1.0, oversamplingRate:int=1):
+		"""Returns a resampled track, see lunar.anim.retime.sampleTimes.
+
+		The oversampling rate is relative to the sampling of the track, the new step between the samples
+		is sampleBy / oversamplingRate and has to divide a frame into whole samples.
+
+		Raises:
+			ValueError: If the new step does not divide a frame into whole samples.
+
+		"""
+		step = self.sampleBy / oversamplingRate
+		samplesPerFrame = int(round(1.0 / step))
+		if samplesPerFrame < 1 or not np.isclose(samplesPerFrame * step, 1.0):
+			raise ValueError(f"Oversampling rate {oversamplingRate} at sampleBy {self.sampleBy} does not give a whole number of samples per frame.")
+
+		times = self.times()
+		targetTimes, sourceTimes = lar.sampleTimes(self.startFrame, self.endFrame, scale, samplesPerFrame)
+
+		data = lar.interpolateLinear(times, self.data.astype(np.float64), sourceTimes)
+		rotations = self.rotationIndices()
+		if rotations is not None:
+			angles = self.data[:, :, rotations].astype(np.float64)
+			data[:, :, rotations] = lar.interpolateRotations(times, angles, sourceTimes, self.rotateOrders)
+
+		return self.copy(data, startFrame=float(targetTimes[0]), sampleBy=1.0 / samplesPerFrame)
+
+
+	def reduce(self, tolerances:np.ndarray) -> np.ndarray:
+		"""Returns the mask of the keys to keep.
+
+		Args:
+			tolerances (np.ndarray): Tolerances broadcastable to (nodes, channels).
+
+		Returns:
+			np.ndarray: Boolean mask (frames, nodes, channels).
+
+		"""
+		values = self.data.reshape(self.frameCount, -1).astype(np.float64)
+		tolerances = np.broadcast_to(np.asarray(tolerances, dtype=float), self.data.shape[1:]).ravel()
+		keep = lard.rdp(self.times(), values, tolerances)
+		keep = lard.removeStatic(values, keep, tolerances)
+
+		return keep.reshape(self.data.shape)
+
+
+	def save(self, filePath:str) -> None:
+		"""Saves the track to a compressed numpy file.
+		"""
+		np.savez_compressed(
+			filePath,
+			data=self.data,
+			nodes=np.array(self.nodes),
+			channels=np.array(self.channels),
+			rotateOrders=np.array(self.rotateOrders),
+			timing=np.array([self.startFrame, self.frameRate, self.sampleBy]),
+		)
+
+
+	@classmethod
+	def load(cls, filePath:str):
+		"""Loads a track saved with the save method.
+		"""
+		with np.load(filePath) as file:
+			startFrame, frameRate, sampleBy = file["timing"]
+			return cls(
+				file["data"],
+				file["nodes"].tolist(),
+				tuple(file["channels"].tolist()),
+				startFrame,
+				frameRate,
+				sampleBy,
+				file["rotateOrders"].tolist(),
+			)
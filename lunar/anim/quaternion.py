@@ -0,0 +1,185 @@
+"""Vectorized quaternion and euler utilities.
+
+All functions work on numpy arrays with the components in the last axis, quaternions are stored as
+(x, y, z, w). Euler angles are in radians and follow the maya rotate orders - 'xyz' rotates around x
+first, then y and then z.
+
+"""
+
+# Built-in imports
+
+# Third-party imports
+import numpy as np
+
+# Custom imports
+
+
+
+
+# Maya rotateOrder enum index to rotate order name
+rotateOrders = ("xyz", "yzx", "zxy", "xzy", "yxz", "zyx")
+axisIndices = {"x": 0, "y": 1, "z": 2}
+
+
+
+
+def normalize(q:np.ndarray) -> np.ndarray:
+	"""Returns the unit quaternions.
+	"""
+	return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+def conjugate(q:np.ndarray) -> np.ndarray:
+	"""Returns the conjugated quaternions - inverse for unit quaternions.
+	"""
+	return q * np.array([-1.0, -1.0, -1.0, 1.0])
+
+
+def multiply(a:np.ndarray, b:np.ndarray) -> np.ndarray:
+	"""Returns the hamilton product a * b - rotation b followed by rotation a.
+	"""
+	ax, ay, az, aw = np.moveaxis(a, -1, 0)
+	bx, by, bz, bw = np.moveaxis(b, -1, 0)
+	return np.stack((
+		aw * bx + ax * bw + ay * bz - az * by,
+		aw * by - ax * bz + ay * bw + az * bx,
+		aw * bz + ax * by - ay * bx + az * bw,
+		aw * bw - ax * bx - ay * by - az * bz,
+	), axis=-1)
+
+
+def rotate(q:np.ndarray, v:np.ndarray) -> np.ndarray:
+	"""Rotates the vectors by the unit quaternions.
+	"""
+	xyz = q[..., :3]
+	t = 2.0 * np.cross(xyz, v)
+	return v + q[..., 3:] * t + np.cross(xyz, t)
+
+
+def fromAxisAngle(axis:int, angle:np.ndarray) -> np.ndarray:
+	"""Returns quaternions for rotations around a single axis (0 - x, 1 - y, 2 - z).
+	"""
+	q = np.zeros(np.shape(angle) + (4,))
+	q[..., axis] = np.sin(angle * 0.5)
+	q[..., 3] = np.cos(angle * 0.5)
+	return q
+
+
+def fromEuler(angles:np.ndarray, order:str="xyz") -> np.ndarray:
+	"""Converts euler angles in radians to quaternions.
+
+	Args:
+		angles (np.ndarray): Array with the x, y, z angles in the last axis.
+		order (str): Rotate order.
+
+	"""
+	q = None
+	for axis in order:
+		index = axisIndices[axis]
+		qAxis = fromAxisAngle(index, angles[..., index])
+		q = qAxis if q is None else multiply(qAxis, q)
+
+	return q
+
+
+def toMatrix(q:np.ndarray) -> np.ndarray:
+	"""Converts unit quaternions to 3x3 rotation matrices acting on column vectors.
+	"""
+	x, y, z, w = np.moveaxis(q, -1, 0)
+	return np.stack((
+		np.stack((1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)), axis=-1),
+		np.stack((2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)), axis=-1),
+		np.stack((2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)), axis=-1),
+	), axis=-2)
+
+
+def fromMatrix(m:np.ndarray) -> np.ndarray:
+	"""Converts 3x3 rotation matrices acting on column vectors to unit quaternions.
+	"""
+	m00, m11, m22 = m[..., 0, 0], m[..., 1, 1], m[..., 2, 2]
+	# Pick the numerically most stable of the four solutions per matrix
+	candidates = np.stack((
+		1 + m00 - m11 - m22,
+		1 - m00 + m11 - m22,
+		1 - m00 - m11 + m22,
+		1 + m00 + m11 + m22,
+	), axis=-1)
+	case = np.argmax(candidates, axis=-1)
+	s = np.sqrt(np.maximum(np.take_along_axis(candidates, case[..., None], axis=-1)[..., 0], 1e-12)) * 2.0
+
+	q = np.empty(m.shape[:-2] + (4,))
+	solutions = (
+		(0.25 * s, (m[..., 0, 1] + m[..., 1, 0]) / s, (m[..., 0, 2] + m[..., 2, 0]) / s, (m[..., 2, 1] - m[..., 1, 2]) / s),
+		((m[..., 0, 1] + m[..., 1, 0]) / s, 0.25 * s, (m[..., 1, 2] + m[..., 2, 1]) / s, (m[..., 0, 2] - m[..., 2, 0]) / s),
+		((m[..., 0, 2] + m[..., 2, 0]) / s, (m[..., 1, 2] + m[..., 2, 1]) / s, 0.25 * s, (m[..., 1, 0] - m[..., 0, 1]) / s),
+		((m[..., 2, 1] - m[..., 1, 2]) / s, (m[..., 0, 2] - m[..., 2, 0]) / s, (m[..., 1, 0] - m[..., 0, 1]) / s, 0.25 * s),
+	)
+	for index, solution in enumerate(solutions):
+		mask = case == index
+		q[mask] = np.stack([component[mask] for component in solution], axis=-1)
+
+	return q
+
+
+def toEuler(q:np.ndarray, order:str="xyz") -> np.ndarray:
+	"""Converts unit quaternions to euler angles in radians.
+
+	Args:
+		q (np.ndarray): Array with quaternions in the last axis.
+		order (str): Rotate order.
+
+	Returns:
+		np.ndarray: Array with the x, y, z angles in the last axis.
+
+	"""
+	m = toMatrix(q)
+	i, j, k = (axisIndices[axis] for axis in order)
+	# Even permutations of xyz keep the sign, odd ones flip it
+	sign = 1.0 if (i, j, k) in ((0, 1, 2), (1, 2, 0), (2, 0, 1)) else -1.0
+
+	angles = np.empty(q.shape[:-1] + (3,))
+	angles[..., j] = np.arcsin(np.clip(-sign * m[..., k, i], -1.0, 1.0))
+	angles[..., i] = np.arctan2(sign * m[..., k, j], m[..., k, k])
+	angles[..., k] = np.arctan2(sign * m[..., j, i], m[..., i, i])
+
+	# Gimbal lock - the first and last axis are aligned, put the whole rotation into the first one
+	locked = np.abs(m[..., k, i]) > 1.0 - 1e-9
+	if np.any(locked):
+		angles[..., k][locked] = 0.0
+		angles[..., i][locked] = np.arctan2(-sign * m[..., j, k][locked], m[..., j, j][locked])
+
+	return angles
+
+
+def slerp(a:np.ndarray, b:np.ndarray, t:np.ndarray) -> np.ndarray:
+	"""Spherical linear interpolation along the shortest path.
+
+	Args:
+		a (np.ndarray): Start quaternions.
+		b (np.ndarray): End quaternions.
+		t (np.ndarray): Interpolation weights broadcastable to the quaternion arrays without the last axis.
+
+	"""
+	t = np.asarray(t, dtype=float)[..., None]
+	dot = np.sum(a * b, axis=-1, keepdims=True)
+	b = np.where(dot < 0.0, -b, b)
+	dot = np.abs(dot)
+
+	theta = np.arccos(np.clip(dot, -1.0, 1.0))
+	sinTheta = np.sin(theta)
+	# Fall back to linear interpolation for almost identical quaternions
+	linear = sinTheta < 1e-6
+	sinTheta = np.where(linear, 1.0, sinTheta)
+	wa = np.where(linear, 1.0 - t, np.sin((1.0 - t) * theta) / sinTheta)
+	wb = np.where(linear, t, np.sin(t * theta) / sinTheta)
+
+	return normalize(wa * a + wb * b)
+
+
+def makeContinuous(q:np.ndarray, axis:int=0) -> np.ndarray:
+	"""Flips the quaternion signs along the specified axis so neighbouring samples are in the same hemisphere.
+	"""
+	q = np.moveaxis(np.array(q, dtype=float), axis, 0)
+	dots = np.sum(q[1:] * q[:-1], axis=-1)
+	signs = np.concatenate((np.ones((1,) + dots.shape[1:]), np.cumprod(np.where(dots < 0.0, -1.0, 1.0), axis=0)))
+	return np.moveaxis(q * signs[..., None], 0, axis)
@@ -0,0 +1,118 @@
+"""Vectorized key reduction.
+
+Ramer-Douglas-Peucker reduction running on all channels at once. A key is kept when dropping it would
+move the linearly interpolated curve further than the channel tolerance, so the reduced curves with
+linear tangents stay within the tolerance of the dense curves.
+
+"""
+
+# Built-in imports
+
+# Third-party imports
+import numpy as np
+
+# Custom imports
+
+
+
+
+def interpolationError(times:np.ndarray, values:np.ndarray, keep:np.ndarray) -> np.ndarray:
+	"""Returns the absolute error of every sample against the linear interpolation of the kept keys.
+
+	Args:
+		times (np.ndarray): Sample times (frames,).
+		values (np.ndarray): Samples (frames, channels).
+		keep (np.ndarray): Kept keys (frames, channels), the first and last frame must be kept.
+
+	"""
+	frames = np.arange(times.size)[:, None]
+	# Index of the previous and the next kept key for every sample
+	previous = np.maximum.accumulate(np.where(keep, frames, 0), axis=0)
+	following = np.flip(np.minimum.accumulate(np.flip(np.where(keep, frames, times.size - 1), axis=0), axis=0), axis=0)
+
+	channels = np.arange(values.shape[1])[None, :]
+	t0, t1 = times[previous], times[following]
+	v0, v1 = values[previous, channels], values[following, channels]
+	span = np.where(t1 > t0, t1 - t0, 1.0)
+	interpolated = v0 + (v1 - v0) * (times[:, None] - t0) / span
+
+	return np.abs(values - interpolated)
+
+
+def rdp(times:np.ndarray, values:np.ndarray, tolerances) -> np.ndarray:
+	"""Reduces the keys of all channels at once.
+
+	The open segments of all channels are kept in flat arrays, every iteration measures the error of
+	their inner samples in one pass and splits the segments exceeding the tolerance at their largest
+	error. Finished segments drop out, so the work per iteration shrinks with the open segments and the
+	number of iterations depends on the curve complexity and not on the channel count.
+
+	Args:
+		times (np.ndarray): Sample times (frames,).
+		values (np.ndarray): Samples (frames, channels).
+		tolerances (float or np.ndarray): Maximum error per channel in the units of the values.
+
+	Returns:
+		np.ndarray: Boolean mask (frames, channels) of the keys to keep.
+
+	"""
+	times = np.asarray(times, dtype=float)
+	values = np.asarray(values, dtype=float)
+	frameCount, channelCount = values.shape
+	tolerances = np.broadcast_to(np.asarray(tolerances, dtype=float), (channelCount,))
+
+	keep = np.zeros((frameCount, channelCount), dtype=bool)
+	if frameCount == 0: return keep
+	keep[0] = keep[-1] = True
+	if frameCount < 3: return keep
+
+	# Channel major copies so the samples of a segment are contiguous
+	samples = np.ascontiguousarray(values.T).ravel()
+	sampleTimes = np.tile(times, channelCount)
+	channels = np.arange(channelCount)
+	starts = np.zeros(channelCount, dtype=np.intp)
+	ends = np.full(channelCount, frameCount - 1, dtype=np.intp)
+
+	while channels.size:
+		base = channels * frameCount
+		t0, t1 = times[starts], times[ends]
+		v0, v1 = samples[base + starts], samples[base + ends]
+		# Line through the segment ends, value = intercept + slope * time
+		slope = (v1 - v0) / np.where(t1 > t0, t1 - t0, 1.0)
+		intercept = v0 - slope * t0
+
+		# Flat indices of the inner samples of every open segment
+		counts = ends - starts - 1
+		offsets = np.cumsum(counts) - counts
+		index = np.arange(counts.sum()) + np.repeat(base + starts + 1 - offsets, counts)
+		error = np.abs(samples[index] - np.repeat(intercept, counts) - np.repeat(slope, counts) * sampleTimes[index])
+
+		# First sample with the largest error per segment
+		segmentMax = np.maximum.reduceat(error, offsets)
+		isMax = error >= np.repeat(segmentMax, counts)
+		split = index[np.minimum.reduceat(np.where(isMax, np.arange(error.size), error.size), offsets)] - base
+
+		exceeding = segmentMax > tolerances[channels]
+		channels, starts, ends, split = channels[exceeding], starts[exceeding], ends[exceeding], split[exceeding]
+		keep[split, channels] = True
+
+		# Split into the two halves, halves without inner samples are finished
+		channels = np.concatenate((channels, channels))
+		starts, ends = np.concatenate((starts, split)), np.concatenate((split, ends))
+		isOpen = ends - starts > 1
+		channels, starts, ends = channels[isOpen], starts[isOpen], ends[isOpen]
+
+	return keep
+
+
+def removeStatic(values:np.ndarray, keep:np.ndarray, tolerances) -> np.ndarray:
+	"""Reduces channels that stay within the tolerance of their first value to a single key.
+	"""
+	values = np.asarray(values, dtype=float)
+	tolerances = np.broadcast_to(np.asarray(tolerances, dtype=float), (values.shape[1],))
+	static = np.all(np.abs(values - values[:1]) <= tolerances[None, :], axis=0)
+
+	keep = np.array(keep)
+	keep[1:, static] = False
+
+	return keep
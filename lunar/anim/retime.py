@@ -0,0 +1,106 @@
+"""Vectorized retiming of sampled animation channels.
+
+Channels are stored as arrays with the samples in the first axis, e.g. (frames, joints, 3). All channels
+are resampled at once, rotations are interpolated on quaternions so the retimed poses do not suffer from
+euler interpolation artifacts.
+
+"""
+
+# Built-in imports
+
+# Third-party imports
+import numpy as np
+
+# Custom imports
+import lunar.anim.quaternion as laq
+
+
+
+
+def sampleTimes(startFrame:float, endFrame:float, scale:float=1.0, oversamplingRate:int=1) -> tuple:
+	"""Returns the new key times and the matching times on the source animation.
+
+	Args:
+		startFrame (float): First frame of the source animation, it stays in place.
+		endFrame (float): Last frame of the source animation.
+		scale (float): Length scale, 2.0 makes the animation two times longer - half the speed.
+		oversamplingRate (int): Number of keys per frame, 2 upreses a 30 fps clip to 60 fps.
+
+	Returns:
+		tuple: Target times and source times as numpy arrays.
+
+	"""
+	if scale <= 0.0: raise ValueError(f"Scale has to be positive, got: {scale}")
+	oversamplingRate = max(1, int(oversamplingRate))
+
+	count = int(round((endFrame - startFrame) * scale * oversamplingRate)) + 1
+	targetTimes = startFrame + np.arange(count) / oversamplingRate
+	sourceTimes = np.minimum(startFrame + (targetTimes - startFrame) / scale, endFrame)
+
+	return targetTimes, sourceTimes
+
+
+def bracket(times:np.ndarray, newTimes:np.ndarray) -> tuple:
+	"""Returns the indices of the surrounding samples and the interpolation weights for the new times.
+	"""
+	times = np.asarray(times, dtype=float)
+	newTimes = np.clip(np.asarray(newTimes, dtype=float), times[0], times[-1])
+	if times.size == 1: return np.zeros(newTimes.shape, dtype=int), np.zeros(newTimes.shape, dtype=int), np.zeros(newTimes.shape)
+
+	upper = np.clip(np.searchsorted(times, newTimes, side="right"), 1, times.size - 1)
+	lower = upper - 1
+	weights = (newTimes - times[lower]) / (times[upper] - times[lower])
+
+	return lower, upper, weights
+
+
+def interpolateLinear(times:np.ndarray, values:np.ndarray, newTimes:np.ndarray) -> np.ndarray:
+	"""Linearly resamples all channels at once.
+
+	Args:
+		times (np.ndarray): Sorted sample times (frames,).
+		values (np.ndarray): Samples with the frames in the first axis.
+		newTimes (np.ndarray): Times to sample at, clamped to the source range.
+
+	"""
+	values = np.asarray(values, dtype=float)
+	lower, upper, weights = bracket(times, newTimes)
+	weights = weights.reshape(weights.shape + (1,) * (values.ndim - 1))
+
+	return values[lower] * (1.0 - weights) + values[upper] * weights
+
+
+def interpolateRotations(times:np.ndarray, angles:np.ndarray, newTimes:np.ndarray, orders="xyz") -> np.ndarray:
+	"""Resamples euler rotations through quaternion slerp.
+
+	Args:
+		times (np.ndarray): Sorted sample times (frames,).
+		angles (np.ndarray): Euler angles in radians (frames, ..., 3).
+		newTimes (np.ndarray): Times to sample at, clamped to the source range.
+		orders (str or list): Rotate order for all channels or a list with one order per channel of the
+			second axis, e.g. per joint for (frames, joints, 3) arrays.
+
+	Returns:
+		np.ndarray: Resampled euler angles kept continuous with the source angles.
+
+	"""
+	angles = np.asarray(angles, dtype=float)
+	lower, upper, weights = bracket(times, newTimes)
+	result = np.empty((lower.size,) + angles.shape[1:])
+
+	if isinstance(orders, str):
+		groups = {orders: slice(None)}
+	else:
+		groups = {}
+		for index, order in enumerate(orders): groups.setdefault(order, []).append(index)
+
+	for order, channels in groups.items():
+		source = angles[:, channels]
+		q = laq.makeContinuous(laq.fromEuler(source, order))
+		w = weights.reshape(weights.shape + (1,) * (source.ndim - 2))
+		resampled = laq.toEuler(laq.slerp(q[lower], q[upper], w), order)
+		# Keep the euler solution close to the linearly interpolated source angles
+		reference = interpolateLinear(times, source, newTimes)
+		result[:, channels] = resampled + np.round((reference - resampled) / (2.0 * np.pi)) * 2.0 * np.pi
+
+	return result
@@ -0,0 +1,154 @@
+"""Root motion extraction and in-place conversion.
+
+The root trajectory is derived from the hips - the hips position projected on the ground plane and the
+hips facing rotated around the up axis, both optionally smoothed. Clips are converted by moving the
+root onto the trajectory and compensating the children of the root, or by keeping the root at rest for
+in-place clips. All frames are processed at once.
+
+Matrices follow the maya row vector convention, see skeleton.py.
+
+"""
+
+# Built-in imports
+
+# Third-party imports
+import numpy as np
+
+# Custom imports
+import lunar.anim.skeleton as lans
+
+
+
+
+def groundAxes(upAxis:int) -> tuple:
+	"""Returns the two ground plane axes, a rotation around the up axis turns the first into the second.
+	"""
+	return (upAxis + 1) % 3, (upAxis + 2) % 3
+
+
+def smooth(values:np.ndarray, window:int) -> np.ndarray:
+	"""Smooths the values along the first axis with a centered moving average.
+
+	Args:
+		values (np.ndarray): Values (frames, ...).
+		window (int): Width of the window in frames, values below 2 return the values unchanged.
+
+	Returns:
+		np.ndarray: Smoothed values, the ends are padded with the edge values.
+
+	"""
+	values = np.asarray(values, dtype=float)
+	window = int(window)
+	if window < 2 or values.shape[0] < 2: return values
+
+	before = window // 2
+	after = window - 1 - before
+	padded = np.concatenate((np.repeat(values[:1], before, axis=0), values, np.repeat(values[-1:], after, axis=0)))
+	cumulative = np.concatenate((np.zeros((1,) + values.shape[1:]), np.cumsum(padded, axis=0)))
+
+	return (cumulative[window:] - cumulative[:-window]) / window
+
+
+def heading(directions:np.ndarray, upAxis:int=1) -> np.ndarray:
+	"""Returns the continuous angles of the directions projected on the ground plane in radians.
+	"""
+	axisA, axisB = groundAxes(upAxis)
+	return np.unwrap(np.arctan2(directions[..., axisB], directions[..., axisA]), axis=0)
+
+
+def yawMatrices(angles:np.ndarray, upAxis:int=1) -> np.ndarray:
+	"""Returns the 3x3 row vector rotation matrices around the up axis.
+	"""
+	eulers = np.zeros(np.shape(angles) + (3,))
+	eulers[..., upAxis] = angles
+	return lans.eulerToMatrix(eulers, "xyz")
+
+
+def extractTrajectory(
+	hipsWorld:np.ndarray,
+	hipsRest:np.ndarray,
+	rootRest:np.ndarray,
+	upAxis:int=1,
+	positionSmoothing:int=0,
+	facingSmoothing:int=0,
+	extractFacing:bool=True,
+) -> np.ndarray:
+	"""Derives the root trajectory from the hips.
+
+	The facing is the rotation of the hips around the up axis relative to their rest orientation, so
+	it does not depend on the local axes of the skeleton.
+
+	Args:
+		hipsWorld (np.ndarray): World matrices of the hips (frames, 4, 4).
+		hipsRest (np.ndarray): World rest matrix of the hips (4, 4).
+		rootRest (np.ndarray): World rest matrix of the root (4, 4), its rotation is kept and its height
+			is used as the ground height.
+		upAxis (int): Index of the up axis, 1 for y up and 2 for z up scenes.
+		positionSmoothing (int): Moving average window in frames for the trajectory position.
+		facingSmoothing (int): Moving average window in frames for the trajectory facing.
+		extractFacing (bool): Whether or not the trajectory turns with the hips, otherwise it keeps the
+			rest rotation of the root.
+
+	Returns:
+		np.ndarray: World matrices of the trajectory (frames, 4, 4).
+
+	"""
+	hipsWorld = np.asarray(hipsWorld, dtype=float)
+	rootRest = np.asarray(rootRest, dtype=float)
+	frameCount = hipsWorld.shape[0]
+
+	trajectory = np.zeros((frameCount, 4, 4))
+	trajectory[:, 3, 3] = 1.0
+
+	positions = smooth(hipsWorld[:, 3, :3], positionSmoothing)
+	trajectory[:, 3, :3] = positions
+	trajectory[:, 3, upAxis] = rootRest[3, upAxis]
+
+	rotation = lans.orthonormalize(rootRest[:3, :3])
+	if extractFacing:
+		# World space rotation of the hips from the rest pose, applied to a ground axis
+		delta = np.linalg.inv(lans.orthonormalize(np.asarray(hipsRest, dtype=float)[:3, :3])) @ lans.orthonormalize(hipsWorld[:, :3, :3])
+		forward = np.zeros(3)
+		forward[groundAxes(upAxis)[0]] = 1.0
+		angles = smooth(heading(forward @ delta, upAxis), facingSmoothing)
+		trajectory[:, :3, :3] = rotation @ yawMatrices(angles, upAxis)
+	else:
+		trajectory[:, :3, :3] = rotation
+
+	return trajectory
+
+
+def convert(
+	rootWorld:np.ndarray,
+	childLocal:np.ndarray,
+	trajectory:np.ndarray,
+	inPlace:bool=False,
+	rootRest:np.ndarray=None,
+) -> tuple:
+	"""Moves the root onto the trajectory or removes the trajectory for an in-place clip.
+
+	The world transforms of the children of the root are preserved for root motion clips, in-place
+	clips keep the motion relative to the trajectory.
+
+	Args:
+		rootWorld (np.ndarray): World matrices of the root (frames, 4, 4).
+		childLocal (np.ndarray): Local matrices of the direct children of the root (frames, children, 4, 4).
+		trajectory (np.ndarray): World matrices of the trajectory (frames, 4, 4), see extractTrajectory.
+		inPlace (bool): Whether or not the root is kept at rest instead of following the trajectory.
+		rootRest (np.ndarray): World rest matrix of the root (4, 4), required for in-place clips.
+
+	Returns:
+		tuple: New root world matrices (frames, 4, 4) and child local matrices (frames, children, 4, 4).
+
+	"""
+	rootWorld = np.asarray(rootWorld, dtype=float)
+	trajectory = np.asarray(trajectory, dtype=float)
+
+	childLocal = np.asarray(childLocal, dtype=float) @ (rootWorld @ np.linalg.inv(trajectory))[:, None]
+	if inPlace:
+		if rootRest is None: raise ValueError("In-place conversion requires the rest matrix of the root.")
+		rootWorld = np.broadcast_to(np.asarray(rootRest, dtype=float), trajectory.shape).copy()
+	else:
+		rootWorld = trajectory.copy()
+
+	return rootWorld, childLocal
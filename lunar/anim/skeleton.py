@@ -0,0 +1,107 @@
+"""Joint transform math in the maya row vector convention.
+
+Matrices are (..., 4, 4) arrays with the translation in the last row, a world matrix is the local
+matrix multiplied by the parent world matrix. Joint local rotations follow maya's joint matrix
+rotateAxis * rotate * jointOrient, angles are in radians.
+
+"""
+
+# Built-in imports
+
+# Third-party imports
+import numpy as np
+
+# Custom imports
+import lunar.anim.quaternion as laq
+
+
+
+
+def eulerToMatrix(angles:np.ndarray, order:str="xyz") -> np.ndarray:
+	"""Returns the 3x3 row vector rotation matrices of the euler angles.
+	"""
+	return np.swapaxes(laq.toMatrix(laq.fromEuler(angles, order)), -1, -2)
+
+
+def matrixToEuler(matrix:np.ndarray, order:str="xyz") -> np.ndarray:
+	"""Returns the euler angles of the 3x3 row vector rotation matrices.
+	"""
+	return laq.toEuler(laq.fromMatrix(np.swapaxes(matrix, -1, -2)), order)
+
+
+def orthonormalize(matrix:np.ndarray) -> np.ndarray:
+	"""Removes scale and shear from the 3x3 rotation matrices.
+	"""
+	u, _, vt = np.linalg.svd(matrix)
+	return u @ vt
+
+
+def transferToJoints(
+	sourceWorld:np.ndarray,
+	parents:list,
+	parentWorld:np.ndarray,
+	translate:np.ndarray,
+	restTranslate:np.ndarray,
+	jointOrients:np.ndarray,
+	rotateAxes:np.ndarray,
+	rotateOrders:list,
+	solved:np.ndarray=None,
+) -> tuple:
+	"""Computes the local joint transforms matching the world orientation of the source nodes.
+
+	Equivalent of parent constraining every joint to its source node - the world rotation is taken
+	from the source, the translation as well if enabled for the joint, otherwise the joint keeps its
+	local translation. Joints without a source keep their rest local transform - the rest translation
+	with a zero rotation, so their children do not inherit any animation they had before.
+
+	Args:
+		sourceWorld (np.ndarray): World matrices of the source nodes (frames, joints, 4, 4).
+		parents (list): Index of the parent joint for every joint, parents have to come first, -1 for
+			joints whose parent is not transfered.
+		parentWorld (np.ndarray): World matrices of the parents that are not transfered (frames, joints,
+			4, 4), only read for joints with parent -1.
+		translate (np.ndarray): Boolean per joint, whether or not the translation is transfered.
+		restTranslate (np.ndarray): Local translation of the joints kept if not transfered (joints, 3).
+		jointOrients (np.ndarray): Joint orient angles (joints, 3).
+		rotateAxes (np.ndarray): Rotate axis angles (joints, 3).
+		rotateOrders (list): Rotate order per joint.
+		solved (np.ndarray): Boolean per joint, whether or not the joint follows its source node, joints
+			without a source keep their rest local transform, all joints follow a source if not specified.
+
+	Returns:
+		tuple: Local translations and euler rotations (frames, joints, 3).
+
+	"""
+	frameCount, jointCount = sourceWorld.shape[:2]
+	world = np.empty_like(sourceWorld)
+	translations = np.empty((frameCount, jointCount, 3))
+	rotations = np.empty((frameCount, jointCount, 3))
+
+	for joint in range(jointCount):
+		parent = world[:, parents[joint]] if parents[joint] >= 0 else parentWorld[:, joint]
+
+		# local rotation = rotateAxis * rotate * jointOrient
+		rotateAxis = eulerToMatrix(rotateAxes[joint], "xyz")
+		jointOrient = eulerToMatrix(jointOrients[joint], "xyz")
+
+		if solved is not None and not solved[joint]:
+			local = np.eye(4)
+			local[:3, :3] = rotateAxis @ jointOrient
+			local[3, :3] = restTranslate[joint]
+			world[:, joint] = local @ parent
+			translations[:, joint] = restTranslate[joint]
+			rotations[:, joint] = 0.0
+			continue
+
+		target = np.array(sourceWorld[:, joint])
+		target[:, :3, :3] = orthonormalize(target[:, :3, :3])
+		if not translate[joint]: target[:, 3, :3] = restTranslate[joint] @ parent[:, :3, :3] + parent[:, 3, :3]
+		world[:, joint] = target
+
+		local = target @ np.linalg.inv(parent)
+		translations[:, joint] = local[:, 3, :3]
+
+		rotate = rotateAxis.T @ orthonormalize(local[:, :3, :3]) @ jointOrient.T
+		rotations[:, joint] = matrixToEuler(rotate, rotateOrders[joint])
+
+	return translations, rotations
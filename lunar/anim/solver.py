@@ -0,0 +1,203 @@
+"""Forward kinematics retarget solver.
+
+Transfers animation between two skeletons without HumanIK. Both skeletons are described by their
+world rest matrices in a matching T-pose, the joints are paired through the HumanIK slot names of
+the 'definition' templates. World rotations of the paired joints are copied with the rest pose
+offsets applied, unpaired joints keep their rest local transforms and the hips translation is
+scaled by the leg length ratio.
+
+Matrices follow the maya row vector convention, see skeleton.py.
+
+"""
+
+# Built-in imports
+
+# Third-party imports
+import numpy as np
+
+# Custom imports
+import lunar.anim.quaternion as laq
+import lunar.anim.skeleton as lans
+
+
+
+
+# HumanIK slots used for measuring the leg length, left and right chains are averaged
+legChains = (
+	("LeftUpLeg", "LeftLeg", "LeftFoot"),
+	("RightUpLeg", "RightLeg", "RightFoot"),
+)
+
+
+
+
+def toQuaternions(matrices:np.ndarray) -> np.ndarray:
+	"""Returns the unit quaternions of the rotation part of the row vector matrices (..., 4, 4).
+	"""
+	return laq.fromMatrix(np.swapaxes(lans.orthonormalize(matrices[..., :3, :3]), -1, -2))
+
+
+def chainLength(restWorld:np.ndarray, chain:list) -> float:
+	"""Returns the summed bone lengths of the joint index chain.
+	"""
+	positions = restWorld[chain, 3, :3]
+	return float(np.linalg.norm(np.diff(positions, axis=0), axis=-1).sum())
+
+
+def legLength(restWorld:np.ndarray, indices:dict) -> float:
+	"""Returns the average leg length of the skeleton, 0.0 if no leg chain is complete.
+	"""
+	lengths = [
+		chainLength(restWorld, [indices[slot] for slot in chain])
+		for chain in legChains if all(slot in indices for slot in chain)
+	]
+	return float(np.mean(lengths)) if lengths else 0.0
+
+
+def getSlotIndices(definition:dict, joints:list) -> dict:
+	"""Maps the HumanIK slot names of the definition to the joint indices.
+
+	Args:
+		definition (dict): Template definition - slot name to {'id', 'node'}, slots with an id of 500 and
+			above are not part of the HumanIK skeleton and are skipped.
+		joints (list): Joint names without namespace in the order of the rest matrices.
+
+	Returns:
+		dict: Slot names mapped to joint indices for the joints present in the list.
+
+	"""
+	jointIndices = {joint: index for index, joint in enumerate(joints)}
+	return {
+		slot: jointIndices[entry["node"]]
+		for slot, entry in definition.items() if entry["id"] < 500 and entry["node"] in jointIndices
+	}
+
+
+
+
+class RetargetSolver():
+	"""Vectorized FK retarget between two skeletons.
+
+	The rest pose offsets are computed once, solve maps all frames at once.
+
+	"""
+
+	def __init__(self,
+		sourceRest:np.ndarray,
+		targetRest:np.ndarray,
+		targetParents:list,
+		pairs:list,
+		hips:tuple=None,
+		hipsScale:float=1.0,
+	) -> None:
+		"""Init method.
+
+		Args:
+			sourceRest (np.ndarray): World rest matrices of the source joints (sourceJoints, 4, 4).
+			targetRest (np.ndarray): World rest matrices of the target joints (targetJoints, 4, 4).
+			targetParents (list): Index of the parent for every target joint, parents have to come first,
+				-1 for joints without a solved parent.
+			pairs (list): (sourceIndex, targetIndex) tuples of the joints whose rotations are transfered.
+			hips (tuple): (sourceIndex, targetIndex) of the joints whose translation is transfered.
+			hipsScale (float): Scale of the hips translation relative to the rest position.
+
+		"""
+		self.sourceRest = np.asarray(sourceRest, dtype=float)
+		self.targetRest = np.asarray(targetRest, dtype=float)
+		self.targetParents = list(targetParents)
+		self.hips = hips
+		self.hipsScale = hipsScale
+
+		# Source joint and rest offset per paired target joint
+		self.sources = np.full(self.targetRest.shape[0], -1)
+		self.offsets = np.zeros((self.targetRest.shape[0], 4))
+		for sourceIndex, targetIndex in pairs:
+			self.sources[targetIndex] = sourceIndex
+			self.offsets[targetIndex] = laq.multiply(
+				laq.conjugate(toQuaternions(self.sourceRest[sourceIndex])),
+				toQuaternions(self.targetRest[targetIndex]),
+			)
+
+		# Rest local matrices of the target joints
+		self.targetLocal = np.array(self.targetRest)
+		for joint, parent in enumerate(self.targetParents):
+			if parent >= 0: self.targetLocal[joint] = self.targetRest[joint] @ np.linalg.inv(self.targetRest[parent])
+
+
+	@classmethod
+	def fromTemplates(cls,
+		sourceDefinition:dict,
+		sourceJoints:list,
+		sourceRest:np.ndarray,
+		targetDefinition:dict,
+		targetJoints:list,
+		targetRest:np.ndarray,
+		targetParents:list,
+	):
+		"""Creates the solver by pairing the joints through the template definitions.
+
+		The hips translation is scaled by the ratio of the target to the source leg length.
+
+		Args:
+			sourceDefinition (dict): Definition template of the source skeleton.
+			sourceJoints (list): Source joint names without namespace.
+			sourceRest (np.ndarray): World T-pose matrices of the source joints (sourceJoints, 4, 4).
+			targetDefinition (dict): Definition template of the target skeleton.
+			targetJoints (list): Target joint names without namespace, parents first.
+			targetRest (np.ndarray): World T-pose matrices of the target joints (targetJoints, 4, 4).
+			targetParents (list): Index of the parent for every target joint, -1 if not in the list.
+
+		Returns:
+			RetargetSolver: The solver.
+
+		"""
+		sourceIndices = getSlotIndices(sourceDefinition, sourceJoints)
+		targetIndices = getSlotIndices(targetDefinition, targetJoints)
+		pairs = [(sourceIndices[slot], targetIndices[slot]) for slot in targetIndices if slot in sourceIndices]
+
+		hips = (sourceIndices["Hips"], targetIndices["Hips"]) if "Hips" in sourceIndices and "Hips" in targetIndices else None
+		sourceLegLength = legLength(np.asarray(sourceRest, dtype=float), sourceIndices)
+		targetLegLength = legLength(np.asarray(targetRest, dtype=float), targetIndices)
+		hipsScale = targetLegLength / sourceLegLength if sourceLegLength and targetLegLength else 1.0
+
+		return cls(sourceRest, targetRest, targetParents, pairs, hips, hipsScale)
+
+
+	def solve(self, sourceWorld:np.ndarray) -> np.ndarray:
+		"""Maps the source world matrices onto the target skeleton.
+
+		Args:
+			sourceWorld (np.ndarray): World matrices of the source joints (frames, sourceJoints, 4, 4).
+
+		Returns:
+			np.ndarray: World matrices of the target joints (frames, targetJoints, 4, 4).
+
+		"""
+		sourceWorld = np.asarray(sourceWorld, dtype=float)
+		frameCount = sourceWorld.shape[0]
+		sourceRotations = toQuaternions(sourceWorld)
+
+		world = np.zeros((frameCount,) + self.targetRest.shape)
+		world[..., 3, 3] = 1.0
+		for joint, parent in enumerate(self.targetParents):
+			parentWorld = world[:, parent] if parent >= 0 else None
+
+			# Rotation
+			if self.sources[joint] >= 0:
+				rotation = laq.multiply(sourceRotations[:, self.sources[joint]], self.offsets[joint])
+				world[:, joint, :3, :3] = np.swapaxes(laq.toMatrix(rotation), -1, -2)
+			elif parentWorld is not None:
+				world[:, joint, :3, :3] = self.targetLocal[joint, :3, :3] @ parentWorld[:, :3, :3]
+			else:
+				world[:, joint, :3, :3] = self.targetRest[joint, :3, :3]
+
+			# Translation
+			if self.hips is not None and joint == self.hips[1]:
+				delta = sourceWorld[:, self.hips[0], 3, :3] - self.sourceRest[self.hips[0], 3, :3]
+				world[:, joint, 3, :3] = self.targetRest[joint, 3, :3] + delta * self.hipsScale
+			elif parentWorld is not None:
+				world[:, joint, 3, :3] = self.targetLocal[joint, 3, :3] @ parentWorld[:, :3, :3] + parentWorld[:, 3, :3]
+			else:
+				world[:, joint, 3, :3] = self.targetRest[joint, 3, :3]
+
+		return world
@@ -1,5 +1,8 @@
 # Built-in imports
 import json
+import time
+import fnmatch
+import hashlib
 import platform
 import subprocess
 import logging
@@ -11,8 +14,18 @@ from maya import mel
 import maya.OpenMaya as om
 import maya.OpenMayaAnim as oma
 from PySide2 import QtCore as qtc
+import numpy as np
 
 # Custom imports
+import lunar.anim.quaternion as laq
+import lunar.anim.euler as lae
+import lunar.anim.reduce as lard
+import lunar.anim.retime as lar
+import lunar.anim.rootmotion as larm
+import lunar.anim.contact as lac
+import lunar.anim.cleanup as lacl
+import lunar.anim.skeleton as lans
+from lunar.anim.posetrack import PoseTrack
 
 
 
@@ -227,28 +240,1643 @@ class LMTimeEditor():
 
 class LMAnimBake():
 	"""Wrappper class for custom baking.
+
+	Two engines are available - 'cmds' uses bakeResults, 'api' samples the plugs and writes each curve
+	with a single MFnAnimCurve.addKeys call. Ranges longer than chunkSize frames are baked in chunks
+	with bounded memory, see bakeTransformChunked. The api sampling strategy follows the evaluation
+	setup of the scene, see getStrategy.
+
 	"""
 
+	engine = "cmds"
+	chunkSize = None
+	# Sampling strategy 'cache', 'parallel' or 'dg', picked from the evaluation setup if not specified
+	strategy = None
+	# Seconds to wait for the cached playback to finish filling before reading from it
+	cacheTimeout = 10.0
+	# Strategy, frame count, duration and frames per second of the last sampling
+	report = {}
+
 	log = logging.getLogger("LMAnimBake")
 
 	@classmethod
-	def bakeTransform(cls, nodes:list, startEnd:tuple, preserveOutsideKeys:bool=True, simulation:bool=False, attributes:bool=['tx','ty','tz','rx','ry','rz']):
+	def bakeTransform(cls,
+		nodes:list,
+		startEnd:tuple,
+		preserveOutsideKeys:bool=True,
+		simulation:bool=False,
+		attributes:bool=['tx','ty','tz','rx','ry','rz'],
+		sampleBy:float=1,
+		layer:str=None,
+		engine:str=None,
+		chunkSize:int=None,
+	):
+		if not simulation and not layer and cls.isChunked(startEnd, sampleBy, chunkSize):
+			return cls.bakeTransformChunked(nodes, startEnd, chunkSize or cls.chunkSize, preserveOutsideKeys, attributes, sampleBy)
+
+		if (engine or cls.engine) == "api" and not simulation:
+			return cls.bakeTransformApi(nodes, startEnd, preserveOutsideKeys, attributes, sampleBy, layer)
+
+		kwargs = {"destinationLayer": layer} if layer else {}
 		cmds.bakeResults(
 			nodes,
 			attribute=attributes,
 			# animation="objects",
 			simulation=simulation,
 			time=startEnd,
-			sampleBy=1,
+			sampleBy=sampleBy,
 			oversamplingRate=1,
 			disableImplicitControl=True,
 			preserveOutsideKeys=preserveOutsideKeys,
 			sparseAnimCurveBake=False,
 			removeBakedAttributeFromLayer=False,
 			removeBakedAnimFromLayer=False,
-			# destinationLayer="BaseAnimation",
 			bakeOnOverrideLayer=False,
 			minimizeRotation=True,
 			controlPoints=False,
 			shape=False,
+			**kwargs,
 		)
+
+		return None
+
+
+	@classmethod
+	def getStartEnd(cls, startEnd:tuple) -> tuple:
+		return tuple(time.value() if isinstance(time, om.MTime) else float(time) for time in startEnd)
+
+
+	@classmethod
+	def isChunked(cls, startEnd:tuple, sampleBy:float=1, chunkSize:int=None) -> bool:
+		"""Returns whether or not the range is long enough to be baked in chunks.
+		"""
+		chunkSize = chunkSize or cls.chunkSize
+		if not chunkSize: return False
+
+		startFrame, endFrame = cls.getStartEnd(startEnd)
+		return (endFrame - startFrame) / sampleBy + 1 > chunkSize
+
+
+	@classmethod
+	def bakeTransformChunked(cls,
+		nodes:list,
+		startEnd:tuple,
+		chunkSize:int,
+		preserveOutsideKeys:bool=True,
+		attributes:list=['tx','ty','tz','rx','ry','rz'],
+		sampleBy:float=1,
+	) -> None:
+		"""Bakes consecutive frame windows so the memory use does not grow with the range length.
+
+		Every window is sampled into a small array, euler filtered against the last frame of the previous
+		window and appended to new unconnected curves. The curves replace the driving connections only
+		after the last window, so the source keeps driving the nodes during the whole bake. While the undo
+		queue records, the curves are created and connected with commands inside one undo chunk - the
+		keys are appended through the API, so the queue only holds the node changes. The queue is never
+		disabled here, batch runs disable it through LMBulkOperation.
+
+		Args:
+			nodes (list): Nodes to bake.
+			startEnd (tuple): Start and end frame as floats or MTime objects.
+			chunkSize (int): Number of frames sampled per window.
+			preserveOutsideKeys (bool): Whether or not to keep existing keys outside of the baked range.
+			attributes (list): Attributes to bake.
+			sampleBy (float): Step between the baked keys in frames.
+
+		"""
+		startFrame, endFrame = cls.getStartEnd(startEnd)
+		plugs = [f"{node}.{attribute}" for node in nodes for attribute in attributes]
+		rotateOrders = [laq.rotateOrders[cmds.getAttr(f"{node}.rotateOrder")] for node in nodes]
+
+		undoable = cmds.undoInfo(query=True, state=True)
+		if undoable: cmds.undoInfo(openChunk=True, chunkName="LMAnimBake.bakeTransformChunked")
+		try:
+			curveObjs = LMAnimCurves.createCurves(plugs, undoable)
+			previous = None
+			chunkStart = startFrame
+			while chunkStart <= endFrame:
+				times = np.arange(chunkStart, min(chunkStart + chunkSize * sampleBy, endFrame + sampleBy * 0.5), sampleBy)
+				values = cls.sample(plugs, times).reshape(times.size, nodes.__len__(), attributes.__len__())
+
+				# Keep the rotations continuous with the previous window
+				if previous is not None: values = np.concatenate((previous, values))
+				poseTrack = PoseTrack(values, nodes, attributes, rotateOrders=rotateOrders)
+				poseTrack.eulerFilter()
+				values = poseTrack.data[-times.size:].astype(np.float64)
+				previous = values[-1:]
+
+				LMAnimCurves.appendKeys(curveObjs, times, values.reshape(times.size, -1))
+				chunkStart = float(times[-1]) + sampleBy
+
+			LMAnimCurves.connectCurves(plugs, curveObjs, startFrame, endFrame, preserveOutsideKeys, undoable)
+
+		finally:
+			if undoable: cmds.undoInfo(closeChunk=True)
+
+		cls.log.debug(f"Baked {nodes.__len__()} nodes from '{startFrame}' to '{endFrame}' in chunks of {chunkSize} frames")
+		return None
+
+
+	@classmethod
+	def getStrategy(cls) -> str:
+		"""Returns the fastest sampling strategy available for the current evaluation setup.
+
+		'cache' - cached playback is enabled, stepping the time reads the frames from the evaluation cache.
+		'parallel' - the evaluation manager is active, stepping the time evaluates the graph in parallel.
+		'dg' - the evaluation manager is off, the plugs are pulled through a DG context per frame without
+		changing the current time.
+
+		"""
+		if cls.strategy: return cls.strategy
+		if cmds.evaluationManager(query=True, mode=True)[0] == "off": return "dg"
+
+		try:
+			if cmds.evaluator(name="cache", query=True, enable=True): return "cache"
+		except (RuntimeError, TypeError):
+			pass
+
+		return "parallel"
+
+
+	@classmethod
+	def evaluate(cls, times:np.ndarray, read, strategy:str=None) -> str:
+		"""Evaluates the scene at the specified times and calls read(frame, context) for each of them.
+
+		The current time is restored after the time stepping strategies. The used strategy and the
+		measured frames per second are stored in the report.
+
+		Returns:
+			str: The used strategy.
+
+		"""
+		strategy = strategy or cls.getStrategy()
+		uiUnit = om.MTime.uiUnit()
+		timeStart = time.perf_counter()
+
+		if strategy == "dg":
+			for frame, frameTime in enumerate(times): read(frame, om.MDGContext(om.MTime(float(frameTime), uiUnit)))
+		else:
+			if strategy == "cache":
+				try: cmds.cacheEvaluator(waitForCache=cls.cacheTimeout)
+				except (RuntimeError, TypeError): strategy = "parallel"
+
+			timeCurrent = oma.MAnimControl.currentTime()
+			try:
+				for frame, frameTime in enumerate(times):
+					oma.MAnimControl.setCurrentTime(om.MTime(float(frameTime), uiUnit))
+					read(frame, om.MDGContext.fsNormal)
+			finally:
+				oma.MAnimControl.setCurrentTime(timeCurrent)
+
+		duration = time.perf_counter() - timeStart
+		cls.report = {
+			"strategy": strategy,
+			"frames": int(times.size),
+			"duration": duration,
+			"fps": times.size / duration if duration else 0.0,
+		}
+		cls.log.info(f"Sampled {times.size} frames with the '{strategy}' strategy at {cls.report['fps']:.1f} fps")
+		return strategy
+
+
+	@classmethod
+	def sample(cls, plugs:list, times:np.ndarray, strategy:str=None) -> np.ndarray:
+		"""Evaluates the plugs at the specified times.
+
+		Returns:
+			np.ndarray: Values in internal units (frames, plugs).
+
+		"""
+		mPlugs = LMAnimCurves.getPlugs(plugs)
+		values = np.empty((times.size, mPlugs.__len__()))
+
+		def read(frame, context):
+			values[frame] = [mPlug.asDouble(context) for mPlug in mPlugs]
+
+		cls.evaluate(times, read, strategy)
+		return values
+
+
+	@classmethod
+	def sampleMatrices(cls, plugs:list, times:np.ndarray, strategy:str=None) -> np.ndarray:
+		"""Evaluates matrix plugs e.g. 'node.worldMatrix[0]' at the specified times.
+
+		Returns:
+			np.ndarray: Matrices in internal units (frames, plugs, 4, 4).
+
+		"""
+		mPlugs = LMAnimCurves.getPlugs(plugs)
+		matrices = np.empty((times.size, mPlugs.__len__(), 4, 4))
+
+		def read(frame, context):
+			matrices[frame] = cls.readMatrices(mPlugs, context)
+
+		cls.evaluate(times, read, strategy)
+		return matrices
+
+
+	@classmethod
+	def readMatrices(cls, plugs:list, context:om.MDGContext=None) -> np.ndarray:
+		"""Reads matrix plugs in the current state or the given context without changing the time.
+
+		Args:
+			plugs (list): Plug names or MPlug objects.
+			context (MDGContext): Evaluation context, the normal context is used if not specified.
+
+		Returns:
+			np.ndarray: Matrices in internal units (plugs, 4, 4).
+
+		"""
+		if context is None: context = om.MDGContext.fsNormal
+		mPlugs = plugs if plugs and isinstance(plugs[0], om.MPlug) else LMAnimCurves.getPlugs(plugs)
+
+		matrices = np.empty((mPlugs.__len__(), 4, 4))
+		for index, mPlug in enumerate(mPlugs):
+			matrix = om.MFnMatrixData(mPlug.asMObject(context)).matrix()
+			matrices[index] = [[matrix(row, column) for column in range(4)] for row in range(4)]
+
+		return matrices
+
+
+	@classmethod
+	def bakePoseTrack(cls, nodes:list, startEnd:tuple, attributes:list=['tx','ty','tz','rx','ry','rz'], sampleBy:float=1) -> PoseTrack:
+		"""Samples the attributes of the nodes into a pose track without writing any curves.
+
+		Args:
+			nodes (list): Nodes to sample.
+			startEnd (tuple): Start and end frame as floats or MTime objects.
+			attributes (list): Attributes to sample, they become the channels of the track.
+			sampleBy (float): Step between the samples in frames.
+
+		Returns:
+			PoseTrack: Track with the sampled values in internal units.
+
+		"""
+		startFrame, endFrame = cls.getStartEnd(startEnd)
+		times = np.arange(startFrame, endFrame + sampleBy * 0.5, sampleBy)
+		plugs = [f"{node}.{attribute}" for node in nodes for attribute in attributes]
+
+		values = cls.sample(plugs, times)
+		rotateOrders = [laq.rotateOrders[cmds.getAttr(f"{node}.rotateOrder")] for node in nodes]
+		frameRate = om.MTime(1.0, om.MTime.kSeconds).asUnits(om.MTime.uiUnit())
+
+		return PoseTrack(values.reshape(times.size, nodes.__len__(), attributes.__len__()), nodes, attributes, startFrame, frameRate, sampleBy, rotateOrders)
+
+
+	@classmethod
+	def bakeTransformApi(cls,
+		nodes:list,
+		startEnd:tuple,
+		preserveOutsideKeys:bool=True,
+		attributes:list=['tx','ty','tz','rx','ry','rz'],
+		sampleBy:float=1,
+		layer:str=None,
+	) -> PoseTrack:
+		"""Bakes the attributes of the nodes through the api instead of bakeResults.
+
+		All frames are evaluated into a pose track first, the rotations are euler filtered on the arrays
+		and afterwards the incoming connections are removed and every curve is written with a single
+		addKeys call.
+
+		Args:
+			nodes (list): Nodes to bake.
+			startEnd (tuple): Start and end frame as floats or MTime objects.
+			preserveOutsideKeys (bool): Whether or not to keep existing keys outside of the baked range.
+			attributes (list): Attributes to bake.
+			sampleBy (float): Step between the baked keys in frames.
+			layer (str): Animation layer to bake to, the base animation is used if not specified.
+
+		Returns:
+			PoseTrack: The baked pose track.
+
+		"""
+		poseTrack = cls.bakePoseTrack(nodes, startEnd, attributes, sampleBy)
+		poseTrack.eulerFilter()
+		LMAnimCurves.writePoseTrack(poseTrack, preserveOutsideKeys=preserveOutsideKeys, layer=layer)
+
+		cls.log.debug(f"Baked {nodes.__len__()} nodes from '{poseTrack.startFrame}' to '{poseTrack.endFrame}'")
+		return poseTrack
+
+
+
+
+class LMAnimCurves():
+	"""Bulk reading and writing of animation curves as numpy arrays.
+
+	Values are read and written in ui units - degrees for rotations, the plugs animation curves are
+	rebuilt with a single MFnAnimCurve.addKeys call per curve.
+
+	"""
+
+	# Node types of the timed animation curves
+	curveNodeTypes = {
+		oma.MFnAnimCurve.kAnimCurveTA: "animCurveTA",
+		oma.MFnAnimCurve.kAnimCurveTL: "animCurveTL",
+		oma.MFnAnimCurve.kAnimCurveTT: "animCurveTT",
+		oma.MFnAnimCurve.kAnimCurveTU: "animCurveTU",
+	}
+
+	log = logging.getLogger("LMAnimCurves")
+
+
+	@classmethod
+	def listCurves(cls, nodes:list, attributes:list=["tx", "ty", "tz", "rx", "ry", "rz"]) -> OrderedDict:
+		"""Returns the animation curves directly connected to the nodes attributes.
+
+		Returns:
+			OrderedDict: Plug names built from the given node and attribute names mapped to the animation
+				curve names, plugs without a curve are skipped.
+
+		"""
+		curves = OrderedDict()
+		if not nodes: return curves
+
+		selectionList = om.MSelectionList()
+		for node in nodes: selectionList.add(node)
+
+		obj = om.MObject()
+		connections = om.MPlugArray()
+		for index, node in enumerate(nodes):
+			selectionList.getDependNode(index, obj)
+			fnNode = om.MFnDependencyNode(obj)
+			for attribute in attributes:
+				fnNode.findPlug(attribute, False).connectedTo(connections, True, False)
+				if connections.length() and connections[0].node().hasFn(om.MFn.kAnimCurve):
+					curves[f"{node}.{attribute}"] = om.MFnDependencyNode(connections[0].node()).name()
+
+		return curves
+
+
+	@classmethod
+	def read(cls, curves:list) -> tuple:
+		"""Reads the keys of the specified curves.
+
+		Curves with different key times are resampled linearly onto the union of all key times.
+
+		Returns:
+			tuple: Key times (frames,) and values (frames, curves) numpy arrays.
+
+		"""
+		if not curves: return np.zeros(0), np.zeros((0, 0))
+
+		times = np.array(cmds.keyframe(curves, query=True, timeChange=True), dtype=float)
+		values = np.array(cmds.keyframe(curves, query=True, valueChange=True), dtype=float)
+		if times.size % curves.__len__() == 0:
+			times = times.reshape(curves.__len__(), -1)
+			values = values.reshape(curves.__len__(), -1)
+			if np.all(times == times[0]): return times[0], values.T
+
+		# Curves with differing keys
+		curveTimes = [np.array(cmds.keyframe(curve, query=True, timeChange=True), dtype=float) for curve in curves]
+		curveValues = [np.array(cmds.keyframe(curve, query=True, valueChange=True), dtype=float) for curve in curves]
+		times = np.unique(np.concatenate(curveTimes))
+		values = np.stack([np.interp(times, keyTimes, keyValues) for keyTimes, keyValues in zip(curveTimes, curveValues)], axis=-1)
+
+		return times, values
+
+
+	@classmethod
+	def getPlugs(cls, plugs:list) -> list[om.MPlug]:
+		"""Returns the MPlug objects for the specified plug names.
+		"""
+		selectionList = om.MSelectionList()
+		for plug in plugs: selectionList.add(plug)
+
+		mPlugs = []
+		for index in range(plugs.__len__()):
+			mPlug = om.MPlug()
+			selectionList.getPlug(index, mPlug)
+			mPlugs.append(mPlug)
+
+		return mPlugs
+
+
+	@classmethod
+	def removeKeysInRange(cls, fnCurve:oma.MFnAnimCurve, startFrame:float, endFrame:float) -> None:
+		"""Removes the keys of the curve in the specified frame range.
+		"""
+		for index in reversed(range(fnCurve.numKeys())):
+			time = fnCurve.time(index).asUnits(om.MTime.uiUnit())
+			if startFrame <= time <= endFrame: fnCurve.remove(index)
+
+
+	@classmethod
+	def getLayerCurve(cls, plug:str, layer:str, time:float) -> om.MObject:
+		"""Returns the animation curve of the plug on the specified animation layer, creates it if needed.
+		"""
+		cmds.animLayer(layer, edit=True, attribute=plug)
+		curve = cmds.animLayer(layer, query=True, findCurveForPlug=plug)
+		if not curve:
+			cmds.setKeyframe(plug, animLayer=layer, time=time)
+			curve = cmds.animLayer(layer, query=True, findCurveForPlug=plug)
+
+		selectionList = om.MSelectionList()
+		selectionList.add(curve[0])
+		obj = om.MObject()
+		selectionList.getDependNode(0, obj)
+
+		return obj
+
+
+	@classmethod
+	def write(cls,
+		plugs:list,
+		times:np.ndarray,
+		values:np.ndarray,
+		tangentType=oma.MFnAnimCurve.kTangentGlobal,
+		internalUnits:bool=False,
+		preserveOutsideKeys:bool=False,
+		layer:str=None,
+		keep:np.ndarray=None,
+	) -> list:
+		"""Replaces the animation of the specified plugs.
+
+		Incoming connections of the plugs - constraints, pairBlends, etc. are disconnected.
+
+		Args:
+			plugs (list): Plug names e.g. 'Output:root.rx'.
+			times (np.ndarray): Key times in the current time unit (frames,).
+			values (np.ndarray): Key values (frames, plugs).
+			tangentType (MFnAnimCurve.TangentType): In and out tangent type of all keys.
+			internalUnits (bool): Whether the values are in internal units - radians and centimeters or in
+				ui units.
+			preserveOutsideKeys (bool): Whether or not to keep the existing keys outside of the written range.
+			layer (str): Animation layer to write the keys to, the base animation is used if not specified.
+			keep (np.ndarray): Optional boolean mask (frames, plugs) with the keys to write per plug.
+
+		Returns:
+			list: Names of the written animation curves.
+
+		"""
+		startFrame, endFrame = float(times[0]), float(times[-1])
+		timeArray = om.MTimeArray()
+		for time in times: timeArray.append(om.MTime(float(time), om.MTime.uiUnit()))
+
+		mPlugs = cls.getPlugs(plugs)
+
+		# Disconnect everything except the curves that are kept, all in one modifier
+		curveObjs = [None] * mPlugs.__len__()
+		dgModifier = om.MDGModifier()
+		connections = om.MPlugArray()
+		if not layer:
+			for index, mPlug in enumerate(mPlugs):
+				mPlug.connectedTo(connections, True, False)
+				if not connections.length(): continue
+				sourceObj = connections[0].node()
+				if sourceObj.hasFn(om.MFn.kAnimCurve):
+					if preserveOutsideKeys:
+						curveObjs[index] = sourceObj
+						continue
+					dgModifier.deleteNode(sourceObj)
+				else:
+					dgModifier.disconnect(connections[0], mPlug)
+			dgModifier.doIt()
+
+		curves = []
+		for index, mPlug in enumerate(mPlugs):
+			fnCurve = oma.MFnAnimCurve()
+			if layer:
+				fnCurve.setObject(cls.getLayerCurve(plugs[index], layer, startFrame))
+				cls.removeKeysInRange(fnCurve, startFrame, endFrame)
+			elif curveObjs[index] is not None:
+				fnCurve.setObject(curveObjs[index])
+				cls.removeKeysInRange(fnCurve, startFrame, endFrame)
+			else:
+				fnCurve.create(mPlug)
+
+			# Curves store internal units - radians and centimeters
+			column = values[:, index]
+			if not internalUnits:
+				if fnCurve.animCurveType() in (oma.MFnAnimCurve.kAnimCurveTA, oma.MFnAnimCurve.kAnimCurveUA):
+					column = column * om.MAngle.uiToInternal(1.0)
+				elif fnCurve.animCurveType() in (oma.MFnAnimCurve.kAnimCurveTL, oma.MFnAnimCurve.kAnimCurveUL):
+					column = column * om.MDistance.uiToInternal(1.0)
+
+			curveTimes = timeArray
+			if keep is not None:
+				column = column[keep[:, index]]
+				curveTimes = om.MTimeArray()
+				for time in times[keep[:, index]]: curveTimes.append(om.MTime(float(time), om.MTime.uiUnit()))
+
+			valueArray = om.MDoubleArray()
+			for value in column: valueArray.append(float(value))
+
+			fnCurve.addKeys(curveTimes, valueArray, tangentType, tangentType, fnCurve.numKeys() > 0)
+			curves.append(fnCurve.name())
+
+		return curves
+
+
+	@classmethod
+	def createCurves(cls, plugs:list, undoable:bool=False) -> list[om.MObject]:
+		"""Creates empty animation curves matching the plugs types without connecting them.
+
+		Args:
+			plugs (list): Plug names e.g. 'Output:root.rx'.
+			undoable (bool): Whether or not the curves are created with createNode so they are removed on
+				undo, otherwise they are created through the API.
+
+		"""
+		curveObjs = []
+		fnCurve = oma.MFnAnimCurve()
+		for mPlug in cls.getPlugs(plugs):
+			curveType = fnCurve.timedAnimCurveTypeForPlug(mPlug)
+			if not undoable:
+				curveObjs.append(fnCurve.create(curveType))
+				continue
+
+			selectionList = om.MSelectionList()
+			selectionList.add(cmds.createNode(cls.curveNodeTypes[curveType], skipSelect=True))
+			curveObj = om.MObject()
+			selectionList.getDependNode(0, curveObj)
+			curveObjs.append(curveObj)
+
+		return curveObjs
+
+
+	@classmethod
+	def appendKeys(cls, curveObjs:list, times:np.ndarray, values:np.ndarray, tangentType=oma.MFnAnimCurve.kTangentGlobal) -> None:
+		"""Appends keys in internal units (frames, curves) to the curves.
+		"""
+		timeArray = om.MTimeArray()
+		for time in times: timeArray.append(om.MTime(float(time), om.MTime.uiUnit()))
+
+		fnCurve = oma.MFnAnimCurve()
+		for index, curveObj in enumerate(curveObjs):
+			fnCurve.setObject(curveObj)
+			valueArray = om.MDoubleArray()
+			for value in values[:, index]: valueArray.append(float(value))
+			fnCurve.addKeys(timeArray, valueArray, tangentType, tangentType, True)
+
+
+	@classmethod
+	def connectCurves(cls,
+		plugs:list,
+		curveObjs:list,
+		startFrame:float,
+		endFrame:float,
+		preserveOutsideKeys:bool=False,
+		undoable:bool=False,
+	) -> None:
+		"""Replaces the incoming connections of the plugs with the curves in a single modifier.
+
+		Keys of the replaced curves outside of the start and end frame are copied over if requested.
+
+		Args:
+			undoable (bool): Whether or not the connections are replaced with commands which go to the undo
+				queue instead of the modifier.
+
+		"""
+		dgModifier = om.MDGModifier()
+		connections = om.MPlugArray()
+		fnCurve = oma.MFnAnimCurve()
+		fnCurveOld = oma.MFnAnimCurve()
+		for plug, mPlug, curveObj in zip(plugs, cls.getPlugs(plugs), curveObjs):
+			curveOutput = om.MFnDependencyNode(curveObj).findPlug("output", False)
+			mPlug.connectedTo(connections, True, False)
+			if connections.length():
+				sourceObj = connections[0].node()
+				if sourceObj.hasFn(om.MFn.kAnimCurve):
+					if preserveOutsideKeys:
+						fnCurve.setObject(curveObj)
+						fnCurveOld.setObject(sourceObj)
+						for index in range(fnCurveOld.numKeys()):
+							time = fnCurveOld.time(index)
+							if not startFrame <= time.asUnits(om.MTime.uiUnit()) <= endFrame:
+								fnCurve.addKey(time, fnCurveOld.value(index))
+					if undoable: cmds.delete(om.MFnDependencyNode(sourceObj).name())
+					else: dgModifier.deleteNode(sourceObj)
+				elif not undoable:
+					dgModifier.disconnect(connections[0], mPlug)
+
+			# The forced connection replaces the remaining incoming connection
+			if undoable: cmds.connectAttr(curveOutput.name(), plug, force=True)
+			else: dgModifier.connect(curveOutput, mPlug)
+
+		if not undoable: dgModifier.doIt()
+
+
+	@classmethod
+	def writePoseTrack(cls,
+		poseTrack:PoseTrack,
+		keep:np.ndarray=None,
+		tangentType=oma.MFnAnimCurve.kTangentGlobal,
+		preserveOutsideKeys:bool=False,
+		layer:str=None,
+	) -> list:
+		"""Writes all channels of the pose track to animation curves in one bulk operation.
+
+		Args:
+			poseTrack (PoseTrack): Track with values in internal units.
+			keep (np.ndarray): Optional boolean mask (frames, nodes, channels) with the keys to write.
+
+		Returns:
+			list: Names of the written animation curves.
+
+		"""
+		plugs = [f"{node}.{channel}" for node in poseTrack.nodes for channel in poseTrack.channels]
+		values = poseTrack.data.reshape(poseTrack.frameCount, -1).astype(np.float64)
+		if keep is not None: keep = keep.reshape(poseTrack.frameCount, -1)
+
+		return cls.write(plugs, poseTrack.times(), values, tangentType, True, preserveOutsideKeys, layer, keep)
+
+
+	@classmethod
+	def readPoseTrack(cls, nodes:list, attributes:list=["tx", "ty", "tz", "rx", "ry", "rz"]) -> PoseTrack or None:
+		"""Reads the animation curves of the nodes into a pose track.
+
+		Channels without a curve are filled with their current value.
+
+		"""
+		curves = cls.listCurves(nodes, attributes)
+		if not curves: return None
+
+		plugs = [f"{node}.{attribute}" for node in nodes for attribute in attributes]
+		times, values = cls.read(list(curves.values()))
+		columns = {plug: index for index, plug in enumerate(curves.keys())}
+
+		data = np.empty((times.size, plugs.__len__()))
+		for index, plug in enumerate(plugs):
+			data[:, index] = values[:, columns[plug]] if plug in columns else cmds.getAttr(plug)
+
+		# Curves are read in ui units, the pose track stores internal units
+		mPlugs = cls.getPlugs(plugs)
+		for index, mPlug in enumerate(mPlugs):
+			unitType = om.MFnUnitAttribute(mPlug.attribute()).unitType() if mPlug.attribute().hasFn(om.MFn.kUnitAttribute) else None
+			if unitType == om.MFnUnitAttribute.kAngle: data[:, index] *= om.MAngle.uiToInternal(1.0)
+			elif unitType == om.MFnUnitAttribute.kDistance: data[:, index] *= om.MDistance.uiToInternal(1.0)
+
+		rotateOrders = [laq.rotateOrders[cmds.getAttr(f"{node}.rotateOrder")] for node in nodes]
+		frameRate = om.MTime(1.0, om.MTime.kSeconds).asUnits(om.MTime.uiUnit())
+		sampleBy = float(times[1] - times[0]) if times.size > 1 else 1.0
+
+		return PoseTrack(data.reshape(times.size, nodes.__len__(), attributes.__len__()), nodes, attributes, times[0], frameRate, sampleBy, rotateOrders)
+
+
+
+
+class LMAnimRetime():
+	"""Retiming of baked animation without re-evaluating the scene.
+
+	Oversampled keys sit in between the frames of the scene, the fbx export resamples the animation at
+	the scene frame rate and would drop them. The scene is switched to the oversampled frame rate before
+	the export, see setOversampledTimeUnit.
+
+	"""
+
+	# Maya time unit names of the frame rates supported by all maya versions
+	timeUnits = {
+		2: "2fps", 3: "3fps", 4: "4fps", 5: "5fps", 6: "6fps", 8: "8fps", 10: "10fps", 12: "12fps",
+		15: "game", 16: "16fps", 20: "20fps", 24: "film", 25: "pal", 30: "ntsc", 40: "40fps", 48: "show",
+		50: "palf", 60: "ntscf", 75: "75fps", 80: "80fps", 100: "100fps", 120: "120fps", 125: "125fps",
+		150: "150fps", 200: "200fps", 240: "240fps", 250: "250fps", 300: "300fps", 375: "375fps",
+		400: "400fps", 500: "500fps", 600: "600fps", 750: "750fps", 1200: "1200fps", 1500: "1500fps",
+		2000: "2000fps", 3000: "3000fps", 6000: "6000fps",
+	}
+
+	log = logging.getLogger("LMAnimRetime")
+
+
+	@classmethod
+	def getFrameRate(cls) -> float:
+		"""Returns the frames per second of the current time unit.
+		"""
+		return om.MTime(1.0, om.MTime.kSeconds).asUnits(om.MTime.uiUnit())
+
+
+	@classmethod
+	def getTimeUnit(cls, frameRate:float) -> str:
+		"""Returns the maya time unit name of the frame rate.
+
+		Raises:
+			ValueError: If maya has no time unit for the frame rate.
+
+		"""
+		rate = int(round(frameRate))
+		if abs(frameRate - rate) > 1e-6 or rate not in cls.timeUnits:
+			raise ValueError(f"There is no maya time unit for {frameRate:g} fps, supported rates are: {sorted(cls.timeUnits)}")
+
+		return cls.timeUnits[rate]
+
+
+	@classmethod
+	def setOversampledTimeUnit(cls, oversamplingRate:int) -> str or None:
+		"""Switches the scene to the oversampled frame rate, the keys keep their time in seconds.
+
+		Frame numbers are multiplied by the oversampling rate, the keys in between the frames land on
+		whole frames and the fbx export writes them at the higher frame rate.
+
+		Returns:
+			str or None: The previous time unit to restore, None if the rate is not changed.
+
+		Raises:
+			ValueError: If maya has no time unit for the oversampled frame rate.
+
+		"""
+		if oversamplingRate <= 1: return None
+
+		frameRate = cls.getFrameRate() * oversamplingRate
+		timeUnit = cls.getTimeUnit(frameRate)
+		previous = cmds.currentUnit(query=True, time=True)
+		cmds.currentUnit(time=timeUnit, updateAnimation=True)
+		cls.log.info(f"Switched the scene to {frameRate:g} fps for the oversampled animation")
+
+		return previous
+
+
+	@classmethod
+	def retime(cls, nodes:list, startFrame:float, endFrame:float, scale:float=1.0, oversamplingRate:int=1) -> float:
+		"""Resamples the baked transform curves of the nodes to a new length and key rate.
+
+		All channels are resampled at once, rotations are interpolated with quaternion slerp in each nodes
+		rotate order.
+
+		Args:
+			nodes (list): Nodes with baked transform curves.
+			startFrame (float): First frame of the baked animation, it stays in place.
+			endFrame (float): Last frame of the baked animation.
+			scale (float): Length scale, 2.0 makes the animation two times longer.
+			oversamplingRate (int): Number of keys per frame, 2 upreses a 30 fps clip to 60 fps.
+
+		Returns:
+			float: The new end frame.
+
+		"""
+		targetTimes, sourceTimes = lar.sampleTimes(startFrame, endFrame, scale, oversamplingRate)
+		curves = LMAnimCurves.listCurves(nodes)
+		if not curves:
+			cls.log.warning("No animation curves found - nothing to retime.")
+			return float(targetTimes[-1])
+
+		plugs = list(curves.keys())
+		times, values = LMAnimCurves.read(list(curves.values()))
+		resampled = lar.interpolateLinear(times, values, sourceTimes)
+
+		# Rotations of every node are resampled together on quaternions
+		columns = {plug: index for index, plug in enumerate(plugs)}
+		rotations, orders, indices = [], [], []
+		for node in nodes:
+			axes = [columns.get(f"{node}.{attribute}") for attribute in ["rx", "ry", "rz"]]
+			if None in axes: continue
+			rotations.append(values[:, axes])
+			orders.append(laq.rotateOrders[cmds.getAttr(f"{node}.rotateOrder")])
+			indices.append(axes)
+
+		if rotations:
+			angles = np.radians(np.stack(rotations, axis=1))
+			angles = lar.interpolateRotations(times, angles, sourceTimes, orders)
+			for joint, axes in enumerate(indices):
+				resampled[:, axes] = np.degrees(angles[:, joint])
+
+		LMAnimCurves.write(plugs, targetTimes, resampled)
+		cls.log.info(f"Retimed {plugs.__len__()} curves from '{startFrame}-{endFrame}' to '{targetTimes[0]}-{targetTimes[-1]}'")
+
+		return float(targetTimes[-1])
+
+
+
+
+class LMAnimRootMotion():
+	"""Root motion stage running on baked pose tracks.
+
+	The root trajectory is extracted from the hips after the bake, see lunar.anim.rootmotion. Clips are
+	converted to root motion - the root follows the trajectory, or to in-place - the root stays at rest.
+	The root and its direct children are rewritten, all other channels are left untouched.
+
+	"""
+
+	# Moving average windows in frames for the trajectory position and facing
+	positionSmoothing = 0
+	facingSmoothing = 0
+	# Whether or not the root turns with the hips
+	extractFacing = True
+
+	log = logging.getLogger("LMAnimRootMotion")
+
+
+	@classmethod
+	def getUpAxis(cls) -> int:
+		return 2 if cmds.upAxis(query=True, axis=True) == "z" else 1
+
+
+	@classmethod
+	def getJointAxes(cls, node:str) -> tuple:
+		"""Returns the 3x3 rotate axis and joint orient matrices of the node, identity for transforms.
+		"""
+		rotateAxis = np.radians(cmds.getAttr(f"{node}.rotateAxis")[0])
+		jointOrient = np.radians(cmds.getAttr(f"{node}.jointOrient")[0]) if cmds.objectType(node, isAType="joint") else np.zeros(3)
+		return lans.eulerToMatrix(rotateAxis, "xyz"), lans.eulerToMatrix(jointOrient, "xyz")
+
+
+	@classmethod
+	def getLocalMatrices(cls, poseTrack:PoseTrack, node:str, rotate:bool=True) -> np.ndarray:
+		"""Returns the local matrices of the node from the pose track (frames, 4, 4).
+
+		Args:
+			rotate (bool): Whether or not the rotate channels are used, False returns the rest matrix.
+
+		"""
+		index = poseTrack.nodeIndex[node]
+		rotateAxis, jointOrient = cls.getJointAxes(node)
+		angles = poseTrack.data[:, index, poseTrack.channelIndices(["rx", "ry", "rz"])].astype(np.float64)
+		if not rotate: angles = np.zeros_like(angles)
+
+		local = np.zeros((poseTrack.frameCount, 4, 4))
+		local[:, 3, 3] = 1.0
+		local[:, :3, :3] = rotateAxis @ lans.eulerToMatrix(angles, poseTrack.rotateOrders[index]) @ jointOrient
+		local[:, 3, :3] = poseTrack.data[:, index, poseTrack.channelIndices(["tx", "ty", "tz"])]
+
+		return local
+
+
+	@classmethod
+	def setLocalMatrices(cls, poseTrack:PoseTrack, node:str, local:np.ndarray) -> None:
+		"""Writes the local matrices back to the translate and rotate channels of the pose track.
+		"""
+		index = poseTrack.nodeIndex[node]
+		rotateAxis, jointOrient = cls.getJointAxes(node)
+		rotate = rotateAxis.T @ lans.orthonormalize(local[:, :3, :3]) @ jointOrient.T
+		poseTrack.data[:, index, poseTrack.channelIndices(["rx", "ry", "rz"])] = lans.matrixToEuler(rotate, poseTrack.rotateOrders[index])
+		poseTrack.data[:, index, poseTrack.channelIndices(["tx", "ty", "tz"])] = local[:, 3, :3]
+
+
+	@classmethod
+	def process(cls, poseTrack:PoseTrack, root:str, hips:str, inPlace:bool=False) -> bool:
+		"""Converts the pose track in place to a root motion or an in-place clip.
+
+		Args:
+			poseTrack (PoseTrack): Baked track containing the root and the joints from the root to the hips.
+			root (str): Root joint, its parent is expected to be static.
+			hips (str): Hips joint the trajectory is derived from.
+			inPlace (bool): Whether or not the root stays at rest, otherwise it follows the trajectory.
+
+		Returns:
+			bool: True if the track was converted, False if the root or hips chain is not in the track.
+
+		"""
+		chain = [hips]
+		while chain[-1] != root:
+			parents = cmds.listRelatives(chain[-1], parent=True, path=True)
+			if not parents or parents[0] not in poseTrack.nodeIndex and parents[0] != root:
+				cls.log.warning(f"'{hips}' is not below '{root}' or the chain is not in the pose track.")
+				return False
+			chain.append(parents[0])
+		if root not in poseTrack.nodeIndex:
+			cls.log.warning(f"Root '{root}' is not in the pose track.")
+			return False
+
+		parentWorld = np.array(cmds.getAttr(f"{root}.parentMatrix[0]")).reshape(4, 4)
+		rootWorld = cls.getLocalMatrices(poseTrack, root) @ parentWorld
+		rootRest = cls.getLocalMatrices(poseTrack, root, False)[0]
+		rootRest[3, :3] = 0.0
+		rootRest = rootRest @ parentWorld
+
+		# World matrices and rest matrices down the chain to the hips
+		hipsWorld = rootWorld
+		hipsRest = rootRest
+		for node in reversed(chain[:-1]):
+			local = cls.getLocalMatrices(poseTrack, node)
+			rest = cls.getLocalMatrices(poseTrack, node, False)[0]
+			rest[3, :3] = local[0, 3, :3]
+			hipsWorld = local @ hipsWorld
+			hipsRest = rest @ hipsRest
+
+		trajectory = larm.extractTrajectory(
+			hipsWorld, hipsRest, rootRest, cls.getUpAxis(), cls.positionSmoothing, cls.facingSmoothing, cls.extractFacing
+		)
+
+		children = [node for node in cmds.listRelatives(root, children=True, path=True) or [] if node in poseTrack.nodeIndex]
+		childLocal = np.stack([cls.getLocalMatrices(poseTrack, node) for node in children], axis=1) if children else np.zeros((poseTrack.frameCount, 0, 4, 4))
+		rootWorld, childLocal = larm.convert(rootWorld, childLocal, trajectory, inPlace, rootRest)
+
+		cls.setLocalMatrices(poseTrack, root, rootWorld @ np.linalg.inv(parentWorld))
+		for index, node in enumerate(children): cls.setLocalMatrices(poseTrack, node, childLocal[:, index])
+		poseTrack.eulerFilter()
+
+		cls.log.info(f"Converted '{root}' to {'an in-place' if inPlace else 'a root motion'} clip.")
+		return True
+
+
+	@classmethod
+	def processCurves(cls, nodes:list, root:str, hips:str, inPlace:bool=False) -> bool:
+		"""Runs the stage on the baked curves of the nodes and writes the result back.
+		"""
+		poseTrack = LMAnimCurves.readPoseTrack(nodes)
+		if poseTrack is None or not cls.process(poseTrack, root, hips, inPlace): return False
+		LMAnimCurves.writePoseTrack(poseTrack.subset([node for node in nodes if node == root or node in (cmds.listRelatives(root, children=True, path=True) or [])]))
+		return True
+
+
+
+
+class LMAnimContact():
+	"""Foot contact detection and floor fix for whole clips, see lunar.anim.contact.
+
+	The world matrices of the contact joints are sampled once for the whole range, the contacts are
+	written as stepped curves on a 'contact' attribute of every joint so they can be exported.
+
+	"""
+
+	# Detection thresholds in centimeters and centimeters per second
+	heightThreshold = 5.0
+	speedThreshold = 30.0
+	# Contacts shorter than minLength frames are dropped, gaps up to maxGap frames are filled
+	minLength = 3
+	maxGap = 2
+	# Moving average window in frames for the hips offsets
+	smoothing = 5
+	attribute = "contact"
+
+	log = logging.getLogger("LMAnimContact")
+
+
+	@classmethod
+	def detect(cls, nodes:list, startFrame:float, endFrame:float, extraPlugs:list=[], references:np.ndarray=None) -> dict:
+		"""Samples the contact joints and detects their contacts.
+
+		Args:
+			nodes (list): Contact joints e.g. feet and toes.
+			extraPlugs (list): Matrix plugs sampled in the same pass, returned as 'extra'.
+			references (np.ndarray): Planted height per joint, defaults to a low percentile of the clip.
+
+		Returns:
+			dict: 'times', 'positions' (frames, joints, 3), 'heights', 'references', 'contacts' (frames,
+				joints), 'upAxis' and 'extra' (frames, plugs, 4, 4).
+
+		"""
+		times = np.arange(startFrame, endFrame + 1.0)
+		matrices = LMAnimBake.sampleMatrices([f"{node}.worldMatrix[0]" for node in nodes] + list(extraPlugs), times)
+		positions = matrices[:, :nodes.__len__(), 3, :3]
+
+		upAxis = LMAnimRootMotion.getUpAxis()
+		frameRate = om.MTime(1.0, om.MTime.kSeconds).asUnits(om.MTime.uiUnit())
+		heights = positions[..., upAxis]
+		if references is None: references = lac.referenceHeights(heights)
+		speeds = lac.speeds(positions, frameRate)
+		contacts = lac.detect(heights, speeds, references, cls.heightThreshold, cls.speedThreshold, cls.minLength, cls.maxGap)
+
+		return {
+			"times": times,
+			"positions": positions,
+			"heights": heights,
+			"references": np.asarray(references, dtype=float),
+			"contacts": contacts,
+			"upAxis": upAxis,
+			"extra": matrices[:, nodes.__len__():],
+		}
+
+
+	@classmethod
+	def writeContacts(cls, nodes:list, times:np.ndarray, contacts:np.ndarray) -> list:
+		"""Writes the contacts as stepped curves on the contact attribute of the nodes.
+
+		Returns:
+			list: Names of the written animation curves.
+
+		"""
+		for node in nodes:
+			if not cmds.attributeQuery(cls.attribute, node=node, exists=True):
+				cmds.addAttr(node, longName=cls.attribute, attributeType="float", minValue=0.0, maxValue=1.0, keyable=True)
+
+		plugs = [f"{node}.{cls.attribute}" for node in nodes]
+		return LMAnimCurves.write(plugs, times, contacts.astype(np.float64), oma.MFnAnimCurve.kTangentStep)
+
+
+	@classmethod
+	def writePinTargets(cls, nodes:list, times:np.ndarray, targets:np.ndarray, contacts:np.ndarray, group:str="contactPins") -> list:
+		"""Creates a locator per joint animated with the pinning targets, its 'weight' attribute holds the contact.
+
+		Returns:
+			list: The locators.
+
+		"""
+		if not cmds.objExists(group): group = cmds.group(empty=True, name=group)
+
+		locators = []
+		for node in nodes:
+			locator = cmds.spaceLocator(name=f"{node.rpartition(':')[2]}_pin")[0]
+			cmds.addAttr(locator, longName="weight", attributeType="float", minValue=0.0, maxValue=1.0, keyable=True)
+			locators.append(cmds.parent(locator, group)[0])
+
+		plugs = [f"{locator}.{attribute}" for locator in locators for attribute in ["tx", "ty", "tz"]]
+		LMAnimCurves.write(plugs, times, targets.reshape(times.size, -1), internalUnits=True)
+		LMAnimCurves.write([f"{locator}.weight" for locator in locators], times, contacts.astype(np.float64), oma.MFnAnimCurve.kTangentStep)
+
+		return locators
+
+
+	@classmethod
+	def fixFloor(cls,
+		hips:str,
+		nodes:list,
+		startFrame:float,
+		endFrame:float,
+		floorHeight:float=0.0,
+		fixPositive:bool=False,
+		pin:bool=False,
+	) -> dict:
+		"""Plants the contact joints by offsetting the baked hips translation.
+
+		Every contact interval moves its joint to the planted height, the clip is lifted if the planted
+		height of the lowest joint is below the floor, or dropped onto it as well with fixPositive.
+
+		Args:
+			hips (str): Hips joint with baked translate curves.
+			nodes (list): Contact joints e.g. feet and toes.
+			floorHeight (float): Height of the floor.
+			fixPositive (bool): Whether or not clips floating above the floor are moved down as well.
+			pin (bool): Whether or not to create the IK pinning target locators.
+
+		Returns:
+			dict: The contact data, see detect, with the applied 'offsets' (frames,).
+
+		"""
+		data = cls.detect(nodes, startFrame, endFrame, [f"{hips}.parentMatrix[0]"])
+		times, upAxis = data["times"], data["upAxis"]
+
+		floorShift = floorHeight - data["references"].min()
+		if floorShift < 0.0 and not fixPositive: floorShift = 0.0
+		offsets = lac.hipsOffsets(data["heights"], data["contacts"], data["references"], floorShift, cls.smoothing)
+		data["offsets"] = offsets
+
+		# World offsets to the local translation of the hips
+		parentRotation = data["extra"][:, 0, :3, :3]
+		delta = np.zeros((times.size, 3))
+		delta[:, upAxis] = offsets
+		delta = np.einsum("fi,fij->fj", delta, np.linalg.inv(parentRotation))
+
+		plugs = [f"{hips}.{attribute}" for attribute in ["tx", "ty", "tz"]]
+		translations = LMAnimBake.sample(plugs, times)
+		LMAnimCurves.write(plugs, times, translations + delta, internalUnits=True, preserveOutsideKeys=True)
+
+		cls.writeContacts(nodes, times, data["contacts"])
+		if pin:
+			data["heights"] = data["heights"] + offsets[:, None]
+			data["positions"][..., upAxis] = data["heights"]
+			cls.writePinTargets(nodes, times, lac.pinTargets(data["positions"], data["contacts"]), data["contacts"])
+
+		cls.log.info(f"Fixed the floor contacts of {nodes.__len__()} joints from '{startFrame}' to '{endFrame}'")
+		return data
+
+
+
+
+class LMAnimFilter():
+	"""Curve filters running on numpy arrays of whole characters.
+	"""
+
+	log = logging.getLogger("LMAnimFilter")
+
+
+	@classmethod
+	def getRotationTracks(cls, nodes:list) -> tuple:
+		"""Reads the rotation curves of the nodes.
+
+		Returns:
+			tuple: Key times (frames,), euler angles in degrees (frames, nodes, 3), rotate orders, the
+				filtered nodes and plug names - nodes without all three rotation curves are skipped.
+
+		"""
+		curves = LMAnimCurves.listCurves(nodes, ["rx", "ry", "rz"])
+		plugs, trackNodes = [], []
+		for node in nodes:
+			nodePlugs = [f"{node}.{attribute}" for attribute in ["rx", "ry", "rz"]]
+			if all(plug in curves for plug in nodePlugs):
+				plugs.extend(nodePlugs)
+				trackNodes.append(node)
+
+		if not trackNodes: return None
+
+		times, values = LMAnimCurves.read([curves[plug] for plug in plugs])
+		angles = values.reshape(times.size, trackNodes.__len__(), 3)
+		orders = [laq.rotateOrders[cmds.getAttr(f"{node}.rotateOrder")] for node in trackNodes]
+
+		return times, angles, orders, trackNodes, plugs
+
+
+	@classmethod
+	def eulerFilter(cls, nodes:list) -> bool:
+		"""Euler filters the rotation curves of all nodes in a single pass.
+
+		Replacement for cmds.filterCurve, flipped euler solutions are detected for each nodes rotate order.
+
+		Returns:
+			bool: True if any curves were filtered, False otherwise.
+
+		"""
+		tracks = cls.getRotationTracks(nodes)
+		if not tracks:
+			cls.log.debug("No rotation curves found - nothing to filter.")
+			return False
+
+		times, angles, orders, trackNodes, plugs = tracks
+		filtered = np.degrees(lae.filter(np.radians(angles), orders))
+		changed = np.any(np.abs(filtered - angles) > 1e-6, axis=(0, 2))
+		if not np.any(changed): return True
+
+		# Only the changed nodes get new curves
+		columns = np.repeat(changed, 3)
+		LMAnimCurves.write([plug for plug, column in zip(plugs, columns) if column], times, filtered.reshape(times.size, -1)[:, columns])
+		cls.log.debug(f"Euler filtered {int(changed.sum())} of {trackNodes.__len__()} nodes.")
+
+		return True
+
+
+
+
+class LMAnimCleanup():
+	"""Post bake mocap cleanup with per joint group strength presets, see lunar.anim.cleanup.
+
+	Presets are matched against the node names without namespace, the first matching pattern wins.
+	Each preset holds the 'cutoff' frequency in Hz of the butterworth filter, the savitzky golay
+	'window' in frames and the 'spikeThreshold' in standard deviations of the noise, zero disables the
+	step. Nodes with all three rotation curves are smoothed as quaternions, all other curves directly.
+
+	"""
+
+	presets = OrderedDict([
+		("*thumb*", {"cutoff": 4.0, "window": 11, "spikeThreshold": 3.5}),
+		("*index*", {"cutoff": 4.0, "window": 11, "spikeThreshold": 3.5}),
+		("*middle*", {"cutoff": 4.0, "window": 11, "spikeThreshold": 3.5}),
+		("*ring*", {"cutoff": 4.0, "window": 11, "spikeThreshold": 3.5}),
+		("*pinky*", {"cutoff": 4.0, "window": 11, "spikeThreshold": 3.5}),
+		("*twist*", {"cutoff": 4.0, "window": 11, "spikeThreshold": 4.0}),
+		("*foot*", {"cutoff": 10.0, "window": 5, "spikeThreshold": 5.0}),
+		("*ball*", {"cutoff": 10.0, "window": 5, "spikeThreshold": 5.0}),
+		("*", {"cutoff": 6.0, "window": 9, "spikeThreshold": 4.0}),
+	])
+	# 'butterworth' or 'savitzkyGolay'
+	method = "butterworth"
+	# Median window in frames for the spike detection
+	spikeWindow = 5
+	# Smallest spike in ui units and degrees, keeps clean curves untouched
+	minSpike = (0.5, 1.0)
+
+	log = logging.getLogger("LMAnimCleanup")
+
+
+	@classmethod
+	def getPreset(cls, node:str, presets:dict) -> tuple:
+		"""Returns the cutoff, window and spike threshold of the node.
+		"""
+		name = node.rsplit("|", 1)[-1].rsplit(":", 1)[-1]
+		preset = presets.get("*", cls.presets["*"])
+		for pattern, entry in presets.items():
+			if fnmatch.fnmatch(name, pattern):
+				preset = entry
+				break
+
+		return preset.get("cutoff", 0.0), preset.get("window", 0), preset.get("spikeThreshold", 0.0)
+
+
+	@classmethod
+	def filterValues(cls, values:np.ndarray, preset:tuple, method:str, frameRate:float, minSpike:float, quaternions:bool=False) -> tuple:
+		"""Removes the spikes and smooths the values (frames, ...) with the preset.
+
+		Quaternions (frames, ..., 4) are normalized again after the smoothing.
+
+		Returns:
+			tuple: Filtered values and the number of removed spikes.
+
+		"""
+		cutoff, window, spikeThreshold = preset
+		spikeCount = 0
+		if spikeThreshold:
+			values, spikes = lacl.removeSpikes(values, cls.spikeWindow, spikeThreshold, minSpike)
+			spikeCount = int(spikes.sum())
+		if (method == "butterworth" and cutoff) or (method == "savitzkyGolay" and window):
+			if quaternions: values = lacl.smoothQuaternions(values, method, cutoff, window, frameRate)
+			else: values = lacl.smooth(values, method, cutoff, window, frameRate)
+		elif quaternions:
+			values = laq.normalize(values)
+
+		return values, spikeCount
+
+
+	@classmethod
+	def cleanUp(cls, nodes:list, presets:dict=None, method:str=None, attributes:list=["tx", "ty", "tz", "rx", "ry", "rz"]) -> dict:
+		"""Cleans up the baked curves of the nodes - spike removal followed by smoothing.
+
+		Channels sharing a preset are filtered together in one call, the curves are written back in a
+		single bulk operation.
+
+		Args:
+			nodes (list): Nodes with baked animation curves.
+			presets (dict): Node name patterns mapped to the strength presets, defaults to the class presets.
+			method (str): Smoothing method, defaults to the class method.
+			attributes (list): Attributes to clean up.
+
+		Returns:
+			dict: Number of cleaned 'curves' and removed 'spikes', empty if there are no curves.
+
+		"""
+		if presets is None: presets = cls.presets
+		if method is None: method = cls.method
+
+		curves = LMAnimCurves.listCurves(nodes, attributes)
+		if not curves: return {}
+
+		plugs = list(curves.keys())
+		times, values = LMAnimCurves.read(list(curves.values()))
+		if times.size < 3: return {}
+
+		step = float(np.median(np.diff(times)))
+		frameRate = om.MTime(1.0, om.MTime.kSeconds).asUnits(om.MTime.uiUnit()) / step
+		columns = {plug: index for index, plug in enumerate(plugs)}
+
+		# Rotations are grouped by rotate order and preset, everything else by preset
+		rotationGroups, scalarGroups = {}, {}
+		for node in dict.fromkeys(plug.rsplit(".", 1)[0] for plug in plugs):
+			preset = cls.getPreset(node, presets)
+			rotationPlugs = [f"{node}.{attribute}" for attribute in ["rx", "ry", "rz"]]
+			isRotationTrack = all(plug in columns for plug in rotationPlugs)
+			if isRotationTrack:
+				order = laq.rotateOrders[cmds.getAttr(f"{node}.rotateOrder")]
+				rotationGroups.setdefault((order, preset), []).append([columns[plug] for plug in rotationPlugs])
+			for attribute in attributes:
+				plug = f"{node}.{attribute}"
+				if plug not in columns or (isRotationTrack and plug in rotationPlugs): continue
+				scalarGroups.setdefault(preset, []).append(columns[plug])
+
+		spikeCount = 0
+		for (order, preset), groupColumns in rotationGroups.items():
+			groupColumns = np.array(groupColumns)
+			angles = np.radians(values[:, groupColumns])
+			q = laq.makeContinuous(laq.fromEuler(angles, order))
+			q, spikes = cls.filterValues(q, preset, method, frameRate, np.sin(np.radians(cls.minSpike[1]) * 0.5), True)
+			# Seeded with the original first frame so the curves keep their euler solution and full turns
+			filtered = lae.filter(np.concatenate((angles[:1], laq.toEuler(q, order))), order)[1:]
+			values[:, groupColumns] = np.degrees(filtered)
+			spikeCount += spikes
+
+		for preset, groupColumns in scalarGroups.items():
+			groupValues = values[:, groupColumns]
+			minSpike = np.array([cls.minSpike[plugs[column].rsplit(".", 1)[-1].startswith("r")] for column in groupColumns])
+			values[:, groupColumns], spikes = cls.filterValues(groupValues, preset, method, frameRate, minSpike)
+			spikeCount += spikes
+
+		LMAnimCurves.write(plugs, times, values)
+
+		cls.log.info(f"Cleaned up {plugs.__len__()} curves, removed {spikeCount} spikes.")
+		return {"curves": plugs.__len__(), "spikes": spikeCount}
+
+
+
+
+class LMAnimReduce():
+	"""Post bake key reduction with per joint group tolerances.
+
+	Tolerances are matched against the node names without namespace, the first matching pattern wins.
+	Each entry holds the translation tolerance in ui units and the rotation tolerance in degrees.
+
+	"""
+
+	tolerances = OrderedDict([
+		("*thumb*", (0.005, 0.05)),
+		("*index*", (0.005, 0.05)),
+		("*middle*", (0.005, 0.05)),
+		("*ring*", (0.005, 0.05)),
+		("*pinky*", (0.005, 0.05)),
+		("*twist*", (0.05, 0.5)),
+		("*", (0.01, 0.1)),
+	])
+
+	log = logging.getLogger("LMAnimReduce")
+
+
+	@classmethod
+	def getTolerance(cls, node:str, tolerances:dict) -> tuple:
+		name = node.rsplit("|", 1)[-1].rsplit(":", 1)[-1]
+		for pattern, tolerance in tolerances.items():
+			if fnmatch.fnmatch(name, pattern): return tolerance
+
+		return tolerances.get("*", cls.tolerances["*"])
+
+
+	@classmethod
+	def reduce(cls, nodes:list, tolerances:dict=None, attributes:list=["tx", "ty", "tz", "rx", "ry", "rz"]) -> float:
+		"""Reduces the keys of the baked transform curves of the nodes.
+
+		Kept keys get linear tangents so the reduced curves stay within the tolerances of the baked ones.
+
+		Args:
+			nodes (list): Nodes with baked animation curves.
+			tolerances (dict): Node name patterns mapped to translate and rotate tolerances, defaults to
+				the class tolerances.
+			attributes (list): Attributes to reduce.
+
+		Returns:
+			float: Ratio of the kept keys.
+
+		"""
+		if tolerances is None: tolerances = cls.tolerances
+
+		curves = LMAnimCurves.listCurves(nodes, attributes)
+		if not curves: return 1.0
+
+		plugs = list(curves.keys())
+		times, values = LMAnimCurves.read(list(curves.values()))
+		channelTolerances = []
+		for plug in plugs:
+			node, attribute = plug.rsplit(".", 1)
+			translate, rotate = cls.getTolerance(node, tolerances)
+			channelTolerances.append(rotate if attribute.startswith("r") else translate)
+
+		keep = lard.rdp(times, values, channelTolerances)
+		keep = lard.removeStatic(values, keep, channelTolerances)
+		LMAnimCurves.write(plugs, times, values, tangentType=oma.MFnAnimCurve.kTangentLinear, keep=keep)
+
+		ratio = float(keep.sum()) / keep.size
+		cls.log.info(f"Reduced {plugs.__len__()} curves to {ratio * 100.0:.1f}% of the keys.")
+		return ratio
+
+
+	@classmethod
+	def getPoseTrackTolerances(cls, poseTrack:PoseTrack, tolerances:dict=None) -> np.ndarray:
+		"""Returns the tolerances (nodes, channels) for the pose track in internal units.
+		"""
+		if tolerances is None: tolerances = cls.tolerances
+
+		result = np.empty((poseTrack.nodes.__len__(), poseTrack.channels.__len__()))
+		for index, node in enumerate(poseTrack.nodes):
+			translate, rotate = cls.getTolerance(node, tolerances)
+			for channel, name in enumerate(poseTrack.channels):
+				if name.startswith("r"):
+					result[index, channel] = np.radians(rotate)
+				else:
+					result[index, channel] = translate * om.MDistance.uiToInternal(1.0)
+
+		return result
+
+
+
+
+class LMAnimDirtyRange():
+	"""Tracks the edits of animation curves between two bakes.
+
+	A snapshot stores the key times, values and tangent angles of every curve. Comparing two snapshots
+	gives the frame ranges affected by the edits - every changed, added or removed key dirties the span
+	between its neighbouring keys, keys at the curve ends dirty everything before or after them. Edits
+	which are not on the curves - unkeyed attributes, constraints, the hierarchy - are detected through
+	the static digest and dirty the whole range.
+
+	"""
+
+	log = logging.getLogger("LMAnimDirtyRange")
+
+
+	@classmethod
+	def snapshot(cls, curves:list) -> dict:
+		"""Returns the key data (keys, 4) of the curves with their digests.
+		"""
+		result = {}
+		for curve in curves:
+			keys = np.array([
+				cmds.keyframe(curve, query=True, timeChange=True) or [],
+				cmds.keyframe(curve, query=True, valueChange=True) or [],
+				cmds.keyTangent(curve, query=True, inAngle=True) or [],
+				cmds.keyTangent(curve, query=True, outAngle=True) or [],
+			], dtype=float).T.reshape(-1, 4)
+			result[curve] = (hashlib.sha1(keys.tobytes()).hexdigest(), keys)
+
+		return result
+
+
+	@classmethod
+	def digest(cls, curves:list) -> str:
+		"""Returns a single digest of the key times and values of the curves.
+		"""
+		if not curves: return ""
+
+		digest = hashlib.sha1(" ".join(curves).encode())
+		digest.update(np.array(cmds.keyframe(curves, query=True, timeChange=True) or [], dtype=float).tobytes())
+		digest.update(np.array(cmds.keyframe(curves, query=True, valueChange=True) or [], dtype=float).tobytes())
+		return digest.hexdigest()
+
+
+	@classmethod
+	def staticDigest(cls, nodes:list) -> str:
+		"""Returns a digest of the node state the curve snapshots do not cover.
+
+		Covers the parents, the incoming connections other than animation curves - constraints, drivers,
+		etc., the values of the keyable attributes without an incoming connection and the joint orients
+		and rotate axes.
+
+		"""
+		digest = hashlib.sha1()
+		pose = OrderedDict()
+		for node in nodes:
+			digest.update(f"{node}<{cmds.listRelatives(node, parent=True, fullPath=True)}".encode())
+
+			connected = []
+			connections = cmds.listConnections(node, source=True, destination=False, connections=True, plugs=True) or []
+			for destination, source in zip(connections[::2], connections[1::2]):
+				connected.append(destination.split(".", 1)[-1])
+				if not cmds.objectType(source.split(".", 1)[0], isAType="animCurve"): digest.update(f"{destination}<{source}".encode())
+
+			attributes = [attribute for attribute in cmds.listAttr(node, keyable=True) or [] if not attribute.startswith(tuple(connected))]
+			if cmds.objectType(node, isAType="joint"): attributes += ["jointOrientX", "jointOrientY", "jointOrientZ", "rotateAxisX", "rotateAxisY", "rotateAxisZ"]
+			pose[node] = attributes
+
+		digest.update(repr(LMAnimPose.get(pose)).encode())
+		return digest.hexdigest()
+
+
+	@classmethod
+	def getChangedRanges(cls, old:np.ndarray, new:np.ndarray) -> list:
+		"""Returns the unpadded ranges in which the curve evaluates differently, infinite at the curve ends.
+		"""
+		common, oldIndices, newIndices = np.intersect1d(old[:, 0], new[:, 0], return_indices=True)
+		changed = common[np.any(old[oldIndices] != new[newIndices], axis=-1)]
+		changed = np.concatenate((changed, np.setxor1d(old[:, 0], new[:, 0])))
+		if not changed.size: return []
+
+		times = np.union1d(old[:, 0], new[:, 0])
+		indices = np.searchsorted(times, changed)
+		starts = np.where(indices > 0, times[np.maximum(indices - 1, 0)], -np.inf)
+		ends = np.where(indices < times.size - 1, times[np.minimum(indices + 1, times.size - 1)], np.inf)
+
+		return list(zip(starts.tolist(), ends.tolist()))
+
+
+	@classmethod
+	def mergeRanges(cls, ranges:list, startFrame:float, endFrame:float, padding:float=0.0) -> list:
+		"""Pads, clamps and merges the ranges, touching ranges are joined.
+		"""
+		merged = []
+		for start, end in sorted(ranges):
+			start = max(np.floor(start - padding), startFrame)
+			end = min(np.ceil(end + padding), endFrame)
+			if start > end: continue
+			if merged and start <= merged[-1][1] + 1.0:
+				merged[-1][1] = max(merged[-1][1], end)
+			else:
+				merged.append([start, end])
+
+		return [(float(start), float(end)) for start, end in merged]
+
+
+	@classmethod
+	def getDirtyRanges(cls, previous:dict, current:dict, startFrame:float, endFrame:float, padding:float=1.0) -> list:
+		"""Returns the merged frame ranges which changed between the snapshots.
+
+		Args:
+			previous (dict): Snapshot taken after the last bake.
+			current (dict): Snapshot of the current state.
+			startFrame (float): First frame of the baked range.
+			endFrame (float): Last frame of the baked range.
+			padding (float): Frames added on both sides of every range.
+
+		Returns:
+			list: Sorted (start, end) tuples, empty if nothing changed.
+
+		"""
+		ranges = []
+		for curve in set(previous).union(current):
+			if curve not in previous or curve not in current:
+				ranges.append((-np.inf, np.inf))
+				continue
+			if previous[curve][0] == current[curve][0]: continue
+			ranges.extend(cls.getChangedRanges(previous[curve][1], current[curve][1]))
+
+		return cls.mergeRanges(ranges, startFrame, endFrame, padding)
+
+
+
+
+class LMAnimPose():
+	"""Reads and applies poses - dictionaries of node names with attribute values in ui units.
+
+	The plugs of a pose are resolved once per namespace and cached, the values are read through the API
+	without any command round-trips. Poses are set through the API only while the undo queue is disabled,
+	otherwise with setAttr so they can be undone.
+
+	"""
+
+	plugCache = {}
+
+	log = logging.getLogger("LMAnimPose")
+
+
+	@classmethod
+	def getPlugKind(cls, mPlug:om.MPlug) -> tuple:
+		"""Returns the value kind - 'double', 'int' or 'bool' and the ui to internal unit factor of the plug.
+		"""
+		attribute = mPlug.attribute()
+		if attribute.hasFn(om.MFn.kUnitAttribute):
+			unitType = om.MFnUnitAttribute(attribute).unitType()
+			if unitType == om.MFnUnitAttribute.kAngle: return "double", om.MAngle.uiToInternal(1.0)
+			if unitType == om.MFnUnitAttribute.kDistance: return "double", om.MDistance.uiToInternal(1.0)
+			return "double", 1.0
+
+		if attribute.hasFn(om.MFn.kEnumAttribute): return "int", 1.0
+		if attribute.hasFn(om.MFn.kNumericAttribute):
+			unitType = om.MFnNumericAttribute(attribute).unitType()
+			if unitType == om.MFnNumericData.kBoolean: return "bool", 1.0
+			if unitType in (om.MFnNumericData.kByte, om.MFnNumericData.kChar, om.MFnNumericData.kShort, om.MFnNumericData.kInt, om.MFnNumericData.kLong):
+				return "int", 1.0
+
+		return "double", 1.0
+
+
+	@classmethod
+	def getPlugs(cls, pose:dict, namespace:str="") -> list:
+		"""Returns the resolved plugs of the pose entries which exist in the scene.
+
+		Args:
+			pose (dict): Node names without namespace mapped to attribute names.
+			namespace (str): Namespace of the nodes.
+
+		Returns:
+			list: (node, attribute, MPlug, kind, factor) tuples.
+
+		"""
+		key = (namespace, tuple((node, tuple(pose[node])) for node in pose))
+		cached = cls.plugCache.get(key)
+		if cached and all(handle.isValid() for handle in cached[0]): return cached[1]
+
+		handles = []
+		plugs = []
+		missing = 0
+		for node in pose:
+			selectionList = om.MSelectionList()
+			try: selectionList.add(f"{namespace}:{node}" if namespace else node)
+			except RuntimeError:
+				missing += 1
+				continue
+
+			obj = om.MObject()
+			selectionList.getDependNode(0, obj)
+			handles.append(om.MObjectHandle(obj))
+			fnNode = om.MFnDependencyNode(obj)
+			for attribute in pose[node]:
+				try: mPlug = fnNode.findPlug(attribute, False)
+				except RuntimeError: continue
+				plugs.append((node, attribute, mPlug) + cls.getPlugKind(mPlug))
+
+		# Partial resolutions are not cached, the missing nodes are looked up again on the next call
+		if plugs and not missing: cls.plugCache[key] = (handles, plugs)
+		return plugs
+
+
+	@classmethod
+	def isSettable(cls, mPlug:om.MPlug) -> bool:
+		"""Mirrors getAttr -settable - the plug is neither locked nor driven by a connection.
+		"""
+		return mPlug.isFreeToChange() == om.MPlug.kFreeToChange
+
+
+	@classmethod
+	def get(cls, pose:dict, namespace:str="") -> dict:
+		"""Returns the current values of the pose attributes in ui units.
+		"""
+		result = OrderedDict()
+		for node, attribute, mPlug, kind, factor in cls.getPlugs(pose, namespace):
+			if kind == "bool": value = mPlug.asBool()
+			elif kind == "int": value = mPlug.asInt()
+			else: value = mPlug.asDouble() / factor
+			result.setdefault(node, OrderedDict())[attribute] = value
+
+		return result
+
+
+	@classmethod
+	def apply(cls, pose:dict, namespace:str="", undoable:bool=None, keyableOnly:bool=False) -> int:
+		"""Applies the pose to the settable plugs.
+
+		Plugs are set through a single MDGModifier which does not go to the undo queue, so it is only used
+		while the queue is disabled - in batch mode or in bulk operations with undo off. Otherwise the
+		values are set with setAttr inside one undo chunk.
+
+		Args:
+			pose (dict): Node names without namespace mapped to attribute values in ui units.
+			namespace (str): Namespace of the nodes.
+			undoable (bool): Whether or not the pose can be undone in one step, if None the pose is undoable
+				whenever the undo queue is enabled.
+			keyableOnly (bool): Whether or not to skip the attributes which are not keyable.
+
+		Returns:
+			int: Number of set plugs.
+
+		"""
+		plugs = [entry for entry in cls.getPlugs(pose, namespace) if cls.isSettable(entry[2]) and (not keyableOnly or entry[2].isKeyable())]
+		if undoable is None: undoable = cmds.undoInfo(query=True, state=True)
+
+		if undoable:
+			cmds.undoInfo(openChunk=True, chunkName="LMAnimPose.apply")
+			try:
+				for node, attribute, mPlug, kind, factor in plugs:
+					cmds.setAttr(f"{namespace}:{node}.{attribute}" if namespace else f"{node}.{attribute}", pose[node][attribute])
+			finally:
+				cmds.undoInfo(closeChunk=True)
+			return plugs.__len__()
+
+		dgModifier = om.MDGModifier()
+		for node, attribute, mPlug, kind, factor in plugs:
+			value = pose[node][attribute]
+			if kind == "bool": dgModifier.newPlugValueBool(mPlug, bool(value))
+			elif kind == "int": dgModifier.newPlugValueInt(mPlug, int(value))
+			else: dgModifier.newPlugValueDouble(mPlug, float(value) * factor)
+		dgModifier.doIt()
+
+		return plugs.__len__()
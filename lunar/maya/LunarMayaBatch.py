@@ -0,0 +1,992 @@
+"""Module for running batch retargeting jobs outside of the interactive session.
+
+Every clip is processed by a separate mayapy process watched by the supervisor. A crash or a hang on a
+single clip ends up in the quarantine list instead of stopping the whole batch.
+
+"""
+
+# Built-in imports
+import os
+import sys
+import json
+import time
+import hashlib
+import platform
+import threading
+import shutil
+import subprocess
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Third-party imports
+from maya import cmds
+from maya import mel
+import maya.OpenMaya as om
+from PySide2 import QtCore as qtc
+import numpy as np
+
+# Custom imports
+import lunar.anim.contact as lac
+import lunar.anim.metrics as lamt
+import lunar.maya.LunarMaya as lm
+import lunar.maya.LunarMayaAnim as lma
+
+
+
+
+# Root directory of the lunar package - added to the PYTHONPATH of the worker processes
+pathLunarRoot = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Directory for persistent caches shared between sessions and worker processes
+pathLunarCache = f"{qtc.QStandardPaths.writableLocation(qtc.QStandardPaths.GenericCacheLocation)}/lunar"
+
+
+
+
+class LMJsonCache():
+	"""Json file backed cache that can be shared between processes.
+
+	The file is re-read before every write and replaced atomically, concurrent writers can lose an
+	entry but never corrupt the file.
+
+	"""
+
+	fileName = "cache.json"
+	lock = threading.Lock()
+
+
+	@classmethod
+	def filePath(cls) -> str:
+		return f"{pathLunarCache}/{cls.fileName}"
+
+
+	@classmethod
+	def load(cls) -> dict:
+		"""Returns the content of the cache file, an empty dictonary if it doesn't exist.
+		"""
+		try:
+			with open(cls.filePath(), "r") as file:
+				return json.load(file)
+		except (OSError, ValueError):
+			return {}
+
+
+	@classmethod
+	def modify(cls, function) -> None:
+		"""Reads the cache, changes the data in place with function(data) and writes it back.
+
+		The whole read, modify and write runs under the lock, so threads of this process never lose each
+		others changes.
+
+		"""
+		with cls.lock:
+			os.makedirs(pathLunarCache, exist_ok=True)
+			data = cls.load()
+			function(data)
+			fileTemp = f"{cls.filePath()}.{os.getpid()}.tmp"
+			with open(fileTemp, "w") as file:
+				json.dump(data, file)
+			os.replace(fileTemp, cls.filePath())
+
+
+	@classmethod
+	def update(cls, key:str, value) -> None:
+		"""Stores the value under the specified key.
+		"""
+		cls.modify(lambda data: data.__setitem__(key, value))
+
+
+	@classmethod
+	def updateMany(cls, entries:dict) -> None:
+		"""Stores all entries with a single write.
+		"""
+		if entries: cls.modify(lambda data: data.update(entries))
+
+
+
+
+class LMTakeCache(LMJsonCache):
+	"""Cache for the take metadata of fbx files.
+
+	Entries are keyed by the file path and invalidated when the size or modification time changes, so
+	batches can be planned without reading the fbx files again. Cache misses are collected and written
+	in chunks instead of rewriting the file for every clip, see flush.
+
+	"""
+
+	fileName = "takes.json"
+	# Gathered entries not written yet and the number of them triggering a write
+	pending = {}
+	pendingLock = threading.Lock()
+	flushSize = 50
+
+
+	@classmethod
+	def signature(cls, filePath:str) -> list:
+		stat = os.stat(filePath)
+		return [stat.st_size, stat.st_mtime]
+
+
+	@classmethod
+	def get(cls, filePath:str, data:dict=None) -> OrderedDict or None:
+		"""Returns the cached takes for the specified file, None if the file is not cached or changed.
+		"""
+		key = os.path.abspath(filePath)
+		with cls.pendingLock: entry = cls.pending.get(key)
+		if entry is None:
+			if data is None: data = cls.load()
+			entry = data.get(key)
+		if entry and entry["signature"] == cls.signature(filePath):
+			return OrderedDict(entry["takes"])
+
+		return None
+
+
+	@classmethod
+	def gather(cls, filePath:str, readPath:str=None) -> OrderedDict:
+		"""Returns the takes for the specified file from the cache, reads and caches them on a miss.
+
+		Args:
+			readPath (str): Local copy of the file read on a cache miss, see LMClipPrefetcher.
+
+		"""
+		takes = cls.get(filePath)
+		if takes is None:
+			takes = lm.LMFbx.gatherTakes(readPath if readPath else filePath)
+			with cls.pendingLock:
+				cls.pending[os.path.abspath(filePath)] = {"signature": cls.signature(filePath), "takes": list(takes.items())}
+				full = cls.pending.__len__() >= cls.flushSize
+			if full: cls.flush()
+
+		return takes
+
+
+	@classmethod
+	def flush(cls) -> None:
+		"""Writes the gathered entries to the cache file in a single write.
+		"""
+		with cls.pendingLock:
+			entries = dict(cls.pending)
+			cls.pending.clear()
+
+		cls.updateMany(entries)
+
+
+
+
+class LMCharacterCache(LMJsonCache):
+	"""Cache for the HumanIK characterizations of rig files.
+
+	Entries are keyed by the hash of the whole rig file and the hik template, they hold the slot
+	connections of the character node, the characterization T-pose, the pose after the setup and the
+	property values.
+
+	"""
+
+	fileName = "characters.json"
+	# File hashes of this session keyed by the path, size and modification time
+	hashes = {}
+
+
+	@classmethod
+	def fileHash(cls, filePath:str, chunkSize:int=1048576) -> str:
+		"""Returns the hash of the whole file, any edit invalidates the characterization.
+
+		The hash is computed once per session and file version, not for every clip of a batch.
+
+		"""
+		stat = os.stat(filePath)
+		signature = (os.path.abspath(filePath), stat.st_size, stat.st_mtime_ns)
+		if signature not in cls.hashes:
+			digest = hashlib.sha1()
+			with open(filePath, "rb") as file:
+				for chunk in iter(lambda: file.read(chunkSize), b""): digest.update(chunk)
+			cls.hashes[signature] = digest.hexdigest()
+
+		return cls.hashes[signature]
+
+
+	@classmethod
+	def getKey(cls, filePath:str, template:str) -> str or None:
+		"""Returns the cache key for the rig file, None if the file does not exist e.g. imported rigs.
+		"""
+		if not filePath or not os.path.isfile(filePath): return None
+		return f"{cls.fileHash(filePath)}:{template}"
+
+
+	@classmethod
+	def get(cls, key:str) -> dict or None:
+		if key is None: return None
+		return cls.load().get(key)
+
+
+
+
+class LMRetargetCosts(LMJsonCache):
+	"""Per-frame and per-clip retargeting costs measured in past runs.
+	"""
+
+	fileName = "costs.json"
+	maxRuns = 200
+
+
+	@classmethod
+	def record(cls, frames:int, duration:float, clips:int=1) -> None:
+		"""Records a finished run.
+		"""
+		if frames <= 0: return
+
+		def append(data):
+			runs = data.get("runs", [])
+			runs.append({"frames": frames, "duration": duration, "clips": clips})
+			data["runs"] = runs[-cls.maxRuns:]
+
+		# Supervisor threads record concurrently, the read has to happen under the lock as well
+		cls.modify(append)
+
+
+	@classmethod
+	def estimate(cls) -> tuple or None:
+		"""Fits the recorded runs with duration = perFrame * frames + perClip * clips.
+
+		Returns:
+			tuple or None: Seconds per frame and seconds per clip, None if there are no recorded runs.
+
+		"""
+		runs = cls.load().get("runs", [])
+		if not runs: return None
+
+		# Least squares normal equations for the two unknowns
+		sff = sum(run["frames"] * run["frames"] for run in runs)
+		sfc = sum(run["frames"] * run["clips"] for run in runs)
+		scc = sum(run["clips"] * run["clips"] for run in runs)
+		sfd = sum(run["frames"] * run["duration"] for run in runs)
+		scd = sum(run["clips"] * run["duration"] for run in runs)
+		determinant = sff * scc - sfc * sfc
+		if abs(determinant) > 1e-9:
+			perFrame = (sfd * scc - scd * sfc) / determinant
+			perClip = (sff * scd - sfc * sfd) / determinant
+			if perFrame > 0 and perClip >= 0: return perFrame, perClip
+
+		return sum(run["duration"] for run in runs) / sum(run["frames"] for run in runs), 0.0
+
+
+
+
+class LMClipPrefetcher():
+	"""Prepares the next source clips on a background thread while the current clip bakes.
+
+	Only file work runs on the thread, maya commands stay on the main thread:
+		- the source is copied to a local staging directory, the import reads the local copy
+		- the takes are looked up in the take cache
+		- the prepare callback is called with the cached takes e.g. to create the output directories
+
+	Usage:
+		with LMClipPrefetcher() as prefetcher:
+			prefetcher.submit(sources[0])
+			for index, source in enumerate(sources):
+				clip = prefetcher.get(source)
+				if index + 1 < sources.__len__(): prefetcher.submit(sources[index + 1])
+				lm.LMFbx.importAnimation(clip["filePath"], ...)
+				prefetcher.release(source)
+
+	"""
+
+	pathStaging = f"{pathLunarCache}/staging"
+	# Whether or not the sources are copied to the staging directory, only worth it for network storage
+	stage = True
+
+	log = logging.getLogger("LMClipPrefetcher")
+
+
+	def __init__(self, workers:int=1) -> None:
+		self.executor = ThreadPoolExecutor(max_workers=max(1, workers))
+		self.futures = {}
+
+
+	def __enter__(self):
+		return self
+
+
+	def __exit__(self, *args) -> None:
+		self.shutdown()
+
+
+	@classmethod
+	def getStagingPath(cls, filePath:str) -> str:
+		digest = hashlib.sha1(os.path.abspath(filePath).encode()).hexdigest()[:16]
+		return f"{cls.pathStaging}/{digest}_{os.path.basename(filePath)}"
+
+
+	@classmethod
+	def stageFile(cls, filePath:str) -> str:
+		"""Copies the file to the staging directory, an up to date copy is reused.
+
+		Returns:
+			str: Path to the local copy.
+
+		"""
+		stagingPath = cls.getStagingPath(filePath)
+		stat = os.stat(filePath)
+		if os.path.isfile(stagingPath) and os.path.getsize(stagingPath) == stat.st_size and os.path.getmtime(stagingPath) == stat.st_mtime:
+			return stagingPath
+
+		os.makedirs(cls.pathStaging, exist_ok=True)
+		fileTemp = f"{stagingPath}.{os.getpid()}.tmp"
+		shutil.copy2(filePath, fileTemp)
+		os.replace(fileTemp, stagingPath)
+
+		return stagingPath
+
+
+	@classmethod
+	def prepare(cls, filePath:str, callback=None) -> dict:
+		"""Prepares the clip, runs on the background thread.
+
+		Returns:
+			dict: 'filePath' - the path to import from, 'takes' - the cached takes or None on a cache miss
+				and 'duration' of the preparation in seconds.
+
+		"""
+		timeStart = time.perf_counter()
+		readPath = filePath
+		if cls.stage:
+			try:
+				readPath = cls.stageFile(filePath)
+			except OSError as error:
+				cls.log.warning(f"Could not stage '{filePath}', reading it in place: {error}")
+
+		takes = LMTakeCache.get(filePath)
+		if takes is not None and callback: callback(takes)
+
+		return {"filePath": readPath, "takes": takes, "duration": time.perf_counter() - timeStart}
+
+
+	def submit(self, filePath:str, callback=None) -> None:
+		"""Starts preparing the clip in the background.
+
+		Args:
+			callback (callable): Called with the takes on the background thread if they are cached, must not
+				use maya commands.
+
+		"""
+		if filePath not in self.futures: self.futures[filePath] = self.executor.submit(self.prepare, filePath, callback)
+
+
+	def get(self, filePath:str, callback=None) -> dict:
+		"""Returns the prepared clip, waits for the background thread or prepares it if it was not submitted.
+		"""
+		self.submit(filePath, callback)
+		try:
+			return self.futures[filePath].result()
+		except Exception as exception:
+			self.log.warning(f"Preparing '{filePath}' failed, reading it in place: {exception}")
+			return {"filePath": filePath, "takes": None, "duration": 0.0}
+
+
+	def release(self, filePath:str) -> None:
+		"""Removes the staged copy of the clip.
+		"""
+		future = self.futures.pop(filePath, None)
+		if future is None or not future.done() or future.exception(): return
+
+		stagingPath = future.result()["filePath"]
+		if stagingPath != filePath:
+			try:
+				os.remove(stagingPath)
+			except OSError:
+				pass
+
+
+	def shutdown(self) -> None:
+		"""Waits for the running preparations and removes all staged copies.
+		"""
+		self.executor.shutdown(wait=True)
+		for filePath in list(self.futures): self.release(filePath)
+
+
+
+
+class LMBatchPlanner():
+	"""Dry-run planning of a retargeting batch without opening any maya scenes.
+
+	Enumerates sources and takes through the take cache, estimates the wall time for different worker
+	counts from the recorded costs and flags duplicated sources, zero length takes and output collisions.
+
+	"""
+
+	log = logging.getLogger("LMBatchPlanner")
+
+
+	def __init__(self, retargeter) -> None:
+		self.retargeter = retargeter
+
+
+	@classmethod
+	def contentHash(cls, filePath:str, chunkSize:int=65536) -> str:
+		"""Returns a quick content hash from the size and the first and last chunk of the file.
+		"""
+		size = os.path.getsize(filePath)
+		digest = hashlib.sha1(str(size).encode())
+		with open(filePath, "rb") as file:
+			digest.update(file.read(chunkSize))
+			if size > chunkSize:
+				file.seek(max(chunkSize, size - chunkSize))
+				digest.update(file.read(chunkSize))
+
+		return digest.hexdigest()
+
+
+	@classmethod
+	def scheduleMakespan(cls, costs:list, workers:int) -> float:
+		"""Returns the wall time of the costs scheduled longest first onto the least loaded worker.
+		"""
+		loads = [0.0] * workers
+		for cost in sorted(costs, reverse=True):
+			loads[loads.index(min(loads))] += cost
+
+		return max(loads)
+
+
+	def plan(self,
+		preserveFolderHierarchy:bool=True,
+		trimStart:float=0.0,
+		trimEnd:float=0.0,
+		workerCounts:tuple=(1, 2, 4, 8, 16),
+	) -> dict:
+		"""Builds the plan for the retargeter's sources.
+
+		Returns:
+			dict: Plan with the clips, total frames, estimates per worker count and all issues found.
+
+		"""
+		cache = LMTakeCache.load()
+		clips = []
+		outputs = {}
+		hashes = {}
+		issues = {"duplicates": [], "zeroLength": [], "collisions": [], "existing": [], "uncached": []}
+
+		for source in sorted(self.retargeter.sources, key=lambda source: source.filePath()):
+			filePath = source.filePath()
+			hashes.setdefault(self.contentHash(filePath), []).append(filePath)
+
+			takes = LMTakeCache.get(filePath, cache)
+			if takes is None:
+				issues["uncached"].append(filePath)
+				takes = LMTakeCache.gather(filePath)
+
+			for take in takes:
+				startFrame = takes[take]["startFrame"] + trimStart
+				endFrame = takes[take]["endFrame"] + trimEnd
+				frames = int(endFrame - startFrame) + 1 if endFrame > startFrame else 0
+				if frames == 0:	issues["zeroLength"].append({"source": filePath, "take": take})
+
+				for outputFile in self.retargeter.getOutputFilePaths(source, take, takes.__len__(), preserveFolderHierarchy):
+					outputs.setdefault(os.path.normcase(os.path.abspath(outputFile)), []).append({"source": filePath, "take": take})
+
+				clips.append({"source": filePath, "take": take, "frames": frames})
+
+		LMTakeCache.flush()
+		issues["duplicates"] = [filePaths for filePaths in hashes.values() if filePaths.__len__() > 1]
+		issues["collisions"] = [{"output": output, "clips": entries} for output, entries in outputs.items() if entries.__len__() > 1]
+		issues["existing"] = [output for output in outputs if os.path.isfile(output)]
+
+		totalFrames = sum(clip["frames"] for clip in clips)
+		estimates = {}
+		costs = LMRetargetCosts.estimate()
+		if costs:
+			perFrame, perClip = costs
+			clipCosts = [perFrame * clip["frames"] + perClip for clip in clips if clip["frames"] > 0]
+			estimates = {workers: self.scheduleMakespan(clipCosts, workers) for workers in workerCounts}
+		else:
+			self.log.warning("No recorded retargeting costs yet - run a batch first to get time estimates.")
+
+		for issue, entries in issues.items():
+			if entries: self.log.warning(f"Plan found {entries.__len__()} '{issue}' issue(s).")
+
+		self.log.info(f"Plan: {clips.__len__()} clips, {totalFrames} frames, estimates (workers: seconds) {estimates}")
+		return {
+			"clips": clips,
+			"totalClips": clips.__len__(),
+			"totalFrames": totalFrames,
+			"costs": costs,
+			"estimates": estimates,
+			"issues": issues,
+		}
+
+
+
+
+class LMRetargetJob():
+	"""Single retargeting job - one source file with all of it's takes.
+
+	The job is serialized to a json file which is read back by the worker process.
+
+	"""
+
+	def __init__(self, source:str, settings:dict, options:dict) -> None:
+		self.source = source
+		self.settings = settings
+		self.options = options
+
+		self.attempts = 0
+		self.status = "pending"
+		self.returnCode = None
+		self.duration = 0.0
+		self.frames = 0
+		self.logFile = None
+		self.log = ""
+
+
+	@classmethod
+	def fromJson(cls, filePath:str):
+		"""Creates the job from the specified json file.
+		"""
+		with open(filePath, "r") as file:
+			data = json.load(file)
+
+		return cls(data["source"], data["settings"], data["options"])
+
+
+	def toJson(self, filePath:str) -> str:
+		"""Writes the job to the specified json file.
+		"""
+		with open(filePath, "w") as file:
+			json.dump({"source": self.source, "settings": self.settings, "options": self.options}, file, indent=2)
+
+		return filePath
+
+
+	def name(self) -> str:
+		"""Returns a file system friendly name of the job.
+		"""
+		return qtc.QFileInfo(self.source).completeBaseName()
+
+
+	def report(self) -> dict:
+		"""Returns the state of the job as a dictonary.
+		"""
+		return {
+			"source": self.source,
+			"status": self.status,
+			"attempts": self.attempts,
+			"returnCode": self.returnCode,
+			"duration": self.duration,
+			"frames": self.frames,
+			"logFile": self.logFile,
+		}
+
+
+
+
+class LMRetargetWorker():
+	"""Worker side of the batch retargeting, runs inside of a mayapy process.
+	"""
+
+	log = logging.getLogger("LMRetargetWorker")
+
+
+	@classmethod
+	def command(cls, mayapy:str, jobFile:str, resultFile:str) -> list:
+		"""Returns the command line for starting a worker process for the specified job.
+		"""
+		script = (
+			"import sys; import maya.standalone; maya.standalone.initialize(name='python'); "
+			"import lunar.maya.LunarMayaBatch as lmb; "
+			f"sys.exit(lmb.LMRetargetWorker.run({jobFile!r}, {resultFile!r}))"
+		)
+		return [mayapy, "-c", script]
+
+
+	@classmethod
+	def loadDependencies(cls):
+		"""Loads plugins and mel sources required for retargeting without the ui.
+		"""
+		[cmds.loadPlugin(plugin, quiet=True) for plugin in ["fbxmaya", "mayaHIK", "mayaCharacterization", "retargeterNodes"]]
+		mel.eval('source "hikGlobalUtils.mel"')
+		mel.eval('source "hikDefinitionOperations.mel"')
+		mel.eval('source "hikOverrides.mel"')
+
+
+	@classmethod
+	def run(cls, jobFile:str, resultFile:str) -> int:
+		"""Runs the retargeting for the specified job file.
+
+		The retargeter is initiated with the job's only source, the input directory is overridden so the
+		folder hierarchy is preserved the same way as in a single process run.
+
+		Returns:
+			int: Exit code of the worker process, 0 if the operation was successful.
+
+		"""
+		# LunarMayaRetarget imports this module, it is only imported once the worker runs
+		import lunar.maya.LunarMayaRetarget as lmrtg
+
+		job = LMRetargetJob.fromJson(jobFile)
+		timeStart = time.perf_counter()
+		try:
+			cls.loadDependencies()
+			cmds.file(new=True, force=True)
+
+			retargeter = lmrtg.LMRetargeter(sources=[job.source], **job.settings)
+			retargeter.inputDirectory = qtc.QFileInfo(job.options.pop("inputDirectory"))
+			retargeter.retarget(**job.options)
+
+		except Exception as exception:
+			cls.log.exception(f"Retargeting '{job.source}' failed: {exception}")
+			return 1
+
+		# Fbx import can fail silently - an export without any output is a failure as well
+		missingFiles = [filePath for filePath in retargeter.exportedFiles if not os.path.isfile(filePath) or os.path.getsize(filePath) == 0]
+		if not retargeter.exportedFiles or missingFiles:
+			cls.log.error(f"Retargeting '{job.source}' did not produce the expected files: {missingFiles}")
+			return 2
+
+		with open(resultFile, "w") as file:
+			json.dump({"frames": retargeter.exportedFrames, "duration": time.perf_counter() - timeStart, "stages": retargeter.stageTimes}, file)
+
+		return 0
+
+
+
+
+class LMRetargetSupervisor():
+	"""Runs retargeting jobs in supervised mayapy processes.
+
+	Every job is started in a separate process with a watchdog timeout, failed jobs are retried the
+	specified amount of times and then moved to the quarantine list together with the captured log.
+
+	The supervisor blocks until the whole batch is finished, it is meant to be run from mayapy or the
+	command line and is not wired into the interactive ui.
+
+	"""
+
+	log = logging.getLogger("LMRetargetSupervisor")
+
+
+	def __init__(self,
+		jobs:list,
+		workDirectory:str,
+		mayapy:str=None,
+		timeout:float=900.0,
+		maxRetries:int=2,
+		workers:int=1,
+	) -> None:
+		self.jobs = jobs
+		self.workDirectory = workDirectory
+		self.mayapy = mayapy if mayapy else self.getMayapy()
+		self.timeout = timeout
+		self.maxRetries = maxRetries
+		self.workers = max(1, workers)
+
+		self.quarantine = []
+
+
+	@classmethod
+	def getMayapy(cls) -> str:
+		"""Returns the path to the mayapy executable of the running maya version.
+		"""
+		executable = "mayapy.exe" if platform.system() == "Windows" else "mayapy"
+		return os.path.join(os.environ.get("MAYA_LOCATION", ""), "bin", executable)
+
+
+	def getEnvironment(self) -> dict:
+		"""Returns the environment for the worker processes with lunar on the PYTHONPATH.
+		"""
+		environment = os.environ.copy()
+		pythonPaths = [pathLunarRoot]
+		if environment.get("PYTHONPATH"): pythonPaths.append(environment["PYTHONPATH"])
+		environment["PYTHONPATH"] = os.pathsep.join(pythonPaths)
+
+		return environment
+
+
+	def runAttempt(self, job:LMRetargetJob, index:int) -> bool:
+		"""Runs a single attempt of the job in a new process.
+
+		Returns:
+			bool: True if the worker finished successfully, False if it failed or timed out.
+
+		"""
+		job.attempts += 1
+		baseName = f"{index:05d}_{job.name()}"
+		jobFile = job.toJson(os.path.join(self.workDirectory, f"{baseName}.json"))
+		resultFile = os.path.join(self.workDirectory, f"{baseName}.result.json")
+		job.logFile = os.path.join(self.workDirectory, f"{baseName}.{job.attempts}.log")
+
+		timeStart = time.perf_counter()
+		with open(job.logFile, "w") as file:
+			process = subprocess.Popen(
+				LMRetargetWorker.command(self.mayapy, jobFile, resultFile),
+				stdout=file,
+				stderr=subprocess.STDOUT,
+				env=self.getEnvironment(),
+			)
+			try:
+				job.returnCode = process.wait(timeout=self.timeout)
+			except subprocess.TimeoutExpired:
+				process.kill()
+				process.wait()
+				job.returnCode = None
+				file.write(f"\n# Watchdog: worker killed after exceeding the {self.timeout}s timeout.\n")
+
+		job.duration = time.perf_counter() - timeStart
+		with open(job.logFile, "r", errors="replace") as file:
+			job.log = file.read()
+
+		if job.returnCode == 0 and os.path.isfile(resultFile):
+			with open(resultFile, "r") as file:
+				result = json.load(file)
+			job.frames = result["frames"]
+			LMRetargetCosts.record(job.frames, result["duration"])
+			return True
+
+		return False
+
+
+	def runJob(self, job:LMRetargetJob, index:int) -> bool:
+		"""Runs the job until it succeeds or runs out of retries.
+
+		Returns:
+			bool: True if the operation was successful, False if the job was quarantined.
+
+		"""
+		for attempt in range(self.maxRetries + 1):
+			if self.runAttempt(job, index):
+				job.status = "done"
+				self.log.info(f"Clip {index + 1} / {self.jobs.__len__()} '{job.source}' done in {job.duration:.1f}s.")
+				return True
+
+			self.log.warning(f"Clip '{job.source}' failed attempt {job.attempts} with return code '{job.returnCode}'.")
+
+		job.status = "quarantined"
+		self.quarantine.append(job)
+		self.log.error(f"Clip '{job.source}' moved to quarantine after {job.attempts} attempts, log: '{job.logFile}'")
+		return False
+
+
+	def run(self) -> dict:
+		"""Runs all jobs and writes the report to the work directory.
+
+		Blocks the calling thread until every job is done or quarantined.
+
+		Returns:
+			dict: Report with all jobs and the quarantine list.
+
+		"""
+		if om.MGlobal.mayaState() == om.MGlobal.kInteractive:
+			self.log.warning("The supervisor blocks maya until the batch is finished, run it from mayapy instead.")
+
+		os.makedirs(self.workDirectory, exist_ok=True)
+		self.quarantine = []
+
+		with ThreadPoolExecutor(max_workers=self.workers) as executor:
+			list(executor.map(self.runJob, self.jobs, range(self.jobs.__len__())))
+
+		report = self.report()
+		with open(os.path.join(self.workDirectory, "report.json"), "w") as file:
+			json.dump(report, file, indent=2)
+
+		self.log.info(f"Batch finished: {report['succeeded']} succeeded, {report['failed']} quarantined.")
+		return report
+
+
+	def report(self) -> dict:
+		"""Returns the summary of the batch with the captured logs of the quarantined jobs.
+		"""
+		return {
+			"total": self.jobs.__len__(),
+			"succeeded": len([job for job in self.jobs if job.status == "done"]),
+			"failed": self.quarantine.__len__(),
+			"jobs": [job.report() for job in self.jobs],
+			"quarantine": [dict(job.report(), log=job.log) for job in self.quarantine],
+		}
+
+
+
+
+class LMRetargetBenchmark():
+	"""Quality and throughput regression check of the retarget pipeline against golden outputs.
+
+	A fixed corpus of clips is retargeted, every exported clip is compared to the golden clip with the
+	same relative path and the throughput to the baseline stored next to the golden clips. The
+	benchmark fails if a metric is above its threshold or the throughput dropped by more than the
+	tolerance.
+
+	Usage:
+		retargeter = lmrtg.LMRetargeter(corpusDirectory, targetRig, outputDirectory, sourceTemplate=None)
+		report = LMRetargetBenchmark(retargeter, goldenDirectory).run(rootMotion="extract")
+		if not report["passed"]: print(report["failures"])
+
+	"""
+
+	# Metric limits - degrees, centimeters, see lunar.anim.metrics.compare
+	thresholds = {
+		"rotationErrorMax": 2.0,
+		"positionErrorMax": 1.0,
+		"footSlidingDelta": 5.0,
+		"rootDriftMax": 1.0,
+	}
+	# Allowed throughput drop relative to the baseline
+	throughputTolerance = 0.2
+	baselineFile = "baseline.json"
+	effectorSlots = ["LeftHand", "RightHand", "LeftFoot", "RightFoot", "Head"]
+	contactSlots = ["LeftFoot", "LeftToeBase", "RightFoot", "RightToeBase"]
+
+	log = logging.getLogger("LMRetargetBenchmark")
+
+
+	def __init__(self, retargeter, goldenDirectory:str, reportFile:str=None) -> None:
+		self.retargeter = retargeter
+		self.goldenDirectory = goldenDirectory
+		self.reportFile = reportFile if reportFile else f"{retargeter.outputDirectory.absoluteFilePath()}/benchmark.json"
+
+
+	def getGoldenPath(self, filePath:str) -> str:
+		relativePath = os.path.relpath(filePath, self.retargeter.outputDirectory.absoluteFilePath())
+		return os.path.join(self.goldenDirectory, relativePath).replace("\\", "/")
+
+
+	@classmethod
+	def sampleClip(cls, filePath:str, namespace:str) -> tuple:
+		"""References the clip and samples the world matrices of all its joints.
+
+		Returns:
+			tuple: Joint names without namespace, world matrices (frames, joints, 4, 4).
+
+		"""
+		lm.LMFile.reference(filePath, namespace)
+		try:
+			joints = cmds.ls(f"{namespace}:*", type="joint")
+			startFrame, endFrame = [time.value() for time in lma.LMAnimControl.startEndTimeFromAnimCurves(joints)]
+			matrices = lma.LMAnimBake.sampleMatrices([f"{joint}.worldMatrix[0]" for joint in joints], np.arange(startFrame, endFrame + 1.0))
+		finally:
+			cmds.file(filePath, removeReference=True)
+
+		return [joint.rpartition(":")[2] for joint in joints], matrices
+
+
+	def compareClip(self, filePath:str, definition:dict) -> dict:
+		"""Computes the metrics of the exported clip against its golden clip.
+
+		Args:
+			filePath (str): Exported clip.
+			definition (dict): Template definition of the target rig, used for finding the end effectors,
+				contact joints and the root.
+
+		Returns:
+			dict: Metrics, see lunar.anim.metrics.compare, with the 'file' and the 'failures'.
+
+		"""
+		goldenPath = self.getGoldenPath(filePath)
+		if not os.path.isfile(goldenPath): return {"file": filePath, "failures": ["missingGolden"]}
+
+		joints, world = self.sampleClip(filePath, "BenchmarkOutput")
+		goldenJoints, goldenWorld = self.sampleClip(goldenPath, "BenchmarkGolden")
+
+		# Only the joints present in both clips are compared
+		goldenIndices = {joint: index for index, joint in enumerate(goldenJoints)}
+		shared = [joint for joint in joints if joint in goldenIndices]
+		world = world[:, [joints.index(joint) for joint in shared]]
+		goldenWorld = goldenWorld[:, [goldenIndices[joint] for joint in shared]]
+
+		indices = {joint: index for index, joint in enumerate(shared)}
+		def slotIndices(slots):
+			return [indices[definition[slot]["node"]] for slot in slots if slot in definition and definition[slot]["node"] in indices]
+
+		effectors = slotIndices(self.effectorSlots)
+		feet = slotIndices(self.contactSlots)
+		roots = slotIndices(["Root"])
+
+		upAxis = lma.LMAnimRootMotion.getUpAxis()
+		frameCount = min(world.shape[0], goldenWorld.shape[0])
+		goldenFeet = goldenWorld[:frameCount, feet, 3, :3]
+		heights = goldenFeet[..., upAxis]
+		contacts = lac.detect(
+			heights,
+			lac.speeds(goldenFeet, om.MTime(1.0, om.MTime.kSeconds).asUnits(om.MTime.uiUnit())),
+			lac.referenceHeights(heights),
+			lma.LMAnimContact.heightThreshold,
+			lma.LMAnimContact.speedThreshold,
+			lma.LMAnimContact.minLength,
+			lma.LMAnimContact.maxGap,
+		)
+
+		metrics = lamt.compare(world, goldenWorld, effectors, feet, roots[0] if roots else None, contacts, upAxis)
+		metrics["file"] = filePath
+		metrics["failures"] = lamt.regressions(metrics, self.thresholds)
+		if world.shape[0] != goldenWorld.shape[0]: metrics["failures"].append("frameCount")
+
+		return metrics
+
+
+	def run(self, updateGolden:bool=False, **options) -> dict:
+		"""Runs the corpus through the retargeter and checks the results.
+
+		Args:
+			updateGolden (bool): Whether or not to replace the golden clips and the baseline with the results
+				of this run instead of comparing them.
+			options: Keyword arguments passed to the retarget method.
+
+		Returns:
+			dict: Report with the throughput, the per stage timings, the metrics per clip, the failures and
+				whether or not the benchmark passed, also written to the report file.
+
+		"""
+		timeStart = time.perf_counter()
+		self.retargeter.retarget(**options)
+		duration = time.perf_counter() - timeStart
+		throughput = self.retargeter.exportedFrames / duration if duration else 0.0
+
+		# Definitions of the target rigs are read before the scene is cleared
+		targetCount = max(1, self.retargeter.targetList.__len__())
+		definitions = [dict(target.definition) for target in self.retargeter.targetList]
+		exportedFiles = list(self.retargeter.exportedFiles)
+		cmds.file(new=True, force=True)
+
+		baselinePath = os.path.join(self.goldenDirectory, self.baselineFile)
+		report = {
+			"frames": self.retargeter.exportedFrames,
+			"duration": duration,
+			"throughput": throughput,
+			"stages": dict(self.retargeter.stageTimes),
+			"clips": [],
+			"failures": [],
+		}
+
+		if updateGolden:
+			for filePath in exportedFiles:
+				goldenPath = self.getGoldenPath(filePath)
+				os.makedirs(os.path.dirname(goldenPath), exist_ok=True)
+				shutil.copyfile(filePath, goldenPath)
+			with open(baselinePath, "w") as file:
+				json.dump({"throughput": throughput, "stages": report["stages"]}, file, indent=2)
+			self.log.info(f"Updated {exportedFiles.__len__()} golden clips in '{self.goldenDirectory}'")
+
+		else:
+			for index, filePath in enumerate(exportedFiles):
+				metrics = self.compareClip(filePath, definitions[index % targetCount] if definitions else {})
+				report["clips"].append(metrics)
+				report["failures"].extend(f"{os.path.basename(filePath)}: {failure}" for failure in metrics["failures"])
+
+			try:
+				with open(baselinePath, "r") as file:
+					baseline = json.load(file)
+			except (OSError, ValueError):
+				baseline = None
+				self.log.warning(f"No baseline found in '{self.goldenDirectory}', throughput is not checked.")
+
+			if baseline:
+				report["baselineThroughput"] = baseline["throughput"]
+				if throughput < baseline["throughput"] * (1.0 - self.throughputTolerance):
+					report["failures"].append(f"throughput: {throughput:.1f} fps, baseline {baseline['throughput']:.1f} fps")
+
+		report["passed"] = not report["failures"]
+		os.makedirs(os.path.dirname(self.reportFile), exist_ok=True)
+		with open(self.reportFile, "w") as file:
+			json.dump(report, file, indent=2)
+
+		if report["passed"]: self.log.info(f"Benchmark passed at {throughput:.1f} fps, report: '{self.reportFile}'")
+		else: self.log.error(f"Benchmark failed: {report['failures']}")
+
+		return report
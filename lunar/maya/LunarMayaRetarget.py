@@ -1,9 +1,15 @@
 # Built-in imports
 import os
 import json
+import time
+import marshal
+import hashlib
+import importlib
+import importlib.util
 import platform
 import subprocess
 import logging
+import functools
 from collections import OrderedDict
 
 # Third-party imports
@@ -12,18 +18,18 @@ from maya import mel
 import maya.OpenMaya as om
 import maya.OpenMayaAnim as oma
 from PySide2 import QtCore as qtc
+import numpy as np
 
 # Custom imports
+import lunar.anim.quaternion as laq
+import lunar.anim.skeleton as lans
+import lunar.anim.solver as las
+import lunar.anim.detect as lad
+from lunar.anim.posetrack import PoseTrack
 import lunar.maya.LunarMaya as lm
 import lunar.maya.LunarMayaAnim as lma
 import lunar.maya.LunarMayaRig as lmr
-
-# HumanIk templates
-import lunar.maya.resources.retarget.humanik as lmrrhi
-import lunar.maya.resources.retarget.lunarctrl as lmrrlc
-import lunar.maya.resources.retarget.lego as lmrrl
-import lunar.maya.resources.retarget.sinnersdev as lmrrsd
-import lunar.maya.resources.retarget.unreal as lmrrue
+import lunar.maya.LunarMayaBatch as lmb
 
 
 
@@ -54,6 +60,215 @@ if (om.MGlobal.mayaState() == om.MGlobal.kInteractive): loadDependencies()
 
 
 
+#--------------------------------------------------------------------------------------------------
+# Templates
+#--------------------------------------------------------------------------------------------------
+
+
+
+
+class LMTemplateRegistry():
+	"""Lazy loader for the retarget templates in lunar/maya/resources/retarget.
+
+	A template module is only imported the first time one of its templates is requested. Its template
+	dictionaries are cached as marshal files keyed by the hash of the module source, later sessions
+	load the cache instead of executing the module.
+
+	"""
+
+	package = "lunar.maya.resources.retarget"
+	pathCache = f"{lmb.pathLunarCache}/templates"
+	modules = {}
+	indices = {}
+
+	log = logging.getLogger("LMTemplateRegistry")
+
+
+	@classmethod
+	def getSourcePath(cls, module:str) -> str:
+		return importlib.util.find_spec(f"{cls.package}.{module}").origin
+
+
+	@classmethod
+	def loadModule(cls, module:str) -> dict:
+		"""Returns all template dictionaries of the module, from the cache if it is up to date.
+		"""
+		if module in cls.modules: return cls.modules[module]
+
+		with open(cls.getSourcePath(module), "rb") as file:
+			digest = hashlib.sha1(file.read() + str(marshal.version).encode()).hexdigest()
+		filePath = f"{cls.pathCache}/{module}-{digest[:16]}.marshal"
+
+		try:
+			with open(filePath, "rb") as file:
+				templates = marshal.load(file)
+		except (OSError, EOFError, ValueError, TypeError):
+			moduleObj = importlib.import_module(f"{cls.package}.{module}")
+			templates = {name: value for name, value in vars(moduleObj).items() if name.startswith("template") and isinstance(value, dict)}
+			try:
+				os.makedirs(cls.pathCache, exist_ok=True)
+				fileTemp = f"{filePath}.{os.getpid()}.tmp"
+				with open(fileTemp, "wb") as file:
+					marshal.dump(templates, file)
+				os.replace(fileTemp, filePath)
+			except (OSError, ValueError) as error:
+				cls.log.warning(f"Could not cache the '{module}' templates: {error}")
+
+		cls.modules[module] = templates
+		return templates
+
+
+	@classmethod
+	def get(cls, module:str, template:str) -> dict:
+		"""Returns the template e.g. get('unreal', 'templateMH').
+		"""
+		return cls.loadModule(module)[template]
+
+
+	@classmethod
+	def getIndices(cls, module:str, template:str) -> dict:
+		"""Returns the precomputed lookups of the template definition.
+
+		Returns:
+			dict: 'nodeToId' and 'idToNode' for the definition, 'minimal' with the nodes of the minimal
+				definition.
+
+		"""
+		key = (module, template)
+		if key not in cls.indices:
+			data = cls.get(module, template)
+			definition = data.get("definition", {})
+			cls.indices[key] = {
+				"nodeToId": {entry["node"]: entry["id"] for entry in definition.values()},
+				"idToNode": {entry["id"]: entry["node"] for entry in definition.values()},
+				"minimal": frozenset(entry["node"] for entry in data.get("minimalDefinition", {}).values()),
+			}
+
+		return cls.indices[key]
+
+
+
+
+class LMTemplate():
+	"""Class attribute resolving a template entry on first access.
+
+	Usage:
+		class LMMetaHuman(LMHumanIk):
+			definition = LMTemplate("unreal", "templateMH", "definition")
+
+	"""
+
+	def __init__(self, module:str, template:str, key:str) -> None:
+		self.module = module
+		self.template = template
+		self.key = key
+
+
+	def __set_name__(self, owner, name:str) -> None:
+		self.owner = owner
+		self.name = name
+
+
+	def __get__(self, instance, owner):
+		value = LMTemplateRegistry.get(self.module, self.template)[self.key]
+		# Replace the descriptor, later lookups are plain attribute reads
+		setattr(self.owner, self.name, value)
+		return value
+
+
+
+
+class LMTemplateDetector():
+	"""Detects the retarget template of a skeleton from its joint names and hierarchy.
+
+	The index of all candidate templates is built on first use, detection runs in milliseconds so it
+	can be done on every import.
+
+	Usage:
+		hikTemplate, confidence = LMTemplateDetector.detect(cmds.ls("Mocap:*", type="joint"))
+
+	"""
+
+	# Templates which can be detected, the ctrl and export rigs are never used as a mocap source
+	templates = ["HumanIk", "MetaHuman", "MannequinUe5", "MannequinUe4", "SinnersDev2", "SinnersDev1"]
+	# Score the best template needs to reach
+	minScore = 0.5
+	# Below this score difference to the runner up the detection is reported as ambiguous
+	minConfidence = 0.02
+	index = None
+
+	log = logging.getLogger("LMTemplateDetector")
+
+
+	@classmethod
+	def getIndex(cls) -> lad.TemplateIndex:
+		"""Returns the name index of the candidate templates.
+		"""
+		if cls.index is None:
+			templates = {}
+			for name in cls.templates:
+				rig = LMRetargeter.hikTemplates[name]
+				templates[name] = {
+					"definition": rig.definition,
+					"minimalDefinition": rig.minimalDefinition,
+					"joints": getattr(rig, "tPose", {}).keys(),
+				}
+			cls.index = lad.TemplateIndex(templates)
+
+		return cls.index
+
+
+	@classmethod
+	def getHierarchy(cls, nodes:list) -> tuple:
+		"""Returns the joint names and their parents read from the long dag paths.
+		"""
+		joints = []
+		parents = {}
+		for path in cmds.ls(nodes, type="joint", long=True):
+			names = path.split("|")
+			joints.append(names[-1])
+			if names.__len__() > 2:
+				for parent, child in zip(names[1:-1], names[2:]): parents[child] = parent
+
+		return joints, parents
+
+
+	@classmethod
+	def detect(cls, nodes:list) -> tuple:
+		"""Returns the best matching template for the joints.
+
+		Args:
+			nodes (list): Joints of the skeleton, other node types are ignored.
+
+		Returns:
+			tuple: Template name and confidence - the score difference to the runner up, (None, 0.0) if no
+				template matches.
+
+		"""
+		timeStart = time.perf_counter()
+		joints, parents = cls.getHierarchy(nodes)
+		hikTemplate, confidence = cls.getIndex().detect(joints, parents, cls.minScore)
+		timeMs = (time.perf_counter() - timeStart) * 1000.0
+
+		if hikTemplate is None:
+			cls.log.warning(f"Could not detect the template of '{joints.__len__()}' joints.")
+		elif confidence < cls.minConfidence:
+			cls.log.warning(f"Detected '{hikTemplate}' template is ambiguous, confidence: {confidence:.3f}")
+		else:
+			cls.log.info(f"Detected '{hikTemplate}' template, confidence: {confidence:.3f} in {timeMs:.1f}ms")
+
+		return hikTemplate, confidence
+
+
+	@classmethod
+	def detectFromNamespace(cls, namespace:str="") -> tuple:
+		"""Returns the best matching template for the joints in the namespace, all joints if not specified.
+		"""
+		return cls.detect(cmds.ls(f"{namespace}:*" if namespace else "*", type="joint"))
+
+
+
+
 #--------------------------------------------------------------------------------------------------
 # HumanIk Base
 #--------------------------------------------------------------------------------------------------
@@ -88,9 +303,11 @@ class LMHumanIk():
 		setup mayaBatch -> create a gui independent mode (batch mode with ui scripts dependend
 
 	"""
-	minimalDefinition = lmrrhi.templateHik["minimalDefinition"]
-	definition = lmrrhi.templateHik["definition"]
+	minimalDefinition = LMTemplate("humanik", "templateHik", "minimalDefinition")
+	definition = LMTemplate("humanik", "templateHik", "definition")
 	hikTemplate = "HumanIk"
+	# Mocap cleanup strength presets, the LMAnimCleanup presets are used if not specified
+	cleanupPresets = None
 
 
 	def __init__(self, name:str="HiK") -> None:
@@ -108,6 +325,7 @@ class LMHumanIk():
 
 		self.root = self.getRoot()
 		self.rootCnst = None
+		self.poseTrack = None
 
 
 	def initSetup(self):
@@ -121,7 +339,9 @@ class LMHumanIk():
 			self.log.info(f"Initiated from existing character.")
 		else:
 			if self.validateDefinition:
-				self.setupCharacter()
+				if not self.restoreCharacterization():
+					self.setupCharacter()
+					self.saveCharacterization()
 				self.valid = True
 			else:
 				self.log.critical("Could not validate definiton.")
@@ -240,6 +460,9 @@ class LMHumanIk():
 				which requires additional queries (slow).
 
 		"""
+		# The contextual ui does not exist in batch mode
+		if om.MGlobal.mayaState() != om.MGlobal.kInteractive: return
+
 		if updateCharacter:
 			mel.eval('hikUpdateCharacterList')
 			mel.eval('hikUpdateCurrentCharacterFromUI()')
@@ -288,26 +511,19 @@ class LMHumanIk():
 			dict: Dictonary with attribute values for the pose.
 
 		"""
-		pose = {}
-		for node in nodes:
-			pose[node] = {attr: cmds.getAttr(f'{node}.{attr}') for attr in self.getAttributesFromChannelBox(node)}
-
-		return pose
+		return lma.LMAnimPose.get({node: self.getAttributesFromChannelBox(node) for node in nodes})
 
 
 	def setPose(self, pose):
 		"""Sets a pose from the given set-dictionary.
 
+		The plugs are resolved once per namespace and set as one undo step, see LMAnimPose.apply.
+
 		Args:
 			pose (dict): Dictonary with complete set of nodes and their values for all keyable attributes.
 
 		"""
-		for node in pose:
-			ctrl = self.nameWithNamespace(node)
-			if not cmds.objExists(ctrl): continue
-			for attr in pose[node]:
-				attrNs = f'{ctrl}.{attr}'
-				if cmds.getAttr(attrNs, settable=True):	cmds.setAttr(attrNs, pose[node][attr])
+		lma.LMAnimPose.apply(pose, self.namespace)
 
 
 	def setTPose(self, moveToOrigin=True) -> bool:
@@ -385,6 +601,52 @@ class LMHumanIk():
 		return True
 
 
+	def fixFloorContacts(self, startFrame:float=None, endFrame:float=None, fixPositiveY:bool=False, pin:bool=False) -> dict or None:
+		"""Fixes the floor contacts of the baked animation for the whole clip.
+
+		Clip version of fixFloorContact, the feet and toes contacts are detected for all frames and the
+		hips translation is offset per contact interval, see LMAnimContact.fixFloor.
+
+		Args:
+			startFrame (float): Start frame, if None the animation start time is used.
+			endFrame (float): End frame, if None the animation end time is used.
+			fixPositiveY (bool): Whether or not a clip floating above the ground is moved down as well.
+			pin (bool): Whether or not to create the IK pinning target locators.
+
+		Returns:
+			dict or None: The contact data, None if the hips or contact joints do not exist.
+
+		"""
+		if startFrame is None: startFrame = lma.LMAnimControl.animationStartTime().value()
+		if endFrame is None: endFrame = lma.LMAnimControl.animationEndTime().value()
+
+		hipNode = self.nameWithNamespace(self.definition["Hips"]["node"])
+		if not cmds.objExists(hipNode): return None
+
+		slots = ["LeftFoot", "LeftToeBase", "RightFoot", "RightToeBase"]
+		nodes = [self.nameWithNamespace(self.definition[slot]["node"]) for slot in slots if slot in self.definition]
+		nodes = [node for node in nodes if cmds.objExists(node)]
+		if not nodes: return None
+
+		return lma.LMAnimContact.fixFloor(hipNode, nodes, startFrame, endFrame, fixPositive=fixPositiveY, pin=pin)
+
+
+	def cleanUpAnimation(self, method:str=None) -> dict or None:
+		"""Removes the spikes and smooths the baked animation with the cleanup presets, see LMAnimCleanup.
+
+		Args:
+			method (str): 'butterworth' or 'savitzkyGolay', defaults to the LMAnimCleanup method.
+
+		Returns:
+			dict or None: Number of cleaned curves and removed spikes, None if there are no export nodes.
+
+		"""
+		nodes = self.getExportNodes()
+		if not nodes: return None
+
+		return lma.LMAnimCleanup.cleanUp(nodes, self.cleanupPresets, method)
+
+
 	def getRoot(self) -> str or None:
 		"""Gets the root joint from the character definition dictionary.
 
@@ -452,6 +714,109 @@ class LMHumanIk():
 				continue
 			mel.eval(f'setCharacterObject("{node}", "{self.character}", {self.definition[i]["id"]}, 0);')
 
+		# Stance for the characterization cache
+		self.stance = lma.LMAnimPose.get(self.getDefinitionPose(), self.namespace)
+
+
+	def getDefinitionPose(self) -> dict:
+		"""Returns the translate and rotate attributes of the definition joints without namespace.
+		"""
+		return {entry["node"]: lm.listAttrTRXYZ for entry in self.definition.values()}
+
+
+	def getRigFile(self) -> str or None:
+		"""Returns the referenced file the rig comes from.
+
+		Imported rigs return None and are not cached, the scene file does not identify the rig - any
+		skeleton imported into the same scene would share its entry.
+
+		"""
+		if self.root and cmds.referenceQuery(self.root, isNodeReferenced=True):
+			return cmds.referenceQuery(self.root, filename=True, withoutCopyNumber=True)
+
+		return None
+
+
+	def getDefinitionSlots(self) -> set:
+		"""Returns the HumanIK slots of the definition, the character node attributes they connect to.
+		"""
+		return {slot for slot, entry in self.definition.items() if entry["id"] < 500}
+
+
+	def saveCharacterization(self) -> bool:
+		"""Stores the characterization of the rig file in the character cache, see restoreCharacterization.
+
+		Returns:
+			bool: True if the operation was successful, False if an	error occured during the operation.
+
+		"""
+		self.root = self.getRoot()
+		key = lmb.LMCharacterCache.getKey(self.getRigFile(), self.hikTemplate)
+		if key is None or not getattr(self, "stance", None): return False
+
+		# Only the definition slots, the property state and solver links are made by the setup
+		slots = self.getDefinitionSlots()
+		connections = cmds.listConnections(self.character, source=True, destination=False, connections=True, plugs=True) or []
+		mapping = [
+			(plug.split(".", 1)[1], lm.LMNamespace.removeNamespaceFromName(source.split(".", 1)[0]))
+			for plug, source in zip(connections[::2], connections[1::2])
+			if source.endswith(".message") and plug.split(".", 1)[1] in slots
+		]
+		self.nodeProperties = self.getPropertiesNode()
+		properties = {
+			attr: cmds.getAttr(f"{self.nodeProperties}.{attr}")
+			for attr in cmds.listAttr(self.nodeProperties, scalar=True, settable=True, keyable=True) or []
+		}
+		lmb.LMCharacterCache.update(key, {
+			"mapping": mapping,
+			"tPose": self.stance,
+			"pose": lma.LMAnimPose.get(self.getDefinitionPose(), self.namespace),
+			"properties": properties,
+		})
+
+		self.log.info(f"Stored the characterization of '{self.character}'")
+		return True
+
+
+	def restoreCharacterization(self) -> bool:
+		"""Recreates the character from the character cache instead of characterizing every joint.
+
+		The definition connections are made in one MDGModifier, the T-pose, the pose after the setup and
+		the properties are applied in bulk.
+
+		Returns:
+			bool: True if the characterization was restored, False if there is no cached one.
+
+		"""
+		self.root = self.getRoot()
+		data = lmb.LMCharacterCache.get(lmb.LMCharacterCache.getKey(self.getRigFile(), self.hikTemplate))
+		if not data: return False
+
+		lma.LMAnimPose.apply(data["tPose"], self.namespace)
+		self.createCharacterDefinition()
+
+		slots = self.getDefinitionSlots()
+		dgModifier = om.MDGModifier()
+		for attr, node in data["mapping"]:
+			node = self.nameWithNamespace(node)
+			if attr not in slots or not cmds.objExists(node): continue
+			source, destination = lma.LMAnimCurves.getPlugs([f"{node}.message", f"{self.character}.{attr}"])
+			dgModifier.connect(source, destination)
+		dgModifier.doIt()
+
+		self.lockCharacter()
+		lma.LMAnimPose.apply({self.nodeProperties: data["properties"]})
+		lma.LMAnimPose.apply(data["pose"], self.namespace)
+
+		solverNode = self.getSolverNode()
+		if solverNode: cmds.rename(solverNode, f'{self.character}Solver')
+
+		state2kSKNode = self.getState2SkNode()
+		if state2kSKNode: cmds.rename(state2kSKNode, f'{self.character}State2SK')
+
+		self.log.info(f"Restored the characterization of '{self.character}' from the cache")
+		return True
+
 
 	def lockCharacter(self, value=True):
 		"""Set the lock state on the specified character.
@@ -799,13 +1164,7 @@ class LMHumanIk():
 
 		"""
 		if nodes:
-			animCurves = []
-			for node in nodes:
-				for attr in lm.listAttrRXYZ:
-					listConnections = cmds.listConnections(f'{node}.{attr}', source=True, destination=False, type="animCurve")
-					if listConnections: animCurves.append(listConnections[0])
-
-			cmds.filterCurve(animCurves)
+			lma.LMAnimFilter.eulerFilter(nodes)
 			return True
 
 		return False
@@ -835,9 +1194,45 @@ class LMHumanIk():
 
 
 	def setSourceAndBake(self, source, startFrame=None, endFrame=None, rootMotion=True, rootRotationOffset=0, oversamplingRate=1):
-		"""Wrapper method for setting the source and baking in one go."""
+		"""Wrapper method for setting the source and baking in one go.
+
+		An oversampling rate above one upreses the baked animation, see oversampleAnimation.
+
+		"""
 		self.setSource(source, rootMotion, rootRotationOffset)
 		self.bakeAnimation(startFrame, endFrame)
+		if oversamplingRate > 1: self.oversampleAnimation(oversamplingRate, startFrame, endFrame)
+
+
+	def oversampleAnimation(self, oversamplingRate:int, startFrame:float=None, endFrame:float=None) -> float or None:
+		"""Upreses the baked animation, the keys are added in between the frames.
+
+		The scene keeps its time unit. The fbx export drops the keys in between the frames, export the
+		clip with the scene switched to the oversampled frame rate, see
+		LMAnimRetime.setOversampledTimeUnit and LMRetargeter.retargetClip.
+
+		Args:
+			oversamplingRate (int): Number of keys per frame.
+			startFrame (float): First baked frame, if None the animation start time is used.
+			endFrame (float): Last baked frame, if None the animation end time is used.
+
+		Returns:
+			float or None: The end frame, None if there are no export nodes.
+
+		Raises:
+			ValueError: If maya has no time unit for the oversampled frame rate.
+
+		"""
+		nodes = self.getExportNodes()
+		if not nodes: return None
+
+		# Fail before the keys are touched if the clip could not be exported at the oversampled rate
+		lma.LMAnimRetime.getTimeUnit(lma.LMAnimRetime.getFrameRate() * oversamplingRate)
+
+		if not startFrame: startFrame = lma.LMAnimControl.animationStartTime().value()
+		if not endFrame: endFrame = lma.LMAnimControl.animationEndTime().value()
+
+		return lma.LMAnimRetime.retime(nodes, startFrame, endFrame, 1.0, oversamplingRate)
 
 
 	def bakeAnimation(self, startFrame=None, endFrame=None) -> bool:
@@ -860,18 +1255,160 @@ class LMHumanIk():
 				if not startFrame: startFrame = lma.LMAnimControl.animationStartTime().value()
 				if not endFrame: endFrame = lma.LMAnimControl.animationEndTime().value()
 
-				lma.LMAnimBake.bakeTransform(nodes, (startFrame, endFrame))
+				# The api engine bakes through a pose track which is already euler filtered
+				self.poseTrack = lma.LMAnimBake.bakeTransform(nodes, (startFrame, endFrame))
 
-				self.filterRotations(nodes)
+				self.bakeAnimationPost(nodes, startFrame, endFrame, self.poseTrack is None and not lma.LMAnimBake.isChunked((startFrame, endFrame)))
+				return True
 
-				self.cleanUpBakeNodes()
+		return False
 
-				self.setSource("None")
 
-				self.log.info(f"Successfully baked animation from '{startFrame}' to '{endFrame}'")
-				return True
+	def getIntermediateJoints(self, paths:list) -> list:
+		"""Returns the joints in between the given nodes and their closest ancestor among them.
 
-		return False
+		Args:
+			paths (list): Long names of the nodes.
+
+		Returns:
+			list: Long names of the intermediate joints, chains with other node types are skipped.
+
+		"""
+		pathSet = set(paths)
+		intermediates = OrderedDict()
+		for path in paths:
+			between = []
+			ancestor = path.rsplit("|", 1)[0]
+			while ancestor and ancestor not in pathSet:
+				between.append(ancestor)
+				ancestor = ancestor.rsplit("|", 1)[0]
+			if not ancestor or not between: continue
+			if all(cmds.objectType(node) == "joint" for node in between): intermediates.update(dict.fromkeys(between))
+
+		return [path for path in intermediates if path not in pathSet]
+
+
+	def getSolverJoints(self) -> tuple:
+		"""Returns the definition joints for the fk solver sorted parents first.
+
+		Joints in between the definition joints are included, they are not paired with the source and
+		keep their rest transform, see lunar.anim.solver.
+
+		Returns:
+			tuple: Joint names without namespace, joint names with namespace and the parent index per
+				joint, -1 for joints whose parent is not in the list.
+
+		"""
+		joints = [entry["node"] for entry in self.definition.values() if cmds.objExists(self.nameWithNamespace(entry["node"]))]
+		joints = list(OrderedDict.fromkeys(joints))
+		paths = [cmds.ls(self.nameWithNamespace(joint), long=True)[0] for joint in joints]
+		for path in self.getIntermediateJoints(paths):
+			joints.append(lm.LMNamespace.removeNamespaceFromName(path.rsplit("|", 1)[-1]))
+			paths.append(path)
+		order = sorted(range(joints.__len__()), key=lambda index: paths[index].count("|"))
+		joints = [joints[index] for index in order]
+		paths = [paths[index] for index in order]
+
+		pathIndices = {path: index for index, path in enumerate(paths)}
+		parents = [pathIndices.get(path.rsplit("|", 1)[0], -1) for path in paths]
+
+		return joints, [self.nameWithNamespace(joint) for joint in joints], parents
+
+
+	def transferFromSourceFk(self, source, startFrame=None, endFrame=None) -> bool:
+		"""Retargets the animation of the source with the numpy fk solver instead of HumanIK.
+
+		The rest offsets are computed from the T-poses of both rigs, they are set before reading the rest
+		matrices and the previous poses are restored afterwards. The source world matrices are sampled for
+		all frames, solved on the arrays and the joint curves are written in one bulk operation.
+
+		Args:
+			source (LMHumanIk): Source rig with a definition template.
+			startFrame (int): First frame, if none it will query the timesliders start frame.
+			endFrame (int): Last frame, if none it will query the timesliders end frame.
+
+		Returns:
+			bool: True if the operation was successful, False if an	error occured during the operation.
+
+		"""
+		if not self.isValid(): return False
+
+		if not startFrame: startFrame = lma.LMAnimControl.animationStartTime().value()
+		if not endFrame: endFrame = lma.LMAnimControl.animationEndTime().value()
+
+		sourceJoints, sourceNodes, sourceParents = source.getSolverJoints()
+		joints, nodes, parents = self.getSolverJoints()
+
+		# Rest offsets from the T-poses of both rigs, joints in between the definition joints are at rest
+		skeletons = ((source, sourceJoints), (self, joints))
+		poses = [(rig, lma.LMAnimPose.get({joint: lm.listAttrTRXYZ for joint in rigJoints}, rig.namespace)) for rig, rigJoints in skeletons]
+		try:
+			for rig, rigJoints in skeletons:
+				rig.setTPose()
+				definitionNodes = {entry["node"] for entry in rig.definition.values()}
+				rig.setPose({joint: {"rotateX": 0.0, "rotateY": 0.0, "rotateZ": 0.0} for joint in rigJoints if joint not in definitionNodes})
+			sourceRest = lma.LMAnimBake.readMatrices([f"{node}.worldMatrix[0]" for node in sourceNodes])
+			targetRest = lma.LMAnimBake.readMatrices([f"{node}.worldMatrix[0]" for node in nodes])
+		finally:
+			for rig, pose in poses: lma.LMAnimPose.apply(pose, rig.namespace)
+		solver = las.RetargetSolver.fromTemplates(source.definition, sourceJoints, sourceRest, self.definition, joints, targetRest, parents)
+
+		times = np.arange(startFrame, endFrame + 0.5)
+		plugs = [f"{node}.worldMatrix[0]" for node in sourceNodes] + [f"{node}.parentMatrix[0]" for node in nodes]
+		matrices = lma.LMAnimBake.sampleMatrices(plugs, times)
+		world = solver.solve(matrices[:, :sourceNodes.__len__()])
+
+		toInternal = om.MDistance.uiToInternal(1.0)
+		rotateOrders = [laq.rotateOrders[cmds.getAttr(f"{node}.rotateOrder")] for node in nodes]
+		translations, rotations = lans.transferToJoints(
+			world,
+			parents,
+			matrices[:, sourceNodes.__len__():],
+			np.ones(nodes.__len__(), dtype=bool),
+			np.array([cmds.getAttr(f"{node}.translate")[0] for node in nodes]) * toInternal,
+			np.radians([cmds.getAttr(f"{node}.jointOrient")[0] for node in nodes]),
+			np.radians([cmds.getAttr(f"{node}.rotateAxis")[0] for node in nodes]),
+			rotateOrders,
+		)
+
+		frameRate = om.MTime(1.0, om.MTime.kSeconds).asUnits(om.MTime.uiUnit())
+		self.poseTrack = PoseTrack(np.concatenate((translations, rotations), axis=-1), nodes, startFrame=startFrame, frameRate=frameRate, rotateOrders=rotateOrders)
+		self.poseTrack.eulerFilter()
+		lma.LMAnimCurves.writePoseTrack(self.poseTrack)
+
+		self.log.info(f"Successfully solved animation from '{startFrame}' to '{endFrame}' with the fk solver")
+		return True
+
+
+	def bakeAnimationPost(self, nodes, startFrame, endFrame, filterRotations=True) -> None:
+		"""Filters the baked rotations and disconnects the source, shared by single and multi target bakes.
+		"""
+		if filterRotations: self.filterRotations(nodes)
+
+		self.cleanUpBakeNodes()
+
+		self.setSource("None")
+
+		self.log.info(f"Successfully baked animation from '{startFrame}' to '{endFrame}'")
+
+
+	def processRootMotion(self, poseTrack:PoseTrack=None, inPlace:bool=False) -> bool:
+		"""Derives the root motion from the baked hips, see LMAnimRootMotion.
+
+		Args:
+			poseTrack (PoseTrack): Baked track with the export nodes, if not specified the baked curves are
+				processed.
+			inPlace (bool): Whether or not to convert to an in-place clip instead of a root motion clip.
+
+		Returns:
+			bool: True if the operation was successful, False if an	error occured during the operation.
+
+		"""
+		if not self.root: return False
+		hips = self.nameWithNamespace(self.definition["Hips"]["node"])
+		if poseTrack is None: return lma.LMAnimRootMotion.processCurves(self.getExportNodes(), self.root, hips, inPlace)
+
+		return lma.LMAnimRootMotion.process(poseTrack, self.root, hips, inPlace)
 
 
 	def exportAnimation(self, filePath, startFrame=None, endFrame=None, bake=False) -> bool:
@@ -975,11 +1512,11 @@ class LMMetaHuman(LMHumanIk):
 	TODO split the metahuman rig into body and rig file
 
 	"""
-	minimalDefinition = lmrrue.templateMH["minimalDefinition"]
-	definition = lmrrue.templateMH["definition"]
+	minimalDefinition = LMTemplate("unreal", "templateMH", "minimalDefinition")
+	definition = LMTemplate("unreal", "templateMH", "definition")
 	hikTemplate = "MetaHuman"
-	tPose = lmrrue.templateMH["tPose"]
-	aPose = lmrrue.templateMH["aPose"]
+	tPose = LMTemplate("unreal", "templateMH", "tPose")
+	aPose = LMTemplate("unreal", "templateMH", "aPose")
 
 
 	def __init__(self, name:str="HiK") -> None:
@@ -995,6 +1532,7 @@ class LMMetaHuman(LMHumanIk):
 
 		self.root = self.getRoot()
 		self.rootCnst = None
+		self.poseTrack = None
 
 
 	def accessoryJoints(self, value:bool=False):
@@ -1070,8 +1608,8 @@ class LMMannequinUe5(LMMetaHuman):
 
 	"""
 	hikTemplate = "MannequinUe5"
-	tPose = lmrrue.templateUe5["tPose"]
-	aPose = lmrrue.templateUe5["aPose"]
+	tPose = LMTemplate("unreal", "templateUe5", "tPose")
+	aPose = LMTemplate("unreal", "templateUe5", "aPose")
 
 
 	def __init__(self, name:str="HiK") -> None:
@@ -1087,6 +1625,7 @@ class LMMannequinUe5(LMMetaHuman):
 
 		self.root = self.getRoot()
 		self.rootCnst = None
+		self.poseTrack = None
 
 
 	def importSetup(self):
@@ -1111,8 +1650,8 @@ class LMMannequinUe4(LMMetaHuman):
 
 	"""
 	hikTemplate = "MannequinUe4"
-	tPose = lmrrue.templateUe4["tPose"]
-	aPose = lmrrue.templateUe4["aPose"]
+	tPose = LMTemplate("unreal", "templateUe4", "tPose")
+	aPose = LMTemplate("unreal", "templateUe4", "aPose")
 
 
 	def __init__(self, name:str="HiK") -> None:
@@ -1128,6 +1667,7 @@ class LMMannequinUe4(LMMetaHuman):
 
 		self.root = self.getRoot()
 		self.rootCnst = None
+		self.poseTrack = None
 
 
 
@@ -1148,11 +1688,12 @@ class LMLunarCtrl(LMHumanIk):
 		Sync with other modules / classes
 
 	"""
-	minimalDefinition = lmrrlc.templateLC["minimalDefinition"]
-	definition = lmrrlc.templateLC["definition"]
+	minimalDefinition = LMTemplate("lunarctrl", "templateLC", "minimalDefinition")
+	definition = LMTemplate("lunarctrl", "templateLC", "definition")
 	hikTemplate = "LunarCtrl"
-	tPose = lmrrlc.templateLC["tPose"]
-	aPose = lmrrlc.templateLC["aPose"]
+	tPose = LMTemplate("lunarctrl", "templateLC", "tPose")
+	aPose = LMTemplate("lunarctrl", "templateLC", "aPose")
+	cleanupPresets = LMTemplate("lunarctrl", "templateLC", "cleanup")
 
 	sourceAndBakeTemplate = {
 		"HumanIk": 			[False, 0],
@@ -1288,6 +1829,7 @@ class LMLunarCtrl(LMHumanIk):
 		self.ctrlMain = self.getCtrlMain()
 		self.root = self.getRoot()
 		self.rootCnst = None
+		self.poseTrack = None
 
 
 	def getCtrlMain(self) -> str or None:
@@ -1466,6 +2008,7 @@ class LMLunarCtrl(LMHumanIk):
 
 		self.setSource(source, rootMotion, rootRotationOffset)
 		self.bakeAnimation(startFrame, endFrame)
+		if oversamplingRate > 1: self.oversampleAnimation(oversamplingRate, startFrame, endFrame)
 
 
 	def getExportNodes(self) -> list or None:
@@ -1562,10 +2105,10 @@ class LMLunarCtrl(LMHumanIk):
 				if not startFrame: startFrame = lma.LMAnimControl.animationStartTime().value()
 				if not endFrame: endFrame = lma.LMAnimControl.animationEndTime().value()
 
-				LMHik.bakeCharacter(nodes, (startFrame, endFrame))  # -> preserveOutsideKeys does not work 4-6s
+				self.poseTrack = LMHik.bakeCharacter(nodes, (startFrame, endFrame))  # -> preserveOutsideKeys does not work 4-6s
 				# LMHik.bakeCharacter(nodes=self.getAttrs(), startEnd=(startFrame, endFrame))
 
-				self.filterRotations(nodes)
+				if self.poseTrack is None and not lma.LMAnimBake.isChunked((startFrame, endFrame)): self.filterRotations(nodes)
 
 				# Clean up -> include the rest in a overriden cleanUpBakeNodes method
 				self.cleanUpBakeNodes()
@@ -1674,6 +2217,13 @@ class LMLunarExport(LMMannequinUe5):
 
 	"""
 	hikTemplate = "LunarExport"
+	exportMapping = LMTemplate("lunarctrl", "templateLC", "exportMapping")
+	# Bake from the ctrl rig without constraints
+	directTransfer = True
+	# Ctrl curve snapshots of the last incremental bake per scene, namespace and root node
+	bakeStates = {}
+	# Frames re-baked around every edited range
+	dirtyPadding = 2.0
 	# mainCtrl = "main_ctrl"
 	
 	# ModDg = om.MDGModifier()
@@ -1691,6 +2241,16 @@ class LMLunarExport(LMMannequinUe5):
 
 		self.root = self.getRoot()
 		self.rootCnst = None
+		self.poseTrack = None
+
+
+	def getCtrlRigMapping(self, source:LMLunarCtrl) -> list:
+		"""Returns the ctrl / out node, export joint and translate flag for every entry of the export mapping.
+		"""
+		return [
+			(source.nameWithNamespace(entry["node"]), self.nameWithNamespace(joint), entry["translate"])
+			for joint, entry in self.exportMapping.items()
+		]
 
 
 	def setCtrlRigAsSource(self, source:LMLunarCtrl):
@@ -1700,7 +2260,6 @@ class LMLunarExport(LMMannequinUe5):
 
 		"""
 		# Get namespaces
-		tarns = f"{source.namespace}:"
 		srcns = f"{self.namespace}:"
 		# Construct list for constraints
 		self.listConstraints = []
@@ -1721,91 +2280,11 @@ class LMLunarExport(LMMannequinUe5):
 		lm.LMAttribute.unlockPlugIfLocked(f"{srcns}weapon_r", ["translate"])
 
 		# connect constraints
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}root_ctrl", f"{srcns}root", maintainOffset=False))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}pelvis_rot_ctrl", f"{srcns}pelvis", maintainOffset=False))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}spine_01_ctrl", f"{srcns}spine_01", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}spine_02_ctrl", f"{srcns}spine_02", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}spine_03_ctrl", f"{srcns}spine_03", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}spine_04_ctrl", f"{srcns}spine_04", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}spine_05_ctrl", f"{srcns}spine_05", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}neck_01_out", f"{srcns}neck_01", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}neck_02_out", f"{srcns}neck_02", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}head_out", f"{srcns}head", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}clavicle_l_ctrl", f"{srcns}clavicle_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}upperarm_l_out", f"{srcns}upperarm_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}upperarm_twist_01_l_ctrl", f"{srcns}upperarm_twist_01_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}upperarm_twist_02_l_ctrl", f"{srcns}upperarm_twist_02_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}lowerarm_l_out", f"{srcns}lowerarm_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}lowerarm_twist_01_l_ctrl", f"{srcns}lowerarm_twist_01_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}lowerarm_twist_02_l_ctrl", f"{srcns}lowerarm_twist_02_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}hand_l_out", f"{srcns}hand_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}weapon_l_ctrl", f"{srcns}weapon_l", maintainOffset=False))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}thumb_01_l_ctrl", f"{srcns}thumb_01_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}thumb_02_l_ctrl", f"{srcns}thumb_02_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}thumb_03_l_ctrl", f"{srcns}thumb_03_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}index_metacarpal_l_ctrl", f"{srcns}index_metacarpal_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}index_01_l_ctrl", f"{srcns}index_01_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}index_02_l_ctrl", f"{srcns}index_02_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}index_03_l_ctrl", f"{srcns}index_03_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}middle_metacarpal_l_ctrl", f"{srcns}middle_metacarpal_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}middle_01_l_ctrl", f"{srcns}middle_01_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}middle_02_l_ctrl", f"{srcns}middle_02_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}middle_03_l_ctrl", f"{srcns}middle_03_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}pinky_metacarpal_l_ctrl", f"{srcns}pinky_metacarpal_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}pinky_01_l_ctrl", f"{srcns}pinky_01_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}pinky_02_l_ctrl", f"{srcns}pinky_02_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}pinky_03_l_ctrl", f"{srcns}pinky_03_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}ring_metacarpal_l_ctrl", f"{srcns}ring_metacarpal_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}ring_01_l_ctrl", f"{srcns}ring_01_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}ring_02_l_ctrl", f"{srcns}ring_02_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}ring_03_l_ctrl", f"{srcns}ring_03_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}clavicle_r_ctrl", f"{srcns}clavicle_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}upperarm_r_out", f"{srcns}upperarm_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}upperarm_twist_01_r_ctrl", f"{srcns}upperarm_twist_01_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}upperarm_twist_02_r_ctrl", f"{srcns}upperarm_twist_02_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}lowerarm_r_out", f"{srcns}lowerarm_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}lowerarm_twist_01_r_ctrl", f"{srcns}lowerarm_twist_01_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}lowerarm_twist_02_r_ctrl", f"{srcns}lowerarm_twist_02_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}hand_r_out", f"{srcns}hand_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}weapon_r_ctrl", f"{srcns}weapon_r", maintainOffset=False))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}thumb_01_r_ctrl", f"{srcns}thumb_01_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}thumb_02_r_ctrl", f"{srcns}thumb_02_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}thumb_03_r_ctrl", f"{srcns}thumb_03_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}index_metacarpal_r_ctrl", f"{srcns}index_metacarpal_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}index_01_r_ctrl", f"{srcns}index_01_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}index_02_r_ctrl", f"{srcns}index_02_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}index_03_r_ctrl", f"{srcns}index_03_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}middle_metacarpal_r_ctrl", f"{srcns}middle_metacarpal_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}middle_01_r_ctrl", f"{srcns}middle_01_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}middle_02_r_ctrl", f"{srcns}middle_02_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}middle_03_r_ctrl", f"{srcns}middle_03_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}pinky_metacarpal_r_ctrl", f"{srcns}pinky_metacarpal_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}pinky_01_r_ctrl", f"{srcns}pinky_01_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}pinky_02_r_ctrl", f"{srcns}pinky_02_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}pinky_03_r_ctrl", f"{srcns}pinky_03_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}ring_metacarpal_r_ctrl", f"{srcns}ring_metacarpal_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}ring_01_r_ctrl", f"{srcns}ring_01_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}ring_02_r_ctrl", f"{srcns}ring_02_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}ring_03_r_ctrl", f"{srcns}ring_03_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}thigh_l_out", f"{srcns}thigh_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}thigh_twist_01_l_ctrl", f"{srcns}thigh_twist_01_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}thigh_twist_02_l_ctrl", f"{srcns}thigh_twist_02_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}calf_l_out", f"{srcns}calf_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}calf_twist_01_l_ctrl", f"{srcns}calf_twist_01_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}calf_twist_02_l_ctrl", f"{srcns}calf_twist_02_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}foot_l_out", f"{srcns}foot_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}ball_l_ctrl", f"{srcns}ball_l", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}thigh_r_out", f"{srcns}thigh_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}thigh_twist_01_r_ctrl", f"{srcns}thigh_twist_01_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}thigh_twist_02_r_ctrl", f"{srcns}thigh_twist_02_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}calf_r_out", f"{srcns}calf_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}calf_twist_01_r_ctrl", f"{srcns}calf_twist_01_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}calf_twist_02_r_ctrl", f"{srcns}calf_twist_02_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}foot_r_out", f"{srcns}foot_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
-		self.listConstraints.append(cmds.parentConstraint(f"{tarns}ball_r_ctrl", f"{srcns}ball_r", maintainOffset=False, skipTranslate=["x", "y", "z"]))
+		for ctrl, joint, translate in self.getCtrlRigMapping(source):
+			if translate:
+				self.listConstraints.append(cmds.parentConstraint(ctrl, joint, maintainOffset=False))
+			else:
+				self.listConstraints.append(cmds.parentConstraint(ctrl, joint, maintainOffset=False, skipTranslate=["x", "y", "z"]))
 
 		if stateAutoKey: lma.LMAnimControl.setAutoKeyMode(True)
 
@@ -1832,8 +2311,8 @@ class LMLunarExport(LMMannequinUe5):
 				if not startFrame: startFrame = lma.LMAnimControl.animationStartTime().value()
 				if not endFrame: endFrame = lma.LMAnimControl.animationEndTime().value()
 
-				lma.LMAnimBake.bakeTransform(nodes, (startFrame, endFrame))
-				self.filterRotations(nodes)
+				self.poseTrack = lma.LMAnimBake.bakeTransform(nodes, (startFrame, endFrame))
+				if self.poseTrack is None and not lma.LMAnimBake.isChunked((startFrame, endFrame)): self.filterRotations(nodes)
 
 				# clean up
 				if self.listConstraints:
@@ -1849,16 +2328,175 @@ class LMLunarExport(LMMannequinUe5):
 		return False
 
 
-	def setCtrlRigAsSourceAndBake(self, source, startFrame=None, endFrame=None):
+	def setCtrlRigAsSourceAndBake(self, source, startFrame=None, endFrame=None, incremental=False):
 		"""Wrapper method for setting the source and baking in one go.
+
+		With incremental set only the frames affected by ctrl edits since the last incremental bake are
+		baked again, see transferFromCtrlRigIncremental.
+
 		"""
 		if not startFrame: startFrame = lma.LMAnimControl.animationStartTime().value()
 		if not endFrame: endFrame =lma.LMAnimControl.animationEndTime().value()
 
+		if self.directTransfer:
+			if incremental: return self.transferFromCtrlRigIncremental(source, startFrame, endFrame)
+			return self.transferFromCtrlRig(source, startFrame, endFrame)
+
 		self.setCtrlRigAsSource(source)
 		self.bakeAnimationFromCtrlRig(startFrame, endFrame)
 
 
+	def transferFromCtrlRig(self, source:LMLunarCtrl, startFrame=None, endFrame=None, preserveOutsideKeys=False) -> bool:
+		"""Bakes the animation from the ctrl rig without creating any constraints.
+
+		The world matrices of the ctrl / out nodes are sampled for all frames, the local transforms of the
+		export joints are computed from their parents, joint orients and rotate axes on the arrays and
+		keyed in one bulk write. Gives the same result as setCtrlRigAsSource and bakeAnimationFromCtrlRig.
+		Joints in between the mapped joints are keyed at their rest transform, their existing animation
+		does not leak into the children.
+
+		Args:
+			source (LMLunarCtrl): Ctrl rig to bake from.
+			startFrame (int): First frame, if none it will query the timesliders start frame.
+			endFrame (int): Last frame, if none it will query the timesliders end frame.
+			preserveOutsideKeys (bool): Whether or not to keep the joint keys outside of the range, the new
+				rotations are filtered to continue from the existing keys.
+
+		Returns:
+			bool: True if the operation was successful, False if an	error occured during the operation.
+
+		"""
+		if not self.isValid(): return False
+
+		if not startFrame: startFrame = lma.LMAnimControl.animationStartTime().value()
+		if not endFrame: endFrame = lma.LMAnimControl.animationEndTime().value()
+
+		# just to make sure we don't have any inputs from hik
+		self.setSource("None")
+
+		# unlock translate on weapon joints (legacy compability)
+		lm.LMAttribute.unlockPlugIfLocked(self.nameWithNamespace("weapon_l"), ["translate"])
+		lm.LMAttribute.unlockPlugIfLocked(self.nameWithNamespace("weapon_r"), ["translate"])
+
+		# Parents have to be processed before their children
+		mapping = [entry for entry in self.getCtrlRigMapping(source) if cmds.objExists(entry[0]) and cmds.objExists(entry[1])]
+		paths = [cmds.ls(joint, long=True)[0] for ctrl, joint, translate in mapping]
+		# Joints in between the mapped joints have no ctrl and are keyed at rest
+		for path in self.getIntermediateJoints(paths):
+			mapping.append((None, path.rsplit("|", 1)[-1], False))
+			paths.append(path)
+		order = sorted(range(mapping.__len__()), key=lambda index: paths[index].count("|"))
+		mapping = [mapping[index] for index in order]
+		paths = [paths[index] for index in order]
+
+		ctrls = [ctrl for ctrl, joint, translate in mapping if ctrl is not None]
+		joints = [joint for ctrl, joint, translate in mapping]
+		solved = np.array([ctrl is not None for ctrl, joint, translate in mapping])
+		jointIndices = {path: index for index, path in enumerate(paths)}
+		parents = [jointIndices.get(path.rsplit("|", 1)[0], -1) for path in paths]
+
+		times = np.arange(startFrame, endFrame + 0.5)
+		plugs = [f"{ctrl}.worldMatrix[0]" for ctrl in ctrls] + [f"{joint}.parentMatrix[0]" for joint in joints]
+		matrices = lma.LMAnimBake.sampleMatrices(plugs, times)
+		sourceWorld = np.tile(np.eye(4), (times.size, joints.__len__(), 1, 1))
+		sourceWorld[:, solved] = matrices[:, :ctrls.__len__()]
+
+		toInternal = om.MDistance.uiToInternal(1.0)
+		restTranslate = np.array([cmds.getAttr(f"{joint}.translate")[0] for joint in joints]) * toInternal
+		jointOrients = np.radians([cmds.getAttr(f"{joint}.jointOrient")[0] for joint in joints])
+		rotateAxes = np.radians([cmds.getAttr(f"{joint}.rotateAxis")[0] for joint in joints])
+		rotateOrders = [laq.rotateOrders[cmds.getAttr(f"{joint}.rotateOrder")] for joint in joints]
+		translate = np.array([translate for ctrl, joint, translate in mapping])
+
+		translations, rotations = lans.transferToJoints(
+			sourceWorld,
+			parents,
+			matrices[:, ctrls.__len__():],
+			translate,
+			restTranslate,
+			jointOrients,
+			rotateAxes,
+			rotateOrders,
+			solved,
+		)
+
+		frameRate = om.MTime(1.0, om.MTime.kSeconds).asUnits(om.MTime.uiUnit())
+		data = np.concatenate((translations, rotations), axis=-1)
+
+		# Continue the rotations from the existing key before the range
+		previous = 0
+		if preserveOutsideKeys and lma.LMAnimCurves.listCurves(joints):
+			plugs = [f"{joint}.{attribute}" for joint in joints for attribute in ["tx", "ty", "tz", "rx", "ry", "rz"]]
+			data = np.concatenate((lma.LMAnimBake.sample(plugs, np.array([startFrame - 1.0])).reshape(1, joints.__len__(), 6), data))
+			previous = 1
+
+		self.poseTrack = PoseTrack(data, joints, startFrame=startFrame - previous, frameRate=frameRate, rotateOrders=rotateOrders)
+		self.poseTrack.eulerFilter()
+		if previous: self.poseTrack = PoseTrack(self.poseTrack.data[previous:], joints, startFrame=startFrame, frameRate=frameRate, rotateOrders=rotateOrders)
+		lma.LMAnimCurves.writePoseTrack(self.poseTrack, preserveOutsideKeys=preserveOutsideKeys)
+
+		self.log.info(f"Successfully transfered animation from '{startFrame}' to '{endFrame}'")
+		return True
+
+
+	def transferFromCtrlRigIncremental(self, source:LMLunarCtrl, startFrame=None, endFrame=None) -> bool:
+		"""Bakes only the frames affected by ctrl curve edits since the last incremental bake.
+
+		The ctrl curves are compared against the snapshot taken after the last bake, the changed ranges
+		are padded by dirtyPadding and transfered with the keys outside of them preserved, afterwards the
+		rotations are euler filtered across the whole range so the keys after a range do not flip.
+		Everything is baked when there is no snapshot, the frame range changed, the export joint curves
+		were edited - e.g. by an undo, or the static digest of the ctrls and joints changed - edits of
+		unkeyed attributes, constraints or the rig. The states are stored per root node, a reopened or
+		new scene does not match the state of another one.
+
+		Args:
+			source (LMLunarCtrl): Ctrl rig to bake from.
+			startFrame (int): First frame, if none it will query the timesliders start frame.
+			endFrame (int): Last frame, if none it will query the timesliders end frame.
+
+		Returns:
+			bool: True if the operation was successful, False if an	error occured during the operation.
+
+		"""
+		if not self.isValid() or not source.isValid(): return False
+
+		if not startFrame: startFrame = lma.LMAnimControl.animationStartTime().value()
+		if not endFrame: endFrame = lma.LMAnimControl.animationEndTime().value()
+
+		# Node uuids are unique per scene and load, unlike the scene name of unsaved or reopened scenes
+		key = (cmds.file(query=True, sceneName=True), self.namespace, cmds.ls(self.root, uuid=True)[0])
+		ctrls = source.getExportNodes() or []
+		joints = [joint for ctrl, joint, translate in self.getCtrlRigMapping(source) if cmds.objExists(joint)]
+		ctrlCurves = cmds.keyframe(ctrls, query=True, name=True) or []
+		jointCurves = list(lma.LMAnimCurves.listCurves(joints).values())
+		snapshot = lma.LMAnimDirtyRange.snapshot(ctrlCurves)
+		static = lma.LMAnimDirtyRange.staticDigest(ctrls + joints)
+
+		state = self.bakeStates.get(key)
+		if (
+			state and state["range"] == (startFrame, endFrame) and state["static"] == static and
+			state["joints"] == lma.LMAnimDirtyRange.digest(jointCurves)
+		):
+			ranges = lma.LMAnimDirtyRange.getDirtyRanges(state["ctrls"], snapshot, startFrame, endFrame, self.dirtyPadding)
+			for start, end in ranges:
+				if not self.transferFromCtrlRig(source, start, end, preserveOutsideKeys=True): return False
+			# The ranges are only continuous with the keys before them
+			if ranges: lma.LMAnimFilter.eulerFilter(joints)
+			self.log.info(f"Baked {ranges.__len__()} edited ranges: {ranges}")
+		else:
+			if not self.transferFromCtrlRig(source, startFrame, endFrame): return False
+
+		jointCurves = list(lma.LMAnimCurves.listCurves(joints).values())
+		self.bakeStates[key] = {
+			"range": (startFrame, endFrame),
+			"ctrls": snapshot,
+			"static": lma.LMAnimDirtyRange.staticDigest(ctrls + joints),
+			"joints": lma.LMAnimDirtyRange.digest(jointCurves),
+		}
+		return True
+
+
 	def exportAnimation(self, filePath, startFrame=None, endFrame=None, bake=False) -> bool:
 		"""Exports the animation to the specified path.
 
@@ -1915,11 +2553,11 @@ class LMLegoCtrl(LMLunarCtrl):
 		Sync with other modules / classes
 
 	"""
-	minimalDefinition = lmrrl.templateLC["minimalDefinition"]
-	definition = lmrrl.templateLC["definition"]
+	minimalDefinition = LMTemplate("lego", "templateLC", "minimalDefinition")
+	definition = LMTemplate("lego", "templateLC", "definition")
 	hikTemplate = "LunarCtrl"
-	tPose = lmrrl.templateLC["tPose"]
-	aPose = lmrrl.templateLC["aPose"]
+	tPose = LMTemplate("lego", "templateLC", "tPose")
+	aPose = LMTemplate("lego", "templateLC", "aPose")
 
 	sourceAndBakeTemplate = {
 		"HumanIk": 			[False, 0],
@@ -2055,6 +2693,7 @@ class LMLegoCtrl(LMLunarCtrl):
 		self.ctrlMain = self.getCtrlMain()
 		self.root = self.getRoot()
 		self.rootCnst = None
+		self.poseTrack = None
 
 
 
@@ -2076,11 +2715,11 @@ class LMSinnersDev2(LMHumanIk):
 	TODO upade eccessoryJoint with new self.root and self.getExportNodes
 
 	"""
-	minimalDefinition = lmrrsd.templateSD2["minimalDefinition"]
-	definition = lmrrsd.templateSD2["definition"]
+	minimalDefinition = LMTemplate("sinnersdev", "templateSD2", "minimalDefinition")
+	definition = LMTemplate("sinnersdev", "templateSD2", "definition")
 	hikTemplate = "SinnersDev2"
-	tPose = lmrrsd.templateSD2["tPose"]
-	aPose = lmrrsd.templateSD2["aPose"]
+	tPose = LMTemplate("sinnersdev", "templateSD2", "tPose")
+	aPose = LMTemplate("sinnersdev", "templateSD2", "aPose")
 
 	# rootMotion = "trajectory"
 
@@ -2103,6 +2742,7 @@ class LMSinnersDev2(LMHumanIk):
 		# self.CtrlMain = self.getCtrlMain()
 		self.root = self.getRoot()
 		self.rootCnst = None
+		self.poseTrack = None
 
 
 	def accessoryJoints(self, value=False):
@@ -2188,11 +2828,11 @@ class LMSinnersDev1(LMHumanIk):
 	TODO upade eccessoryJoint with new self.root and self.getExportNodes
 
 	"""
-	minimalDefinition = lmrrsd.templateSD1["minimalDefinition"]
-	definition = lmrrsd.templateSD1["definition"]
+	minimalDefinition = LMTemplate("sinnersdev", "templateSD1", "minimalDefinition")
+	definition = LMTemplate("sinnersdev", "templateSD1", "definition")
 	hikTemplate = "SinnersDev1"
-	tPose = lmrrsd.templateSD1["tPose"]
-	aPose = lmrrsd.templateSD1["aPose"]
+	tPose = LMTemplate("sinnersdev", "templateSD1", "tPose")
+	aPose = LMTemplate("sinnersdev", "templateSD1", "aPose")
 
 	# rootMotion = "NUXRoot"
 
@@ -2214,6 +2854,7 @@ class LMSinnersDev1(LMHumanIk):
 		# self.CtrlMain = self.getCtrlMain()
 		self.root = self.getRoot()
 		self.rootCnst = None
+		self.poseTrack = None
 
 
 	def accessoryJoints(self, value=False):
@@ -2316,7 +2957,6 @@ class LMRetargeter():
 			content define in the constructor.
 		!Sometimes the fbx is not imported Content/Animations/External/UTA have to manualy import it
 		Add support for scaling clips x2 x1.5 whatever
-		Add batch mode with uiScripts openMaya
 		Add override existing clips in output folder
 
 	"""
@@ -2333,6 +2973,8 @@ class LMRetargeter():
 
 	totalClipCount = 0
 	currentClip = 0
+	# Retarget solver 'hik' or 'fk' - the numpy solver from lunar.anim.solver, see LMHumanIk.transferFromSourceFk
+	solver = "hik"
 
 	log = logging.getLogger("MRetargeter")
 
@@ -2346,11 +2988,24 @@ class LMRetargeter():
 		targetTemplate="MetaHuman",
 		sourceFilters=["*.fbx"],
 		targetFilters=["*.mb", "*.ma"],
+		targetRigs=None,
 	):
+		"""Retargeter init.
+
+		Args:
+			sourceTemplate (str): Template of the source skeleton, if None it is detected from the joints
+				of the first source after it is loaded.
+			targetRigs (list): Optional list of dictionaries with the 'target', 'template' and 'namespace'
+				keys. Every source is imported once and all target rigs are baked in a single pass over the
+				timeline, one file is exported per target rig into a sub-directory named after its namespace.
+				If not specified the targets, targetTemplate and targetNameSpace arguments are used.
+
+		"""
 		# checkStatus function does not return the exact error line number
 		self.sources = self.validateInput(sources, sourceFilters)
 		if not self.status: raise RuntimeError(f"Could not validate any sources from: {sources}")
 
+		if targetRigs: targets = [targetRig["target"] for targetRig in targetRigs]
 		self.targets = self.validateInput(targets, targetFilters)
 		if not self.status: raise RuntimeError(f"Could not validate any targets from: {targets}")
 
@@ -2362,24 +3017,37 @@ class LMRetargeter():
 		self.targetNameSpace = targetNameSpace
 		self.targetTemplate = targetTemplate
 
+		if not targetRigs: targetRigs = [{"target": self.targets[0].filePath(), "template": targetTemplate, "namespace": targetNameSpace}]
+		namespaces = [targetRig["namespace"] for targetRig in targetRigs]
+		if namespaces.__len__() != set(namespaces).__len__(): raise RuntimeError(f"Target rig namespaces must be unique: {namespaces}")
+		self.targetRigs = targetRigs
+		self.targetList = []
+
+		self.exportedFiles = []
+		self.exportedFrames = 0
+		# Seconds spent per pipeline stage, see recordStage
+		self.stageTimes = {}
+
 
 	@classmethod
 	def __str__(cls) -> str:
 		return "MayaRetargeter - HumanIk retargeter for Maya."
 
 
-	def validateInput(self, entry, nameFilters) -> list[qtc.QFileInfo] or bool:
+	def validateInput(self, entry, nameFilters) -> list[lm.LMPathRecord] or bool:
 		"""Validates the specified input.
 
 		If the entry is a string containing a file or directory it will be appended	to the
 		items list. If the entry is a list of strings it will be re-assigned as the	items list.
+		Directories are scanned with LMFinder.findFiles, duplicated entries are removed while keeping
+		the sorted order.
 
 		Args:
 			entry (List[str] or str): Entries for validation, can be single string with files	or list with
 				single files or directories
 
 		Returns:
-			list[qtc.QFileInfo] and self.status(bool): List with QFileInfo objects if found any	and
+			list[lm.LMPathRecord] and self.status(bool): List with path records if found any and
 				status - True if the operation was successful, otherwise False.
 
 		"""
@@ -2394,26 +3062,20 @@ class LMRetargeter():
 
 		filePathList = []
 		for entry in entries:
-			fileInfo = lm.LMFinder.validateFileInfo(entry)  # Check if entry exists
-			if fileInfo:
-				if fileInfo.isDir():
-					self.log.debug(f"Entry '{entry}' is a directory.")
-					fileInfoList = lm.LMFinder.getFilesInDirectory(entry, nameFilters)
-					if fileInfoList:
-						for fileInfo in fileInfoList:
-							self.log.debug(f"Adding entry '{fileInfo.filePath()}'")
-							filePathList.append(fileInfo.filePath())
-
-				if fileInfo.isFile():
-					self.log.debug(f"Adding entry '{fileInfo.filePath()}' which is a single file.")
-					filePathList.append(fileInfo.filePath())
+			if os.path.isdir(entry):
+				self.log.debug(f"Entry '{entry}' is a directory.")
+				filePathList.extend(record.filePath() for record in lm.LMFinder.findFiles(entry, nameFilters))
 
-		if filePathList.__len__() != 0:
-			fileInfoList = []
-			filePathSet = set(filePathList)  # Make sure entries are not duplicated
-			for filePath in filePathSet:
-				fileInfoList.append(qtc.QFileInfo(filePath))
+			elif os.path.isfile(entry):
+				self.log.debug(f"Adding entry '{entry}' which is a single file.")
+				filePathList.append(entry.replace("\\", "/"))
+
+			else:
+				self.log.warning(f"'{entry}' file or directory does not exists.")
 
+		if filePathList.__len__() != 0:
+			# Make sure entries are not duplicated
+			fileInfoList = [lm.LMPathRecord(filePath) for filePath in OrderedDict.fromkeys(filePathList)]
 			self.log.info(f"'{fileInfoList.__len__()}' entries have been successfully validated.")
 
 			self.status = True
@@ -2483,11 +3145,17 @@ class LMRetargeter():
 	def setupTarget(self, matchSource, reachActorChest) -> bool:
 		"""Sets up the target rig."""
 
-		lm.LMFile.load(self.targets[0].filePath(), self.targetNameSpace)
-		name = "HiK"
-		if self.targetTemplate == "LunarExport": name = "Export"
+		self.targetList = []
+		for targetRig in self.targetRigs:
+			lm.LMFile.load(targetRig["target"], targetRig["namespace"])
+			name = "HiK"
+			if targetRig["template"] == "LunarExport": name = "Export"
+
+			target = self.initRig(targetRig["template"], name, targetRig["namespace"])
+			if not target: return False
+			self.targetList.append(target)
 
-		self.target = self.initRig(self.targetTemplate, name, self.targetNameSpace)
+		self.target = self.targetList[0]
 
 		return True
 
@@ -2496,6 +3164,10 @@ class LMRetargeter():
 
 		lm.LMFile.load(self.sources[0].filePath(), reference=False)
 
+		if not self.sourceTemplate:
+			self.sourceTemplate = LMTemplateDetector.detectFromNamespace(self.sourceNameSpace)[0]
+			if not self.sourceTemplate: return False
+
 		# Temp Sinners override
 		if self.sourceTemplate == 'SinnersDev2':
 			# # self.source.importSetup()
@@ -2519,9 +3191,33 @@ class LMRetargeter():
 		return True
 
 
-	def scaleAnimation(self, value=1.0):
-		"""Scales the animation by the given amount."""
-		pass
+	def scaleAnimation(self, value=1.0, startFrame=None, endFrame=None, oversamplingRate=1) -> float:
+		"""Scales the baked animation of all target rigs by the given amount.
+
+		The baked curves are resampled, the hik solver is not evaluated again.
+
+		Args:
+			value (float): Length scale e.x. 2.0 will extend the length two times.
+			startFrame (float): First frame of the baked animation, if none it will query the timesliders
+				start frame.
+			endFrame (float): Last frame of the baked animation, if none it will query the timesliders end
+				frame.
+			oversamplingRate (int): Number of keys per frame, use for upresing the animation from 30 to 60 fps,
+				the keys are added in between the frames, see LMHumanIk.oversampleAnimation.
+
+		Returns:
+			float: The new end frame.
+
+		"""
+		if startFrame is None: startFrame = lma.LMAnimControl.animationStartTime().value()
+		if endFrame is None: endFrame = lma.LMAnimControl.animationEndTime().value()
+
+		newEndFrame = endFrame
+		for target in self.targetList:
+			nodes = target.getExportNodes()
+			if nodes: newEndFrame = lma.LMAnimRetime.retime(nodes, startFrame, endFrame, value, oversamplingRate)
+
+		return newEndFrame
 
 
 	def deleteConnection(self, plug):
@@ -2536,41 +3232,221 @@ class LMRetargeter():
 				cmds.delete(plug, icn=True)
 
 
-	def __doRetargeting(self, preserveFolderHierarchy, trimStart, trimEnd, oversamplingRate, rootMotion, rootRotationOffset):
-		"""Wrapper method for sequencing retargeting calls."""
-		# Iterate through source list with QFileInfo's
-		for source in self.sources:
-			# Get takes name and start / end frame
-			takes = lm.LMFbx.gatherTakes(source.filePath())
-			for take in takes:
-				index = takes[take]['index']
-				startFrame = takes[take]['startFrame'] + trimStart
-				endFrame = takes[take]['endFrame'] + trimEnd
-
-				lm.LMFbx.importAnimation(source.filePath(), startFrame, endFrame, index)
-
-				# Test
-				self.target.deleteAnimation()
-				# self.setSourceAndBake(self.source)
-				self.target.setTPose()
-				self.target.setSource(self.source, rootMotion, rootRotationOffset)
-				self.target.bakeAnimation(startFrame, endFrame)
-
-				if preserveFolderHierarchy:
-					self.outputFile = qtc.QFileInfo(source.filePath().replace(self.inputDirectory.absolutePath(), self.outputDirectory.filePath()))
+	def getOutputFilePaths(self, source, take:str, takeCount:int, preserveFolderHierarchy:bool) -> list:
+		"""Returns the output file paths for the specified source take.
+
+		Args:
+			source (QFileInfo): Source file.
+			take (str): Name of the take, used as suffix if the source has more than one take.
+			takeCount (int): Number of takes in the source file.
+			preserveFolderHierarchy (bool): Whether or not the source folder hierarchy is recreated in the
+				output directory.
+
+		Returns:
+			list: File paths of the exported files, one per target rig.
+
+		"""
+		filePaths = []
+		for targetRig in self.targetRigs:
+			outputDirectory = self.outputDirectory.filePath()
+			# Multiple target rigs are exported to separate sub-directories
+			if self.targetRigs.__len__() > 1: outputDirectory = f'{outputDirectory}/{targetRig["namespace"]}'
+
+			if preserveFolderHierarchy:
+				outputFile = qtc.QFileInfo(source.filePath().replace(self.inputDirectory.absolutePath(), outputDirectory))
+			else:
+				outputFile = qtc.QFileInfo(f'{outputDirectory}/{source.fileName()}')
+
+			if takeCount > 1:
+				filePaths.append(f'{outputFile.absolutePath()}/{outputFile.completeBaseName()}_{take}.{outputFile.suffix()}')
+			else:
+				filePaths.append(outputFile.filePath())
+
+		return filePaths
+
+
+	def plan(self, preserveFolderHierarchy=True, trimStart=0.0, trimEnd=0.0, workerCounts=(1, 2, 4, 8, 16)) -> dict:
+		"""Dry-run of the retargeting - enumerates the work and estimates the wall time.
+
+		No maya scenes are opened, takes are read from the take cache (uncached files are read with
+		FBXRead and added to the cache).
+
+		Args:
+			preserveFolderHierarchy (bool): Same as for the retarget method, used for collision checks.
+			trimStart (int): Same as for the retarget method.
+			trimEnd (int): Same as for the retarget method.
+			workerCounts (tuple): Worker counts to estimate the wall time for.
+
+		Returns:
+			dict: Plan with the clips, total frames, wall time estimates per worker count and issues -
+				duplicated sources, zero length takes, output collisions and uncached sources.
+
+		"""
+		return lmb.LMBatchPlanner(self).plan(preserveFolderHierarchy, trimStart, trimEnd, workerCounts)
+
+
+	def recordStage(self, stage:str, timeStart:float) -> float:
+		"""Adds the time since timeStart to the stage and returns the current time for the next stage.
+		"""
+		timeNow = time.perf_counter()
+		self.stageTimes[stage] = self.stageTimes.get(stage, 0.0) + timeNow - timeStart
+		return timeNow
+
+
+	def __doRetargeting(self, preserveFolderHierarchy, trimStart, trimEnd, scale, oversamplingRate, rootMotion, rootRotationOffset, keyReduction):
+		"""Wrapper method for sequencing retargeting calls.
+
+		The next source is prepared by the prefetcher while the current one bakes, see LMClipPrefetcher.
+
+		"""
+		try:
+			with lmb.LMClipPrefetcher() as prefetcher:
+				def prepare(source):
+					prefetcher.submit(source.filePath(), functools.partial(self.createOutputDirectories, source, preserveFolderHierarchy))
+
+				if self.sources: prepare(self.sources[0])
+				# Iterate through source list with QFileInfo's
+				for position, source in enumerate(self.sources):
+					timeStage = time.perf_counter()
+					clip = prefetcher.get(source.filePath())
+					# Get takes name and start / end frame
+					takes = clip["takes"] if clip["takes"] is not None else lmb.LMTakeCache.gather(source.filePath(), clip["filePath"])
+					self.recordStage("prefetchWait", timeStage)
+					if position + 1 < self.sources.__len__(): prepare(self.sources[position + 1])
+
+					self.retargetClip(source, clip["filePath"], takes, preserveFolderHierarchy, trimStart, trimEnd, scale, oversamplingRate, rootMotion, rootRotationOffset, keyReduction)
+					prefetcher.release(source.filePath())
+		finally:
+			# Takes gathered on cache misses are written once for the batch
+			lmb.LMTakeCache.flush()
+
+
+	def createOutputDirectories(self, source, preserveFolderHierarchy:bool, takes:OrderedDict) -> None:
+		"""Creates the output directories of all takes of the source, safe to call from a background thread.
+		"""
+		for take in takes:
+			for outputFile in self.getOutputFilePaths(source, take, takes.__len__(), preserveFolderHierarchy):
+				os.makedirs(os.path.dirname(outputFile), exist_ok=True)
+
+
+	def retargetClip(self, source, readPath:str, takes:OrderedDict, preserveFolderHierarchy, trimStart, trimEnd, scale, oversamplingRate, rootMotion, rootRotationOffset, keyReduction) -> None:
+		"""Retargets and exports all takes of the source.
+
+		Args:
+			source (LMPathRecord): Source file, used for the output file names.
+			readPath (str): Path the animation is imported from, the staged copy of the source.
+			takes (OrderedDict): Takes of the source, see LMTakeCache.
+
+		"""
+		for take in takes:
+			index = takes[take]['index']
+			startFrame = takes[take]['startFrame'] + trimStart
+			endFrame = takes[take]['endFrame'] + trimEnd
+
+			timeStage = time.perf_counter()
+			lm.LMFbx.importAnimation(readPath, startFrame, endFrame, index)
+			timeStage = self.recordStage("import", timeStage)
+
+			for target in self.targetList:
+				target.deleteAnimation()
+				target.setTPose()
+				# Extracted root motion is processed after the bake instead of constraining the root
+				if self.solver == "hik": target.setSource(self.source, rootMotion is True, rootRotationOffset)
+			timeStage = self.recordStage("setSource", timeStage)
+			endFrame = self.bakeTargets(startFrame, endFrame, scale, oversamplingRate, keyReduction, rootMotion)
+			timeStage = self.recordStage("bake", timeStage)
+
+			# Oversampled clips are exported at the oversampled frame rate, the time unit is restored afterwards
+			rate = max(1, int(oversamplingRate))
+			timeUnit = lma.LMAnimRetime.setOversampledTimeUnit(rate)
+			try:
+				outputFiles = self.getOutputFilePaths(source, take, takes.__len__(), preserveFolderHierarchy)
+				for target, outputFile in zip(self.targetList, outputFiles):
+					self.outputFile = qtc.QFileInfo(outputFile)
 					lm.LMFinder.createDirectory(self.outputFile.absolutePath())
-				else:
-					self.outputFile = qtc.QFileInfo(f'{self.outputDirectory.filePath()}/{source.fileName()}')
 
-				if takes.__len__() > 1: self.outputFile = f'{self.outputFile}_{take}'
+					self.log.info(f"Exporting '{source.fileName()}' ...")
+					# TODO cleanUp
+					cmds.select(target.nameWithNamespace("root"))
+					target.exportAnimation(self.outputFile.filePath(), startFrame * rate, endFrame * rate)
+					self.exportedFiles.append(self.outputFile.filePath())
+					self.exportedFrames += int(round((endFrame - startFrame) * rate)) + 1
+					self.log.info(f"Successfully exported '{self.outputFile.filePath()}'")
+			finally:
+				if timeUnit: cmds.currentUnit(time=timeUnit, updateAnimation=True)
+			self.recordStage("export", timeStage)
+
+
+	def bakeTargets(self, startFrame, endFrame, scale=1.0, oversamplingRate=1, keyReduction=False, rootMotion=True) -> float:
+		"""Bakes all target rigs and runs the root motion, retiming and key reduction stages.
 
-				self.log.info(f"Exporting '{source.fileName()}' ...")
-				# TODO cleanUp
-				cmds.select(f'{self.targetNameSpace}:root')
-				self.target.exportAnimation(self.outputFile.filePath(), startFrame, endFrame)
-				self.log.info(f"Successfully exported '{self.outputFile.filePath()}'")
+		Targets using the default skeleton bake are baked together so the scene is evaluated only once
+		per frame, targets with custom bake methods are baked separately. With the api bake engine the
+		shared targets are sampled into a single pose track, all stages run on its arrays and the curves
+		are written once at the end.
 
+		Returns:
+			float: The end frame of the baked animation.
+
+		"""
+		sharedTargets = []
+		sharedNodes = []
+		customTargets = []
+		for target in self.targetList:
+			if self.solver == "fk":
+				if not target.transferFromSourceFk(self.source, startFrame, endFrame):
+					raise RuntimeError(f"The fk solver could not retarget '{target.character}' from '{startFrame}' to '{endFrame}'")
+				customTargets.append(target)
+				continue
 
+			if type(target).bakeAnimation is LMHumanIk.bakeAnimation and target.isValid():
+				nodes = target.getExportNodes()
+				if nodes:
+					sharedTargets.append((target, nodes))
+					sharedNodes.extend(nodes)
+					continue
+
+			target.bakeAnimation(startFrame, endFrame)
+			customTargets.append(target)
+
+		tolerances = keyReduction if isinstance(keyReduction, dict) else None
+		newEndFrame = endFrame
+		chunked = lma.LMAnimBake.isChunked((startFrame, endFrame))
+		if sharedNodes and lma.LMAnimBake.engine == "api" and not chunked:
+			poseTrack = lma.LMAnimBake.bakePoseTrack(sharedNodes, (startFrame, endFrame))
+			poseTrack.eulerFilter()
+			if rootMotion in ("extract", "inPlace"):
+				for target, nodes in sharedTargets: target.processRootMotion(poseTrack, rootMotion == "inPlace")
+			if scale != 1.0 or oversamplingRate != 1: poseTrack = poseTrack.retime(scale, oversamplingRate)
+			keep = poseTrack.reduce(lma.LMAnimReduce.getPoseTrackTolerances(poseTrack, tolerances)) if keyReduction else None
+			tangentType = oma.MFnAnimCurve.kTangentLinear if keyReduction else oma.MFnAnimCurve.kTangentGlobal
+			lma.LMAnimCurves.writePoseTrack(poseTrack, keep, tangentType)
+
+			newEndFrame = poseTrack.endFrame
+			for target, nodes in sharedTargets:
+				target.poseTrack = poseTrack.subset(nodes)
+				target.bakeAnimationPost(nodes, startFrame, endFrame, False)
+
+		elif sharedNodes:
+			lma.LMAnimBake.bakeTransform(sharedNodes, (startFrame, endFrame))
+			for target, nodes in sharedTargets:
+				target.bakeAnimationPost(nodes, startFrame, endFrame, not chunked)
+			customTargets.extend(target for target, nodes in sharedTargets)
+
+		# Curve based stages for everything that was not processed as a pose track
+		for target in customTargets:
+			nodes = target.getExportNodes()
+			if not nodes: continue
+			if rootMotion in ("extract", "inPlace"): target.processRootMotion(None, rootMotion == "inPlace")
+			if scale != 1.0 or oversamplingRate != 1:
+				newEndFrame = lma.LMAnimRetime.retime(nodes, startFrame, endFrame, scale, oversamplingRate)
+			if keyReduction: lma.LMAnimReduce.reduce(nodes, tolerances)
+
+		return newEndFrame
+
+
+	# Batch runs disable the undo queue, interactive runs bake into the open scene as a single undo step
+	@lm.LMBulkOperation("LMRetargeter.retarget")
 	def retarget(self,
 		preserveFolderHierarchy=True,
 		overwriteExisting=False,
@@ -2578,17 +3454,17 @@ class LMRetargeter():
 		reachActorChest=0.0,
 		trimStart=0.0,
 		trimEnd=0.0,
-		# scaleAnimation=1.0,
+		scaleAnimation=1.0,
 		oversamplingRate=1,
 		rootMotion=True,
 		rootRotationOffset=0,
+		bakeEngine=None,
+		bakeChunkSize=None,
+		keyReduction=False,
+		solver=None,
 	) -> bool:
 		"""Performs the actuall retargeting.
 
-		TODO:
-			add oversamplingRate attr to every instance
-			add trimStart, trimEnd flags
-
 		Args:
 			overwriteExisting (bool): If you want to overwrite clips that already exist in the output directory.
 			matchSource (bool): Wheter or not to use the match source option on the HIK solver.
@@ -2596,29 +3472,107 @@ class LMRetargeter():
 			trimEnd (int): Trim the end time of the clip by the given amount of frames.
 			scaleAnimation (float): Scales the animation by the given amount e.x. 2.0 will extend the length
 				two times.
-			oversamplingRate (int): Number of frames in between full frames, use for upresing the animation
-				from 30 to 60 fps.
+			oversamplingRate (int): Number of keys per frame, use for upresing the animation from 30 to 60 fps.
+			rootMotion (bool or str): True constrains the target root to the source root during the bake,
+				'extract' derives the root motion from the baked hips and 'inPlace' converts the clips to
+				in-place, see LMAnimRootMotion. The fk solver has no root constraint, True is run as 'extract'.
+			bakeEngine (str): Bake engine 'cmds' or 'api' for this run, see LMAnimBake, the current engine is
+				used if not specified.
+			bakeChunkSize (int): Takes longer than the given number of frames are baked in chunks during this
+				run, 0 disables the chunking, see LMAnimBake.bakeTransformChunked.
+			keyReduction (bool or dict): Reduces the baked keys before the export, a dictonary with node name
+				patterns and translate / rotate tolerances overrides the LMAnimReduce defaults.
+			solver (str): Retarget solver 'hik' or 'fk', the numpy fk solver does not use the HumanIK
+				retargeter and ignores the solver attributes.
 
 		Returns:
 			bool: True if the operation was successful, False if an	error occured during the operation.
 
 		"""
-		status = self.setupTarget(matchSource, reachActorChest)
-		if not status: raise RuntimeError(f"Could not setup target from: '{self.targets[0].filePath()}'")
+		if solver: self.solver = solver
+		# The fk solver does not constrain the root during the bake, the root motion is extracted instead
+		if self.solver == "fk" and rootMotion is True:
+			self.log.info("The fk solver extracts the root motion from the baked hips")
+			rootMotion = "extract"
+		# Fail before the batch if the clips could not be exported at the oversampled frame rate
+		if oversamplingRate > 1: lma.LMAnimRetime.getTimeUnit(lma.LMAnimRetime.getFrameRate() * oversamplingRate)
+
+		# The bake settings only apply to this run, later bakes of the session keep their own settings
+		engine, chunkSize = lma.LMAnimBake.engine, lma.LMAnimBake.chunkSize
+		if bakeEngine is not None: lma.LMAnimBake.engine = bakeEngine
+		if bakeChunkSize is not None: lma.LMAnimBake.chunkSize = bakeChunkSize
+		try:
+			self.stageTimes = {}
+			timeStage = time.perf_counter()
+			status = self.setupTarget(matchSource, reachActorChest)
+			if not status: raise RuntimeError(f"Could not setup target from: '{self.targets[0].filePath()}'")
+
+			status = self.setupSource()
+			if not status: raise RuntimeError(f"Could not setup source from: '{self.sources[0].filePath()}'")
+
+			# Set solver attributes
+			for target in self.targetList:
+				if matchSource: target.setMatchSource()
+				if reachActorChest: target.setReachActorChest(reachActorChest)
+
+			lm.LMFinder.createDirectory(self.outputDirectory.absolutePath())
+			self.recordStage("setup", timeStage)
+			# if not status: raise RuntimeError(f"Could not setup output directory: '{self.outputDirectory}'")
+
+			timeStart = time.perf_counter()
+			self.__doRetargeting(preserveFolderHierarchy, trimStart, trimEnd, scaleAnimation, oversamplingRate, rootMotion, rootRotationOffset, keyReduction)
+			# Worker processes are recorded by the supervisor
+			if om.MGlobal.mayaState() == om.MGlobal.kInteractive:
+				lmb.LMRetargetCosts.record(self.exportedFrames, time.perf_counter() - timeStart, self.sources.__len__())
 
-		status = self.setupSource()
-		if not status: raise RuntimeError(f"Could not setup source from: '{self.sources[0].filePath()}'")
+			return True
+		finally:
+			lma.LMAnimBake.engine, lma.LMAnimBake.chunkSize = engine, chunkSize
 
-		# Set solver attributes
-		if matchSource: self.target.setMatchSource()
-		if reachActorChest: self.target.setReachActorChest(reachActorChest)
 
-		lm.LMFinder.createDirectory(self.outputDirectory.absolutePath())
-		# if not status: raise RuntimeError(f"Could not setup output directory: '{self.outputDirectory}'")
+	def retargetIsolated(self,
+		workDirectory:str=None,
+		mayapy:str=None,
+		timeout:float=900.0,
+		maxRetries:int=2,
+		workers:int=1,
+		**options,
+	) -> dict:
+		"""Performs the retargeting with every source file in a separate supervised mayapy process.
 
-		self.__doRetargeting(preserveFolderHierarchy, trimStart, trimEnd, oversamplingRate, rootMotion, rootRotationOffset)
+		A corrupt or hanging clip is retried and then quarantined together with the captured maya log,
+		the rest of the batch is not affected. Blocks until the batch is finished, meant for mayapy and
+		the command line rather than the interactive ui.
 
-		return True
+		Args:
+			workDirectory (str): Directory for the job files, logs and the report, defaults to
+				'_batch' in the output directory.
+			mayapy (str): Path to the mayapy executable, defaults to the one of the running maya.
+			timeout (float): Watchdog timeout in seconds for a single clip.
+			maxRetries (int): Number of retries before a clip is moved to the quarantine list.
+			workers (int): Number of worker processes running at the same time.
+			options: Keyword arguments passed to the retarget method in the worker process.
+
+		Returns:
+			dict: Report with the state of all jobs and the quarantine list.
+
+		"""
+		if not workDirectory: workDirectory = f"{self.outputDirectory.absoluteFilePath()}/_batch"
+
+		settings = {
+			"targets": [target.filePath() for target in self.targets],
+			"outputDirectory": self.outputDirectory.filePath(),
+			"sourceNameSpace": self.sourceNameSpace,
+			"sourceTemplate": self.sourceTemplate,
+			"targetNameSpace": self.targetNameSpace,
+			"targetTemplate": self.targetTemplate,
+			"targetRigs": self.targetRigs,
+		}
+		options["inputDirectory"] = self.inputDirectory.absoluteFilePath()
+		jobs = [lmb.LMRetargetJob(source.filePath(), settings, dict(options)) for source in sorted(self.sources, key=lambda source: source.filePath())]
+
+		supervisor = lmb.LMRetargetSupervisor(jobs, workDirectory, mayapy, timeout, maxRetries, workers)
+		return supervisor.run()
 
 
 
@@ -2633,6 +3587,10 @@ class LMRetargeter():
 class LMHik():
 	"""Python overrides for hik utilities procedures.
 	"""
+	# HIK node names and rotate only fk flags, see getHikNodeTable
+	hikNodeNames = None
+	hikRotateOnlyFk = None
+
 	log = logging.getLogger("LMHik")
 
 
@@ -2709,10 +3667,43 @@ class LMHik():
 # hikSkeletonUtils.mel
 #--------------------------------------------------------------------------------------------------
 
+	@classmethod
+	def getHikNodeTable(cls) -> tuple:
+		"""Returns the HIK node names and whether or not they are rotate only fk, resolved once per session.
+		"""
+		if cls.hikNodeNames is None:
+			nodeCount = cmds.hikGetNodeCount()
+			cls.hikNodeNames = [cmds.GetHIKNodeName(index) for index in range(nodeCount)]
+			cls.hikRotateOnlyFk = [mel.eval(f"hikIsRotateOnlyFK({index});") != 0 for index in range(nodeCount)]
+
+		return cls.hikNodeNames, cls.hikRotateOnlyFk
+
+
+	@classmethod
+	def connectPlugs(cls, dgModifier:om.MDGModifier, pairs:list) -> None:
+		"""Adds the connections to the modifier replacing other inputs, like connectAttr -force.
+
+		Pairs which are already connected are skipped.
+
+		"""
+		if not pairs: return
+
+		mPlugs = lma.LMAnimCurves.getPlugs([plug for pair in pairs for plug in pair])
+		connections = om.MPlugArray()
+		for source, destination in zip(mPlugs[::2], mPlugs[1::2]):
+			destination.connectedTo(connections, True, False)
+			if connections.length():
+				if connections[0] == source: continue
+				dgModifier.disconnect(connections[0], destination)
+			dgModifier.connect(source, destination)
+
+
 	@classmethod
 	def connectSkFromCharacterState(cls, pCharacter:str, pState:str, bakeMode:int):
 		"""Python override for hikConnectSkFromCharacterState() from others/hikSkeletonUtils.mel
 
+		All plug pairs are collected first and connected in a single MDGModifier.
+
 		Args:
 			pCharacter (str): Name of the character.
 			pState (str): Name of the characters HIKState2SK node.
@@ -2724,40 +3715,45 @@ class LMHik():
 		if cmds.attributeQuery("mainCtrl", node=pCharacter, exists=True, message=True):
 			cls.log.debug(f"{pCharacter} is sourced from a lunar rig - get custom node set.")
 
-		for indx in range(cmds.hikGetNodeCount()):
-			hiknodename = cmds.GetHIKNodeName(indx)
-			listNodeSkConnections = cmds.listConnections(f"{pCharacter}.{hiknodename}", source=True, destination=False)
-			# Should never write in reference
-			if hiknodename != "Reference":
-				if listNodeSkConnections:
-					node = listNodeSkConnections[0]
-					attrNodeState2SK = f"{pState}.{hiknodename}"
-					# Feed the SkState node with any information that may be required from the Sk side      
-					if not cmds.isConnected(f"{node}.parentMatrix", f"{attrNodeState2SK}PGX"):
-						cmds.connectAttr(f"{node}.parentMatrix", f"{attrNodeState2SK}PGX", force=True)
-						# If we are retargeting to non-joint transforms, they may not have the jointOrient attribute
-						# This is ok, since the state2Bone node will just use a pre-rotation of 0 if there is 
-						# no connection to that attribute.
-						if cmds.objectType(node, isAType="joint"):
-							cmds.connectAttr(f"{node}.jointOrient", f"{attrNodeState2SK}PreR", force=True)
-							cmds.connectAttr(f"{node}.segmentScaleCompensate", f"{attrNodeState2SK}SC", force=True)
-							cmds.connectAttr(f"{node}.inverseScale", f"{attrNodeState2SK}IS", force=True)
-
-						cmds.connectAttr(f"{node}.rotateOrder", f"{attrNodeState2SK}ROrder", force=True)
-						cmds.connectAttr(f"{node}.rotateAxis", f"{attrNodeState2SK}PostR", force=True)
-
-					# Activate the bone by feeding it with the state
-					srcT = ""
-					srcR = f"{attrNodeState2SK}R"
-					srcS = ""
-					if bakeMode != 0 or mel.eval(f"hikIsRotateOnlyFK({indx});") != 0: srcT = f"{attrNodeState2SK}T"
-					if bakeMode != 0:	srcS = f"{attrNodeState2SK}S"
-
-					cls.connectSourceAndSaveAnim(node, srcT, srcR, srcS, bakeMode)
+		hikNodeNames, hikRotateOnlyFk = cls.getHikNodeTable()
+		connections = cmds.listConnections(pCharacter, source=True, destination=False, connections=True) or []
+		skNodes = {plug.split(".", 1)[1]: node for plug, node in zip(connections[::2], connections[1::2])}
+
+		# Should never write in reference
+		slots = [(index, name, skNodes[name]) for index, name in enumerate(hikNodeNames) if name != "Reference" and name in skNodes]
+		if not slots: return
+
+		joints = set(cmds.ls([node for index, name, node in slots], type="joint", long=False))
+		dgModifier = om.MDGModifier()
+		pairs = []
+		for index, name, node in slots:
+			attrNodeState2SK = f"{pState}.{name}"
+			# Feed the SkState node with any information that may be required from the Sk side
+			pairs.append((f"{node}.parentMatrix[0]", f"{attrNodeState2SK}PGX"))
+			# If we are retargeting to non-joint transforms, they may not have the jointOrient attribute
+			# This is ok, since the state2Bone node will just use a pre-rotation of 0 if there is
+			# no connection to that attribute.
+			if node in joints:
+				pairs.append((f"{node}.jointOrient", f"{attrNodeState2SK}PreR"))
+				pairs.append((f"{node}.segmentScaleCompensate", f"{attrNodeState2SK}SC"))
+				pairs.append((f"{node}.inverseScale", f"{attrNodeState2SK}IS"))
+			pairs.append((f"{node}.rotateOrder", f"{attrNodeState2SK}ROrder"))
+			pairs.append((f"{node}.rotateAxis", f"{attrNodeState2SK}PostR"))
+		cls.connectPlugs(dgModifier, pairs)
+
+		# Activate the bones by feeding them with the state
+		for index, name, node in slots:
+			attrNodeState2SK = f"{pState}.{name}"
+			srcT = f"{attrNodeState2SK}T" if bakeMode != 0 or hikRotateOnlyFk[index] else ""
+			srcR = f"{attrNodeState2SK}R"
+			srcS = f"{attrNodeState2SK}S" if bakeMode != 0 else ""
+			cls.connectSourceAndSaveAnim(node, srcT, srcR, srcS, bakeMode, dgModifier)
+
+		dgModifier.doIt()
 
 
 	@classmethod
-	def connectSourceAndSaveAnim(cls, pTransform:str, pSrcT:str, pSrcR:str="", pSrcS:str="", forcePairBlend:bool=False) -> str:
+	def connectSourceAndSaveAnim(cls, pTransform:str, pSrcT:str, pSrcR:str="", pSrcS:str="", forcePairBlend:bool=False, dgModifier:om.MDGModifier=None) -> str:
 		"""Python override for the connectSourceAndSaveAnim() from others/hikSkeletonUtils.mel
 
 		If node already has sources, create a pairblend to preserve the animation.
@@ -2773,17 +3769,18 @@ class LMHik():
 			pSrcT (string):	State2SK nodes output translation attribute.
 			pSrcR (string): State2SK nodes output rotation attribute.
 			forcePairBlendCreation (int): Whether or not we want to force creation of the pairBlend node.
+			dgModifier (MDGModifier): Modifier collecting the direct connections, if not specified the
+				connections are made right away.
 
 		"""
-		nbSrc = 0
 		objPairBlend = None
+		channels = lm.listAttrTRSXYZ + lm.listAttrS
+		mPlugs = dict(zip(channels, lma.LMAnimCurves.getPlugs([f"{pTransform}.{attr}" for attr in channels])))
+		connections = []
 
 		# Translation and Rotation setup
 		if not forcePairBlend:
-			for attr in lm.listAttrTRXYZ:
-				listConnections = cmds.listConnections(f"{pTransform}.{attr}", destination=False, source=True)
-				if listConnections: nbSrc += listConnections.__len__()
-			if nbSrc > 0: forcePairBlend = True
+			if any(mPlugs[attr].isDestination() for attr in lm.listAttrTRXYZ): forcePairBlend = True
 
 		if forcePairBlend:
 			listAttrs = [attr.split('.')[-1] for attr in cmds.listAnimatable(pTransform)]
@@ -2794,26 +3791,21 @@ class LMHik():
 				cmds.setAttr(f"{objPairBlend}.weight", True)
 				cmds.setAttr(f"{objPairBlend}.currentDriver", True)
 		else:
-			if pSrcT:
-				if not lm.LMAttribute.isLocekd(f"{pTransform}.tx"): cmds.connectAttr(f"{pSrcT}x", f"{pTransform}.tx")
-				if not lm.LMAttribute.isLocekd(f"{pTransform}.ty"): cmds.connectAttr(f"{pSrcT}y", f"{pTransform}.ty")
-				if not lm.LMAttribute.isLocekd(f"{pTransform}.tz"): cmds.connectAttr(f"{pSrcT}z", f"{pTransform}.tz")
-			if pSrcR:
-				if not lm.LMAttribute.isLocekd(f"{pTransform}.rx"): cmds.connectAttr(f"{pSrcR}x", f"{pTransform}.rx")
-				if not lm.LMAttribute.isLocekd(f"{pTransform}.ry"): cmds.connectAttr(f"{pSrcR}y", f"{pTransform}.ry")
-				if not lm.LMAttribute.isLocekd(f"{pTransform}.rz"): cmds.connectAttr(f"{pSrcR}z", f"{pTransform}.rz")
+			if pSrcT: connections.extend((f"{pSrcT}{axis.lower()}", f"translate{axis}") for axis in "XYZ")
+			if pSrcR: connections.extend((f"{pSrcR}{axis.lower()}", f"rotate{axis}") for axis in "XYZ")
 
 		# Scale setup
 		if pSrcS:
-			nbScaleSrc = 0
-			for attr in lm.listAttrSC:
-				listConnections = cmds.listConnections(f"{pTransform}.{attr}", destination=False, source=True)
-				if listConnections:
-					nbScaleSrc += listConnections.__len__()
-			if nbScaleSrc == 0:
-				if not lm.LMAttribute.isLocekd(f"{pTransform}.sx"): cmds.connectAttr(f"{pSrcS}x", f"{pTransform}.sx")
-				if not lm.LMAttribute.isLocekd(f"{pTransform}.sy"): cmds.connectAttr(f"{pSrcS}y", f"{pTransform}.sy")
-				if not lm.LMAttribute.isLocekd(f"{pTransform}.sz"): cmds.connectAttr(f"{pSrcS}z", f"{pTransform}.sz")
+			if not any(mPlugs[attr].isDestination() for attr in lm.listAttrSC):
+				connections.extend((f"{pSrcS}{axis.lower()}", f"scale{axis}") for axis in "XYZ")
+
+		# Locked channels are skipped
+		connections = [(source, attr) for source, attr in connections if not mPlugs[attr].isLocked()]
+		if connections:
+			modifier = dgModifier or om.MDGModifier()
+			sourcePlugs = lma.LMAnimCurves.getPlugs([source for source, attr in connections])
+			for sourcePlug, (source, attr) in zip(sourcePlugs, connections): modifier.connect(sourcePlug, mPlugs[attr])
+			if dgModifier is None: modifier.doIt()
 
 		if objPairBlend: return objPairBlend
 
@@ -2846,7 +3838,7 @@ class LMHik():
 
 
 	@classmethod
-	def bakeCharacter(cls, nodes:list, startEnd:tuple, attributes:list=lm.listAttrTR, preserveOutsideKeys:bool=False):
+	def bakeCharacter(cls, nodes:list, startEnd:tuple, attributes:list=lm.listAttrTR, preserveOutsideKeys:bool=False, engine:str=None, chunkSize:int=None):
 		"""Python ovrride of the hikBakeCharacter from others/hikBakeOperation.mel
 
 		Bakes the attributes instead of nodes.
@@ -2859,6 +3851,10 @@ class LMHik():
 
 		# mel.eval("hikBakeCharacter(0);")
 
+		if (engine or lma.LMAnimBake.engine) == "api" or lma.LMAnimBake.isChunked(startEnd, chunkSize=chunkSize):
+			attributes = [f"{attribute}{axis}" for attribute in attributes for axis in "XYZ"]
+			return lma.LMAnimBake.bakeTransform(nodes, startEnd, preserveOutsideKeys, attributes=attributes, engine="api", chunkSize=chunkSize)
+
 		cmds.bakeResults(
 			nodes,
 			# animation="objects",
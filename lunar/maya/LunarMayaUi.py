@@ -16,10 +16,9 @@ from PySide2 import QtCore as qtc
 # Custom imports
 import lunar.maya.LunarMaya as lm
 import lunar.maya.LunarMayaAnim as lma
+import lunar.maya.LunarMayaRetarget as lmrtg
 from lunar.maya.toolset import animation
 
-import lunar.maya.resources.retarget.lunarctrl as lmrrlc
-
 
 
 
@@ -283,7 +282,7 @@ class LMUi():
 		cmds.menuItem(
 			label="Import MannequinUe5",
 			radialPosition="NW",
-			command=animation.loadMocap,
+			command=functools.partial(animation.loadMocap, hikTemplate="MannequinUe5"),
 		)
 		cmds.menuItem(
 			label="Import MannequinUe4",
@@ -305,6 +304,11 @@ class LMUi():
 			radialPosition="SE",
 			command=functools.partial(animation.loadMocap, hikTemplate="SinnersDev1"),
 		)
+		cmds.menuItem(
+			label="Import And Clean Up",
+			radialPosition="N",
+			command=functools.partial(animation.loadMocap, cleanup=True),
+		)
 		cmds.setParent("..", menu=True)
 
 
@@ -346,6 +350,11 @@ class LMUi():
 			radialPosition="NE",
 			command=animation.bakeToAnother,
 		)
+		cmds.menuItem(
+			label="Bake Ctrl Edits to Skeleton",
+			radialPosition="E",
+			command=functools.partial(animation.bakeToAnother, incremental=True),
+		)
 		cmds.menuItem(
 			label="Bake Skeleton to Ctrls",
 			radialPosition="SE",
@@ -543,23 +552,14 @@ class LMUi():
 	def resetComponentCtrls(cls, object:str, *args):
 		"""Resets all rig ctrls by setting the apose from retargeting setup.
 		"""
-		for ctrl in cls.getComponentCtrls(object):
-			for attr in lm.listAttrTRXYZ:
-				attr = f"{ctrl}.{attr}"
-				if cmds.getAttr(attr, keyable=True): cmds.setAttr(attr, 0)
+		pose = {ctrl: {attr: 0.0 for attr in lm.listAttrTRXYZ} for ctrl in cls.getComponentCtrls(object)}
+		lma.LMAnimPose.apply(pose, undoable=True, keyableOnly=True)
 
 	@classmethod
 	def resetAllCtrls(cls, object:str, *args):
 		"""Resets all rig ctrls by setting the apose from retargeting setup.
 		"""
-		# namespace = lm.LMNamespace.getNamespaceFromName(object)
-		pose = lmrrlc.templateLC["aPose"]
-		for node in pose:
-			ctrl = lm.LMNamespace.getNameWithNamespace(node, lm.LMNamespace.getNamespaceFromName(object))
-			if not cmds.objExists(ctrl): continue
-			for attr in pose[node]:
-				attrNs = f"{ctrl}.{attr}"
-				if cmds.getAttr(attrNs, settable=True):	cmds.setAttr(attrNs, pose[node][attr])
+		lma.LMAnimPose.apply(lmrtg.LMTemplateRegistry.get("lunarctrl", "templateLC")["aPose"], lm.LMNamespace.getNamespaceFromName(object), undoable=True)
 
 	@classmethod
 	def toggleCtrlsVisbility(cls, object:str, *args):
@@ -4,6 +4,7 @@ import lunar.maya.LunarMaya
 import lunar.maya.LunarMayaAnim
 import lunar.maya.LunarMayaRig
 import lunar.maya.LunarMayaRetarget
+import lunar.maya.LunarMayaBatch
 import lunar.maya.LunarMayaUi
 import lunar.maya.resources
 import lunar.maya.toolset
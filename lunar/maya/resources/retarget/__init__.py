@@ -1,4 +1 @@
-import lunar.maya.resources.retarget.humanik
-import lunar.maya.resources.retarget.lunarctrl
-import lunar.maya.resources.retarget.sinnersdev
-import lunar.maya.resources.retarget.unreal
\ No newline at end of file
+# Templates are loaded on demand, see LunarMayaRetarget.LMTemplateRegistry
@@ -735,5 +735,111 @@ templateLC = {
 			'translateY': -0.5,
 			'translateZ': 3.0,
 		},
+	},
+	# Mocap cleanup strength per ctrl group, the first matching pattern wins - butterworth cutoff in Hz,
+	# savitzky golay window in frames and spike threshold in noise deviations, zero disables the step
+	"cleanup": {
+		"thumb_*":						{"cutoff": 4.0,		"window": 11,	"spikeThreshold": 3.5},
+		"index_*":						{"cutoff": 4.0,		"window": 11,	"spikeThreshold": 3.5},
+		"middle_*":						{"cutoff": 4.0,		"window": 11,	"spikeThreshold": 3.5},
+		"ring_*":						{"cutoff": 4.0,		"window": 11,	"spikeThreshold": 3.5},
+		"pinky_*":						{"cutoff": 4.0,		"window": 11,	"spikeThreshold": 3.5},
+		"*_twist_*":					{"cutoff": 4.0,		"window": 11,	"spikeThreshold": 4.0},
+		"neck_*":						{"cutoff": 5.0,		"window": 9,	"spikeThreshold": 4.0},
+		"head_*":						{"cutoff": 5.0,		"window": 9,	"spikeThreshold": 4.0},
+		# Feet and hands keep their impacts and contacts
+		"foot_*":						{"cutoff": 10.0,	"window": 5,	"spikeThreshold": 5.0},
+		"ball_*":						{"cutoff": 10.0,	"window": 5,	"spikeThreshold": 5.0},
+		"leg_ik_*":						{"cutoff": 10.0,	"window": 5,	"spikeThreshold": 5.0},
+		"hand_*":						{"cutoff": 8.0,		"window": 7,	"spikeThreshold": 4.0},
+		"arm_ik_*":						{"cutoff": 8.0,		"window": 7,	"spikeThreshold": 4.0},
+		"pelvis_*":						{"cutoff": 8.0,		"window": 7,	"spikeThreshold": 4.0},
+		"root_ctrl":					{"cutoff": 4.0,		"window": 11,	"spikeThreshold": 4.0},
+		"*":							{"cutoff": 6.0,		"window": 9,	"spikeThreshold": 4.0},
+	},
+	# Export skeleton joint driven by the ctrl / out node, translate is transfered only if enabled
+	"exportMapping": {
+		"root":							{"node": "root_ctrl",				"translate": True},
+		"pelvis":						{"node": "pelvis_rot_ctrl",			"translate": True},
+		"spine_01":						{"node": "spine_01_ctrl",			"translate": False},
+		"spine_02":						{"node": "spine_02_ctrl",			"translate": False},
+		"spine_03":						{"node": "spine_03_ctrl",			"translate": False},
+		"spine_04":						{"node": "spine_04_ctrl",			"translate": False},
+		"spine_05":						{"node": "spine_05_ctrl",			"translate": False},
+		"neck_01":						{"node": "neck_01_out",				"translate": False},
+		"neck_02":						{"node": "neck_02_out",				"translate": False},
+		"head":							{"node": "head_out",					"translate": False},
+		"clavicle_l":					{"node": "clavicle_l_ctrl",			"translate": False},
+		"upperarm_l":					{"node": "upperarm_l_out",			"translate": False},
+		"upperarm_twist_01_l":			{"node": "upperarm_twist_01_l_ctrl",	"translate": False},
+		"upperarm_twist_02_l":			{"node": "upperarm_twist_02_l_ctrl",	"translate": False},
+		"lowerarm_l":					{"node": "lowerarm_l_out",			"translate": False},
+		"lowerarm_twist_01_l":			{"node": "lowerarm_twist_01_l_ctrl",	"translate": False},
+		"lowerarm_twist_02_l":			{"node": "lowerarm_twist_02_l_ctrl",	"translate": False},
+		"hand_l":						{"node": "hand_l_out",				"translate": False},
+		"weapon_l":						{"node": "weapon_l_ctrl",			"translate": True},
+		"thumb_01_l":					{"node": "thumb_01_l_ctrl",			"translate": False},
+		"thumb_02_l":					{"node": "thumb_02_l_ctrl",			"translate": False},
+		"thumb_03_l":					{"node": "thumb_03_l_ctrl",			"translate": False},
+		"index_metacarpal_l":			{"node": "index_metacarpal_l_ctrl",	"translate": False},
+		"index_01_l":					{"node": "index_01_l_ctrl",			"translate": False},
+		"index_02_l":					{"node": "index_02_l_ctrl",			"translate": False},
+		"index_03_l":					{"node": "index_03_l_ctrl",			"translate": False},
+		"middle_metacarpal_l":			{"node": "middle_metacarpal_l_ctrl",	"translate": False},
+		"middle_01_l":					{"node": "middle_01_l_ctrl",			"translate": False},
+		"middle_02_l":					{"node": "middle_02_l_ctrl",			"translate": False},
+		"middle_03_l":					{"node": "middle_03_l_ctrl",			"translate": False},
+		"pinky_metacarpal_l":			{"node": "pinky_metacarpal_l_ctrl",	"translate": False},
+		"pinky_01_l":					{"node": "pinky_01_l_ctrl",			"translate": False},
+		"pinky_02_l":					{"node": "pinky_02_l_ctrl",			"translate": False},
+		"pinky_03_l":					{"node": "pinky_03_l_ctrl",			"translate": False},
+		"ring_metacarpal_l":			{"node": "ring_metacarpal_l_ctrl",	"translate": False},
+		"ring_01_l":					{"node": "ring_01_l_ctrl",			"translate": False},
+		"ring_02_l":					{"node": "ring_02_l_ctrl",			"translate": False},
+		"ring_03_l":					{"node": "ring_03_l_ctrl",			"translate": False},
+		"clavicle_r":					{"node": "clavicle_r_ctrl",			"translate": False},
+		"upperarm_r":					{"node": "upperarm_r_out",			"translate": False},
+		"upperarm_twist_01_r":			{"node": "upperarm_twist_01_r_ctrl",	"translate": False},
+		"upperarm_twist_02_r":			{"node": "upperarm_twist_02_r_ctrl",	"translate": False},
+		"lowerarm_r":					{"node": "lowerarm_r_out",			"translate": False},
+		"lowerarm_twist_01_r":			{"node": "lowerarm_twist_01_r_ctrl",	"translate": False},
+		"lowerarm_twist_02_r":			{"node": "lowerarm_twist_02_r_ctrl",	"translate": False},
+		"hand_r":						{"node": "hand_r_out",				"translate": False},
+		"weapon_r":						{"node": "weapon_r_ctrl",			"translate": True},
+		"thumb_01_r":					{"node": "thumb_01_r_ctrl",			"translate": False},
+		"thumb_02_r":					{"node": "thumb_02_r_ctrl",			"translate": False},
+		"thumb_03_r":					{"node": "thumb_03_r_ctrl",			"translate": False},
+		"index_metacarpal_r":			{"node": "index_metacarpal_r_ctrl",	"translate": False},
+		"index_01_r":					{"node": "index_01_r_ctrl",			"translate": False},
+		"index_02_r":					{"node": "index_02_r_ctrl",			"translate": False},
+		"index_03_r":					{"node": "index_03_r_ctrl",			"translate": False},
+		"middle_metacarpal_r":			{"node": "middle_metacarpal_r_ctrl",	"translate": False},
+		"middle_01_r":					{"node": "middle_01_r_ctrl",			"translate": False},
+		"middle_02_r":					{"node": "middle_02_r_ctrl",			"translate": False},
+		"middle_03_r":					{"node": "middle_03_r_ctrl",			"translate": False},
+		"pinky_metacarpal_r":			{"node": "pinky_metacarpal_r_ctrl",	"translate": False},
+		"pinky_01_r":					{"node": "pinky_01_r_ctrl",			"translate": False},
+		"pinky_02_r":					{"node": "pinky_02_r_ctrl",			"translate": False},
+		"pinky_03_r":					{"node": "pinky_03_r_ctrl",			"translate": False},
+		"ring_metacarpal_r":			{"node": "ring_metacarpal_r_ctrl",	"translate": False},
+		"ring_01_r":					{"node": "ring_01_r_ctrl",			"translate": False},
+		"ring_02_r":					{"node": "ring_02_r_ctrl",			"translate": False},
+		"ring_03_r":					{"node": "ring_03_r_ctrl",			"translate": False},
+		"thigh_l":						{"node": "thigh_l_out",				"translate": False},
+		"thigh_twist_01_l":				{"node": "thigh_twist_01_l_ctrl",	"translate": False},
+		"thigh_twist_02_l":				{"node": "thigh_twist_02_l_ctrl",	"translate": False},
+		"calf_l":						{"node": "calf_l_out",				"translate": False},
+		"calf_twist_01_l":				{"node": "calf_twist_01_l_ctrl",		"translate": False},
+		"calf_twist_02_l":				{"node": "calf_twist_02_l_ctrl",		"translate": False},
+		"foot_l":						{"node": "foot_l_out",				"translate": False},
+		"ball_l":						{"node": "ball_l_ctrl",				"translate": False},
+		"thigh_r":						{"node": "thigh_r_out",				"translate": False},
+		"thigh_twist_01_r":				{"node": "thigh_twist_01_r_ctrl",	"translate": False},
+		"thigh_twist_02_r":				{"node": "thigh_twist_02_r_ctrl",	"translate": False},
+		"calf_r":						{"node": "calf_r_out",				"translate": False},
+		"calf_twist_01_r":				{"node": "calf_twist_01_r_ctrl",		"translate": False},
+		"calf_twist_02_r":				{"node": "calf_twist_02_r_ctrl",		"translate": False},
+		"foot_r":						{"node": "foot_r_out",				"translate": False},
+		"ball_r":						{"node": "ball_r_ctrl",				"translate": False},
 	}
 }
@@ -142,8 +142,18 @@ def loadCharacter(*args, characterTemplate="Manny"):
 
 
 
-def loadMocap(*args, hikTemplate="MannequinUe5") -> bool or None:
+# Template of mocap clips the detection can not match, the import default before the detection
+defaultMocapTemplate = "MannequinUe5"
+
+
+
+def loadMocap(*args, hikTemplate=None, cleanup=False) -> bool or None:
 	"""Import mocap to the control rig from an fbx file.
+
+	If the hikTemplate is not specified it is detected from the imported joints, clips which can not be
+	detected are imported with the defaultMocapTemplate. With cleanup enabled the baked curves are
+	smoothed and despiked with the presets of the control rig template.
+
 	"""
 	global fiAnimFbx
 	global sceneMetaData
@@ -159,81 +169,96 @@ def loadMocap(*args, hikTemplate="MannequinUe5") -> bool or None:
 		listTimeRanges = []
 		namespaceMocap = "Mocap"
 		fiAnimFbx = qtc.QFileInfo(strFilePath[0])
-		lm.LMScene.setFramerate()
+		# Auto key, refresh and undo are handled by the bulk operation
+		with lm.LMBulkOperation("loadMocap"):
+			lm.LMScene.setFramerate()
 
-		stateAutoKeyMode = lma.LMAnimControl.autoKeyMode()
-		if stateAutoKeyMode: lma.LMAnimControl.setAutoKeyMode(False)
-
-		rtgLunarCtrl, rtgLunarExport = wrapRetargeters(namespaceRig)
-
-		# Anim load / mocap reference
-		# Get the current working time range - check if a time range is selected first
-		offsetAnim = False
-		# timeAnimationStartEnd = lma.LMAnimControl.animationStartEndTime()
-		timeSelectedStartEnd = lma.LMAnimControl.selectedStartEndTime()
-		if timeSelectedStartEnd:
-			useTimeSelected = True
-			offsetAnim = True
-			timeCurrent = timeSelectedStartEnd[0]
-		else:
-			useTimeSelected = False
-			timeSelectedStartEnd = lma.LMAnimControl.minMaxStartEndTime()
-			timeCurrent = lma.LMAnimControl.currentTime()
-			# This is incorrect
-			if timeCurrent != timeSelectedStartEnd[0]: 
-				offsetAnim = True
+			rtgLunarCtrl, rtgLunarExport = wrapRetargeters(namespaceRig)
 
-		referenceNode = lm.LMFile.reference(fiAnimFbx.filePath(), namespaceMocap)
-		isAnimReferenced = True
-		listReferenceJoints = lm.LMFile.getReferenceNodesByType(fiAnimFbx.filePath(), "joint")
-		listReferenceAnimCurves = lm.LMFile.getReferenceNodesByType(fiAnimFbx.filePath(), "animCurveTA")
-		namespaceMocap = om.MNamespace.getNamespaceFromName(listReferenceJoints[0]) # Get the mocap namespace from ref + file
-
-		# Get time of mocap after import - replace with a more reliable function later
-		# timeMocapStartEnd = lma.LMAnimControl.startEndTimeFromAnimCurves(listReferenceAnimCurves)
-		timeMocapStartEnd = lma.LMAnimControl.minMaxStartEndTime()
-		# Time for baking with eventual offset
-		timeBakeStartEnd = tuple([time for time in timeMocapStartEnd])
-		if timeCurrent != timeMocapStartEnd[0]: offsetAnim = True
-		if offsetAnim:
-			lm.LMFile.importReference(fiAnimFbx.filePath()) # import the file in order to be able to modify keyframes
-			isAnimReferenced = False
-			timeOffset = timeCurrent - timeMocapStartEnd[0]
-			if useTimeSelected:
-				timeBakeStartEnd = tuple([time for time in timeSelectedStartEnd]) # should match selection end
+			# Anim load / mocap reference
+			# Get the current working time range - check if a time range is selected first
+			offsetAnim = False
+			# timeAnimationStartEnd = lma.LMAnimControl.animationStartEndTime()
+			timeSelectedStartEnd = lma.LMAnimControl.selectedStartEndTime()
+			if timeSelectedStartEnd:
+				useTimeSelected = True
+				offsetAnim = True
+				timeCurrent = timeSelectedStartEnd[0]
 			else:
-				listTimeBakeStartEnd = [timeMocapStartEnd[0] + timeOffset, timeMocapStartEnd[1] + timeOffset + 1]
-				timeBakeStartEnd = tuple([time for time in listTimeBakeStartEnd])
-
-			lma.LMAnimControl.offsetKeyframes(listReferenceJoints, timeBakeStartEnd[0].value())
-
-		# lma.LMAnimControl.setStartEndTime(timeMocapStartEnd[0], timeMocapStartEnd[1])
-
-		# Metadata node
-		if not cmds.objExists(sceneMetaData.name): sceneMetaData = lm.LMMetaData()
-		sceneMetaData.setText(fiAnimFbx.baseName())
-		# Temp override for array attributes
-		cmds.setAttr(f"{sceneMetaData.node}.metaData[1].text", fiAnimFbx.filePath(), type="string")
-		cmds.setAttr(f"{sceneMetaData.node}.metaData[0].displayInViewport", True)
-
-		rtgMocap = lmrtg.LMRetargeter.getFromHikTemplate(f"{namespaceMocap}:Skeleton", hikTemplate)
-
-		rtgLunarCtrl.setSourceAndBake(rtgMocap, timeBakeStartEnd[0].value(), timeBakeStartEnd[1].value())
-
-		# Clean-up
-		if stateAutoKeyMode: lma.LMAnimControl.setAutoKeyMode(True)
-		rtgMocap.deleteCharacterDefinition()
-		if isAnimReferenced:
-			lm.LMFile.removeReference(fiAnimFbx.filePath())
-		else: 
-			om.MNamespace.removeNamespace(namespaceMocap, True)
-		# double check for "Mocap" namespace if not all files in referenced file are under a namsepace
-		# TODO add referenced file under a group from the file cmds
-		if om.MNamespace.namespaceExists("Mocap"): om.MNamespace.removeNamespace("Mocap", True)
-
-		rtgMocap = None
-		namespaceMocap = None
-		referenceNode = None
+				useTimeSelected = False
+				timeSelectedStartEnd = lma.LMAnimControl.minMaxStartEndTime()
+				timeCurrent = lma.LMAnimControl.currentTime()
+				# This is incorrect
+				if timeCurrent != timeSelectedStartEnd[0]: 
+					offsetAnim = True
+
+			referenceNode = lm.LMFile.reference(fiAnimFbx.filePath(), namespaceMocap)
+			isAnimReferenced = True
+			listReferenceJoints = lm.LMFile.getReferenceNodesByType(fiAnimFbx.filePath(), "joint")
+			listReferenceAnimCurves = lm.LMFile.getReferenceNodesByType(fiAnimFbx.filePath(), "animCurveTA")
+			namespaceMocap = om.MNamespace.getNamespaceFromName(listReferenceJoints[0]) # Get the mocap namespace from ref + file
+
+			# Get time of mocap after import - replace with a more reliable function later
+			# timeMocapStartEnd = lma.LMAnimControl.startEndTimeFromAnimCurves(listReferenceAnimCurves)
+			timeMocapStartEnd = lma.LMAnimControl.minMaxStartEndTime()
+			# Time for baking with eventual offset
+			timeBakeStartEnd = tuple([time for time in timeMocapStartEnd])
+			if timeCurrent != timeMocapStartEnd[0]: offsetAnim = True
+			if offsetAnim:
+				lm.LMFile.importReference(fiAnimFbx.filePath()) # import the file in order to be able to modify keyframes
+				isAnimReferenced = False
+				timeOffset = timeCurrent - timeMocapStartEnd[0]
+				if useTimeSelected:
+					timeBakeStartEnd = tuple([time for time in timeSelectedStartEnd]) # should match selection end
+				else:
+					listTimeBakeStartEnd = [timeMocapStartEnd[0] + timeOffset, timeMocapStartEnd[1] + timeOffset + 1]
+					timeBakeStartEnd = tuple([time for time in listTimeBakeStartEnd])
+
+				lma.LMAnimControl.offsetKeyframes(listReferenceJoints, timeBakeStartEnd[0].value())
+
+			# lma.LMAnimControl.setStartEndTime(timeMocapStartEnd[0], timeMocapStartEnd[1])
+
+			# Metadata node
+			if not cmds.objExists(sceneMetaData.name): sceneMetaData = lm.LMMetaData()
+			sceneMetaData.setText(fiAnimFbx.baseName())
+			# Temp override for array attributes
+			cmds.setAttr(f"{sceneMetaData.node}.metaData[1].text", fiAnimFbx.filePath(), type="string")
+			cmds.setAttr(f"{sceneMetaData.node}.metaData[0].displayInViewport", True)
+
+			# Detect the template before the bake, a wrong template would only fail after it
+			detectedTemplate, confidence = lmrtg.LMTemplateDetector.detect(listReferenceJoints)
+			if not hikTemplate:
+				hikTemplate = detectedTemplate
+				if not hikTemplate:
+					hikTemplate = defaultMocapTemplate
+					cmds.warning(f"Could not detect the mocap skeleton template, importing as '{hikTemplate}'.")
+			elif detectedTemplate and detectedTemplate != hikTemplate and confidence >= lmrtg.LMTemplateDetector.minConfidence:
+				cmds.warning(f"Mocap skeleton looks like '{detectedTemplate}', importing as '{hikTemplate}'.")
+
+			rtgMocap = lmrtg.LMRetargeter.getFromHikTemplate(f"{namespaceMocap}:Skeleton", hikTemplate)
+			if not rtgMocap:
+				if isAnimReferenced: lm.LMFile.removeReference(fiAnimFbx.filePath())
+				else: om.MNamespace.removeNamespace(namespaceMocap, True)
+				cmds.warning(f"Could not set up the mocap skeleton as '{hikTemplate}', operation was cancelled.")
+				return False
+
+
+			rtgLunarCtrl.setSourceAndBake(rtgMocap, timeBakeStartEnd[0].value(), timeBakeStartEnd[1].value())
+			if cleanup: rtgLunarCtrl.cleanUpAnimation()
+
+			# Clean-up
+			rtgMocap.deleteCharacterDefinition()
+			if isAnimReferenced:
+				lm.LMFile.removeReference(fiAnimFbx.filePath())
+			else: 
+				om.MNamespace.removeNamespace(namespaceMocap, True)
+			# double check for "Mocap" namespace if not all files in referenced file are under a namsepace
+			# TODO add referenced file under a group from the file cmds
+			if om.MNamespace.namespaceExists("Mocap"): om.MNamespace.removeNamespace("Mocap", True)
+
+			rtgMocap = None
+			namespaceMocap = None
+			referenceNode = None
 		return True
 
 	cmds.warning("Operation was cancelled.")
@@ -260,11 +285,12 @@ def exportAnimation(*args, exportAs=True, bake=True):
 
 			rtgLunarCtrl, rtgLunarExport = wrapRetargeters(namespaceRig)
 
-			# Source and bake to export skeleton
-			if bake:
-				rtgLunarExport.setCtrlRigAsSourceAndBake(rtgLunarCtrl)
+			with lm.LMBulkOperation("exportAnimation"):
+				# Source and bake to export skeleton
+				if bake:
+					rtgLunarExport.setCtrlRigAsSourceAndBake(rtgLunarCtrl)
 
-			rtgLunarExport.exportAnimation(fiAnimFbx.filePath())
+				rtgLunarExport.exportAnimation(fiAnimFbx.filePath())
 			return True
 
 		om.MGlobal.displayWarning("Export operation was cancelled.")
@@ -309,8 +335,14 @@ def importMhFaceCtrlAnimatino():
 
 
 
-def bakeToAnother(*args, ctrlsToSkeleton=True, skeletonToCtrls=False):
+@lm.LMBulkOperation("bakeToAnother")
+def bakeToAnother(*args, ctrlsToSkeleton=True, skeletonToCtrls=False, incremental=False):
 	"""Animation shelf wrapper for baking animation between the control rig and skeleton.
+
+	Args:
+		incremental (bool): Whether or not to bake only the frames affected by the ctrl edits since the
+			last incremental bake, see LMLunarExport.transferFromCtrlRigIncremental.
+
 	"""
 	if ctrlsToSkeleton and skeletonToCtrls:
 		om.MGlobal.displayWarning("Only one flag can be set to true at the same time - can't bake both at the same time.")
@@ -321,7 +353,7 @@ def bakeToAnother(*args, ctrlsToSkeleton=True, skeletonToCtrls=False):
 	rtgLunarCtrl, rtgLunarExport = wrapRetargeters(namespaceRig)
 
 	if ctrlsToSkeleton:
-		rtgLunarExport.setCtrlRigAsSourceAndBake(rtgLunarCtrl)
+		rtgLunarExport.setCtrlRigAsSourceAndBake(rtgLunarCtrl, incremental=incremental)
 	
 	if skeletonToCtrls:
 		rtgLunarCtrl.setSourceAndBake(rtgLunarExport, rootMotion=True)
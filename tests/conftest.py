@@ -0,0 +1,6 @@
+# Built-in imports
+import os
+import sys
+
+# The tests run against the checkout, lunar is not installed as a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,42 @@
+# Third-party imports
+import numpy as np
+import pytest
+
+# Custom imports
+import lunar.anim.reduce as lard
+
+
+
+
+@pytest.mark.parametrize("tolerance", (1e-3, 1e-2, 0.1))
+def test_rdpErrorBound(tolerance:float) -> None:
+	rng = np.random.default_rng(0)
+	times = np.arange(300, dtype=float)
+	values = np.cumsum(rng.normal(scale=0.05, size=(300, 8)), axis=0) + np.sin(times / 20.0)[:, None]
+
+	keep = lard.rdp(times, values, tolerance)
+	assert keep[0].all() and keep[-1].all()
+	assert lard.interpolationError(times, values, keep).max() <= tolerance
+	assert keep.sum() < keep.size
+
+
+def test_rdpChannelTolerances() -> None:
+	times = np.arange(50, dtype=float)
+	values = np.tile(np.sin(times / 5.0)[:, None], (1, 2))
+
+	keep = lard.rdp(times, values, np.array([1e-4, 1.0]))
+	assert keep[:, 0].sum() > keep[:, 1].sum()
+	assert lard.interpolationError(times, values, keep).max(axis=0)[0] <= 1e-4
+
+
+def test_rdpLinear() -> None:
+	times = np.arange(20, dtype=float)
+	keep = lard.rdp(times, np.stack((times * 2.0, np.full(20, 3.0)), axis=-1), 1e-6)
+	assert np.flatnonzero(keep.any(axis=1)).tolist() == [0, 19]
+
+
+@pytest.mark.parametrize("frameCount", (0, 1, 2))
+def test_rdpShortInput(frameCount:int) -> None:
+	keep = lard.rdp(np.arange(frameCount, dtype=float), np.zeros((frameCount, 3)), 0.1)
+	assert keep.shape == (frameCount, 3)
+	assert keep.all()
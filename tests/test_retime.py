@@ -0,0 +1,72 @@
+# Third-party imports
+import numpy as np
+import pytest
+
+# Custom imports
+import lunar.anim.posetrack as lap
+import lunar.anim.retime as lar
+
+
+
+
+def test_sampleTimes() -> None:
+	targetTimes, sourceTimes = lar.sampleTimes(10.0, 20.0)
+	np.testing.assert_allclose(targetTimes, np.arange(10.0, 21.0))
+	np.testing.assert_allclose(sourceTimes, targetTimes)
+
+
+def test_sampleTimesScale() -> None:
+	targetTimes, sourceTimes = lar.sampleTimes(10.0, 20.0, scale=2.0)
+	np.testing.assert_allclose(targetTimes, np.arange(10.0, 31.0))
+	np.testing.assert_allclose(sourceTimes, np.arange(10.0, 20.5, 0.5))
+
+	targetTimes, sourceTimes = lar.sampleTimes(0.0, 10.0, scale=0.5)
+	np.testing.assert_allclose(targetTimes, np.arange(0.0, 6.0))
+	np.testing.assert_allclose(sourceTimes, np.arange(0.0, 12.0, 2.0))
+
+
+def test_sampleTimesOversampling() -> None:
+	targetTimes, sourceTimes = lar.sampleTimes(0.0, 4.0, oversamplingRate=4)
+	np.testing.assert_allclose(targetTimes, np.arange(17) * 0.25)
+	np.testing.assert_allclose(sourceTimes, targetTimes)
+
+	with pytest.raises(ValueError):
+		lar.sampleTimes(0.0, 4.0, scale=0.0)
+
+
+def linearTrack(frameCount:int=11, startFrame:float=5.0) -> lap.PoseTrack:
+	"""Returns a track with one node whose channels move linearly with the time.
+	"""
+	times = startFrame + np.arange(frameCount, dtype=float)
+	data = np.stack([times * (channel + 1) * 0.01 for channel in range(6)], axis=-1)[:, None]
+	return lap.PoseTrack(data, ["joint"], startFrame=startFrame)
+
+
+def test_poseTrackRetimeOversampling() -> None:
+	track = linearTrack()
+	retimed = track.retime(oversamplingRate=2)
+	assert retimed.sampleBy == 0.5
+	assert retimed.startFrame == track.startFrame
+	assert retimed.endFrame == track.endFrame
+	np.testing.assert_allclose(retimed.times(), np.arange(5.0, 15.5, 0.5))
+	np.testing.assert_allclose(retimed.data[:, 0, 0], retimed.times() * 0.01, rtol=1e-6)
+
+	# The rate is relative to the current sampling
+	again = retimed.retime(oversamplingRate=2)
+	assert again.sampleBy == 0.25
+	np.testing.assert_allclose(again.times(), np.arange(5.0, 15.25, 0.25))
+
+
+def test_poseTrackRetimeScale() -> None:
+	track = linearTrack()
+	retimed = track.retime(scale=2.0)
+	assert retimed.frameCount == 21
+	np.testing.assert_allclose(retimed.times(), np.arange(5.0, 26.0))
+	# Frame 5 + 2n of the retimed track shows frame 5 + n of the source
+	np.testing.assert_allclose(retimed.data[::2], track.data, rtol=1e-6)
+
+
+def test_poseTrackRetimeInvalidStep() -> None:
+	track = linearTrack().copy(sampleBy=1.5)
+	with pytest.raises(ValueError):
+		track.retime(oversamplingRate=1)
@@ -0,0 +1,77 @@
+# Third-party imports
+import numpy as np
+import pytest
+
+# Custom imports
+import lunar.anim.euler as lae
+import lunar.anim.quaternion as laq
+
+
+
+
+rotateOrders = ("xyz", "yzx", "zxy", "xzy", "yxz", "zyx")
+
+
+def randomAngles(count:int, order:str, seed:int=0) -> np.ndarray:
+	"""Returns random euler angles inside of the range returned by toEuler.
+
+	The middle axis of the rotate order is limited to +-90 degrees, the other two to +-180 degrees.
+
+	"""
+	rng = np.random.default_rng(seed)
+	angles = rng.uniform(-np.pi * 0.99, np.pi * 0.99, (count, 3))
+	angles[:, laq.axisIndices[order[1]]] *= 0.5
+	return angles
+
+
+def sameRotation(a:np.ndarray, b:np.ndarray) -> np.ndarray:
+	"""Returns True per quaternion pair if both describe the same rotation.
+	"""
+	return np.isclose(np.abs((a * b).sum(axis=-1)), 1.0, atol=1e-9)
+
+
+@pytest.mark.parametrize("order", rotateOrders)
+def test_eulerRoundTrip(order:str) -> None:
+	angles = randomAngles(500, order)
+	result = laq.toEuler(laq.fromEuler(angles, order), order)
+	np.testing.assert_allclose(result, angles, atol=1e-9)
+
+
+@pytest.mark.parametrize("order", rotateOrders)
+def test_quaternionRoundTrip(order:str) -> None:
+	rng = np.random.default_rng(1)
+	q = laq.normalize(rng.normal(size=(500, 4)))
+
+	assert sameRotation(laq.fromEuler(laq.toEuler(q, order), order), q).all()
+	assert sameRotation(laq.fromMatrix(laq.toMatrix(q)), q).all()
+
+
+@pytest.mark.parametrize("order", rotateOrders)
+def test_gimbalLockRoundTrip(order:str) -> None:
+	angles = np.zeros((3, 3))
+	middle = laq.axisIndices[order[1]]
+	angles[:, middle] = np.pi * 0.5
+	angles[:, laq.axisIndices[order[0]]] = (0.3, -1.2, 2.5)
+	angles[:, laq.axisIndices[order[2]]] = (0.4, 0.1, -0.7)
+
+	q = laq.fromEuler(angles, order)
+	assert sameRotation(laq.fromEuler(laq.toEuler(q, order), order), q).all()
+
+
+@pytest.mark.parametrize("order", rotateOrders)
+def test_eulerFilter(order:str) -> None:
+	rng = np.random.default_rng(2)
+	# Smooth motion spinning over several turns, converted to the wrapped euler solution
+	times = np.linspace(0.0, 1.0, 200)[:, None]
+	smooth = np.hstack((times * 9.0, np.sin(times * 4.0) * 1.2, times * -7.0)) + rng.normal(scale=1e-3, size=(200, 3))
+	q = laq.fromEuler(smooth, order)
+	wrapped = laq.toEuler(q, order)
+
+	filtered = lae.filter(wrapped, order)
+	assert sameRotation(laq.fromEuler(filtered, order), q).all()
+	assert np.abs(np.diff(filtered, axis=0)).max() < 0.2
+
+
+def test_eulerFilterShortInput() -> None:
+	assert lae.filter(np.zeros((0, 3))).shape == (0, 3)
+	np.testing.assert_array_equal(lae.filter(np.ones((1, 2, 3)), ["xyz", "zyx"]), np.ones((1, 2, 3)))
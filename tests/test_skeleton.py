@@ -0,0 +1,103 @@
+# Third-party imports
+import numpy as np
+
+# Custom imports
+import lunar.anim.skeleton as las
+
+
+
+
+def composeChain(parentWorld, translations, rotations, jointOrients, rotateAxes, rotateOrders) -> np.ndarray:
+	"""Returns the world matrices of a joint chain, every joint is the child of the previous one.
+	"""
+	frameCount, jointCount = translations.shape[:2]
+	world = np.empty((frameCount, jointCount, 4, 4))
+	parent = parentWorld
+	for joint in range(jointCount):
+		local = np.zeros((frameCount, 4, 4))
+		local[:, :3, :3] = las.eulerToMatrix(rotateAxes[joint], "xyz") @ las.eulerToMatrix(rotations[:, joint], rotateOrders[joint]) @ las.eulerToMatrix(jointOrients[joint], "xyz")
+		local[:, 3, :3] = translations[:, joint]
+		local[:, 3, 3] = 1.0
+		world[:, joint] = local @ parent
+		parent = world[:, joint]
+
+	return world
+
+
+def chainSetup(frameCount:int=10) -> dict:
+	rng = np.random.default_rng(0)
+	jointCount = 3
+	parentWorld = np.tile(np.eye(4), (frameCount, 1, 1))
+	parentWorld[:, :3, :3] = las.eulerToMatrix(np.array([0.2, -0.4, 0.1]), "xyz")
+	parentWorld[:, 3, :3] = (1.0, 2.0, 3.0)
+
+	return {
+		"parentWorld": parentWorld,
+		"translations": np.tile(np.array([[0.0, 0.0, 0.0], [0.0, 5.0, 0.0], [0.0, 4.0, 1.0]]), (frameCount, 1, 1)),
+		"rotations": rng.uniform(-1.2, 1.2, (frameCount, jointCount, 3)),
+		"jointOrients": rng.uniform(-1.0, 1.0, (jointCount, 3)),
+		"rotateAxes": rng.uniform(-0.5, 0.5, (jointCount, 3)),
+		"rotateOrders": ["xyz", "zxy", "yzx"],
+	}
+
+
+def test_transferToJointsChain() -> None:
+	setup = chainSetup()
+	world = composeChain(**setup)
+	translations, rotations = las.transferToJoints(
+		world,
+		[-1, 0, 1],
+		setup["parentWorld"][:, None].repeat(3, axis=1),
+		np.array([True, True, True]),
+		setup["translations"][0],
+		setup["jointOrients"],
+		setup["rotateAxes"],
+		setup["rotateOrders"],
+	)
+
+	np.testing.assert_allclose(translations, setup["translations"], atol=1e-9)
+	np.testing.assert_allclose(rotations, setup["rotations"], atol=1e-9)
+
+
+def test_transferToJointsRestTranslate() -> None:
+	setup = chainSetup()
+	world = composeChain(**setup)
+	# Moving the sources does not move joints without translation transfer
+	world[:, 1, 3, :3] += 10.0
+	world[:, 2, 3, :3] += 10.0
+	translations, rotations = las.transferToJoints(
+		world,
+		[-1, 0, 1],
+		setup["parentWorld"][:, None].repeat(3, axis=1),
+		np.array([True, False, False]),
+		setup["translations"][0],
+		setup["jointOrients"],
+		setup["rotateAxes"],
+		setup["rotateOrders"],
+	)
+
+	np.testing.assert_allclose(translations, setup["translations"], atol=1e-9)
+	np.testing.assert_allclose(rotations, setup["rotations"], atol=1e-9)
+
+
+def test_transferToJointsUnsolved() -> None:
+	setup = chainSetup()
+	setup["rotations"][:, 1] = 0.0
+	world = composeChain(**setup)
+	# The unsolved joint keeps its rest transform, the child still matches its source in world space
+	source = world.copy()
+	source[:, 1] = np.eye(4)
+	translations, rotations = las.transferToJoints(
+		source,
+		[-1, 0, 1],
+		setup["parentWorld"][:, None].repeat(3, axis=1),
+		np.array([True, True, True]),
+		setup["translations"][0],
+		setup["jointOrients"],
+		setup["rotateAxes"],
+		setup["rotateOrders"],
+		solved=np.array([True, False, True]),
+	)
+
+	np.testing.assert_allclose(translations, setup["translations"], atol=1e-9)
+	np.testing.assert_allclose(rotations, setup["rotations"], atol=1e-9)